@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 
@@ -107,6 +109,23 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Per-user entries (focus profiles, mood insights) are refreshed or deleted by
+# whichever gunicorn worker handles the write, so every worker must read the same
+# cache: the default LocMemCache is per process and would leave the others serving
+# stale entries. A cache directory is shared by all workers of one container; set
+# BUNNYSTEPS_CACHE_DIR to move it, and switch to Redis or Memcached when running
+# on more than one host.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('BUNNYSTEPS_CACHE_DIR', Path(tempfile.gettempdir()) / 'bunnysteps-cache'),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
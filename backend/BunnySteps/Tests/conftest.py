@@ -24,3 +24,12 @@ def authenticated_client(api_client):
     api_client.user = user  # for easy access in tests
     return api_client
     
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Per-user caches must not leak between tests (user ids get reused)."""
+    from django.core.cache import cache
+    cache.clear()
+    yield
+    cache.clear()
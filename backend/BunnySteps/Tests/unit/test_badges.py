@@ -0,0 +1,72 @@
+# tests/test_badges.py
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from api.badges import BADGE_RULES, BadgeRule, RULES_BY_EVENT, record_event
+from api.models import Badge, BadgeCounter, FocusSession, Task
+
+User = get_user_model()
+
+
+def complete(task):
+    task.status = "done"
+    task.completed = True
+    task.save()
+
+
+@pytest.mark.django_db
+class TestBadgeRules:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="badgebunny", password="x")
+
+    def test_daily_task_badges(self, user):
+        tasks = [Task.objects.create(user=user, title=f"T{i}") for i in range(3)]
+
+        complete(tasks[0])
+        assert not Badge.objects.filter(user=user).exists()
+        complete(tasks[1])
+        assert set(Badge.objects.filter(user=user).values_list("key", flat=True)) == {"daily_2_tasks"}
+        complete(tasks[2])
+        assert set(Badge.objects.filter(user=user).values_list("key", flat=True)) == {
+            "daily_2_tasks", "daily_3_tasks"
+        }
+
+    def test_counting_does_not_query_tasks(self, user, django_assert_max_num_queries):
+        for _ in range(3):
+            record_event(user.id, "task_completed")
+
+        # counter UPDATE + read for the day and all-time counters (plus savepoints), no aggregate
+        with django_assert_max_num_queries(8) as ctx:
+            assert record_event(user.id, "task_completed") == []
+        assert not any("api_task" in q["sql"] for q in ctx.captured_queries)
+
+    def test_day_window_resets(self, user):
+        today = timezone.localdate()
+        record_event(user.id, "task_completed", day=today - timedelta(days=1))
+        assert record_event(user.id, "task_completed", day=today) == []
+
+        assert BadgeCounter.objects.get(user=user, counter="task_completed:day", window_start=today).count == 1
+        assert BadgeCounter.objects.get(user=user, counter="task_completed:all").count == 2
+
+    def test_predicate_rule_from_focus_session(self, user):
+        now = timezone.now()
+        FocusSession.objects.create(user=user, started_at=now - timedelta(minutes=20), ended_at=now)
+        assert not Badge.objects.filter(user=user, key="deep_focus").exists()
+
+        FocusSession.objects.create(user=user, started_at=now - timedelta(minutes=75), ended_at=now)
+        assert Badge.objects.filter(user=user, key="deep_focus").exists()
+
+    def test_new_rule_needs_no_query_code(self, user, monkeypatch):
+        rule = BadgeRule("mood_first", "First Feelings", "Logged a mood", event="mood_logged", threshold=1)
+        monkeypatch.setitem(RULES_BY_EVENT, "mood_logged", RULES_BY_EVENT["mood_logged"] + [rule])
+
+        assert record_event(user.id, "mood_logged") == ["mood_first"]
+
+    def test_rule_keys_are_unique(self):
+        keys = [rule.key for rule in BADGE_RULES]
+        assert len(keys) == len(set(keys))
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+import pytest
+from django.utils import timezone
+
+from api.models import FocusSession, Reminder, Task
+
+
+def local(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+@pytest.mark.django_db
+class TestCalendar:
+
+    URL = "/api/calendar/"
+
+    @pytest.fixture
+    def window(self):
+        return local(2030, 3, 2), local(2030, 3, 9)
+
+    def get(self, client, start, end):
+        return client.get(self.URL, {"start": start.isoformat(), "end": end.isoformat()})
+
+    def test_merges_sources_in_start_order(self, authenticated_client, window):
+        user = authenticated_client.user
+        start, end = window
+        Task.objects.create(user=user, title="Report", due_date=start + timedelta(days=3))
+        Task.objects.create(user=user, title="Write", preferred_datetime=start + timedelta(days=1), estimated_minutes=30)
+        Reminder.objects.create(user=user, title="Dentist", remind_at=start + timedelta(days=2))
+        FocusSession.objects.create(user=user, mode_name="Deep work",
+                                    started_at=start - timedelta(hours=1), ended_at=start + timedelta(hours=1))
+
+        response = self.get(authenticated_client, start, end)
+        assert response.status_code == 200
+        events = response.data["events"]
+        assert [(e["type"], e["title"]) for e in events] == [
+            ("focus_session", "Deep work"), ("task", "Write"), ("reminder", "Dentist"), ("task", "Report"),
+        ]
+        assert events[1]["end"] == start + timedelta(days=1, minutes=30)
+
+    def test_only_items_overlapping_the_window(self, authenticated_client, window):
+        user = authenticated_client.user
+        start, end = window
+        Task.objects.create(user=user, title="Old", due_date=start - timedelta(days=30))
+        Reminder.objects.create(user=user, title="Later", remind_at=end + timedelta(minutes=1))
+        FocusSession.objects.create(user=user, started_at=start - timedelta(days=3), ended_at=start - timedelta(days=3, hours=-1))
+        FocusSession.objects.create(user=user, mode_name="Open", started_at=start - timedelta(hours=2))
+        FocusSession.objects.create(user=user, mode_name="Abandoned", started_at=start - timedelta(days=40))
+        Task.objects.create(user=user, title="Short", preferred_datetime=start - timedelta(hours=2), estimated_minutes=60)
+
+        events = self.get(authenticated_client, start, end).data["events"]
+        assert [e["title"] for e in events] == ["Open"]
+
+    def test_preferred_block_started_before_the_window_is_listed(self, authenticated_client, window):
+        user = authenticated_client.user
+        start, end = window
+        Task.objects.create(user=user, title="Deep", preferred_datetime=start - timedelta(hours=1), estimated_minutes=90)
+
+        events = self.get(authenticated_client, start, end).data["events"]
+        assert [(e["title"], e["start"], e["end"]) for e in events] == [
+            ("Deep", start - timedelta(hours=1), start + timedelta(minutes=30)),
+        ]
+
+    def test_recurring_task_is_listed_once_per_occurrence(self, authenticated_client):
+        user = authenticated_client.user
+        soon = timezone.now() + timedelta(hours=1)
+        Task.objects.create(user=user, title="Walk", recurrence_rule="daily", preferred_datetime=soon)
+
+        events = self.get(authenticated_client, soon - timedelta(hours=1), soon + timedelta(days=3)).data["events"]
+        assert len(events) == 3
+        assert {e["kind"] for e in events} == {"occurrence"}
+
+    def test_cost_does_not_grow_with_history(self, authenticated_client, window, django_assert_max_num_queries):
+        user = authenticated_client.user
+        start, end = window
+        Task.objects.bulk_create([
+            Task(user=user, title=f"t{i}", due_date=start - timedelta(days=i + 1)) for i in range(200)
+        ])
+        with django_assert_max_num_queries(8):
+            assert self.get(authenticated_client, start, end).data["events"] == []
+
+    def test_rejects_bad_windows(self, authenticated_client, window):
+        start, end = window
+        assert self.get(authenticated_client, end, start).status_code == 400
+        assert self.get(authenticated_client, start, start + timedelta(days=400)).status_code == 400
+        assert authenticated_client.get(self.URL, {"start": "soon"}).status_code == 400
+        assert authenticated_client.get(self.URL, {"start": "2030-03-02"}).data["end"] == local(2030, 3, 9)
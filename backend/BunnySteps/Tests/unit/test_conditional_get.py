@@ -0,0 +1,141 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+
+from api.models import (
+    DISCIPLINE_COINS, Category, FocusSession, Hobby, Notification, Reminder, RewardSummary, ShoppingItem, Task,
+    award_weekly_discipline,
+)
+from api.utils import fire_due_reminders
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def revalidate(self, client, url, etag):
+        return client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_list_is_not_modified(self, authenticated_client, django_assert_max_num_queries):
+        Task.objects.create(user=authenticated_client.user, title="A")
+        first = authenticated_client.get("/api/tasks/")
+        assert first.status_code == 200
+        assert first["ETag"].startswith('W/"')
+        assert "private" in first["Cache-Control"]
+
+        with django_assert_max_num_queries(3):
+            again = self.revalidate(authenticated_client, "/api/tasks/", first["ETag"])
+        assert again.status_code == 304
+        assert again["ETag"] == first["ETag"]
+        assert not again.content
+
+    def test_writes_change_the_validator(self, authenticated_client):
+        user = authenticated_client.user
+        task = Task.objects.create(user=user, title="A")
+        etag = authenticated_client.get("/api/tasks/")["ETag"]
+
+        task.title = "B"
+        task.save()
+        response = self.revalidate(authenticated_client, "/api/tasks/", etag)
+        assert response.status_code == 200
+        assert response.data[0]["title"] == "B"
+
+        etag = response["ETag"]
+        task.delete()
+        assert self.revalidate(authenticated_client, "/api/tasks/", etag).status_code == 200
+
+    def test_related_names_invalidate_dependent_lists(self, authenticated_client):
+        user = authenticated_client.user
+        category = Category.objects.create(user=user, name="Work")
+        Task.objects.create(user=user, title="A", category=category)
+        etag = authenticated_client.get("/api/tasks/")["ETag"]
+
+        category.name = "Office"
+        category.save()
+        response = self.revalidate(authenticated_client, "/api/tasks/", etag)
+        assert response.status_code == 200
+        assert response.data[0]["category_name"] == "Office"
+
+    def test_expanded_relations_invalidate_the_task_list(self, authenticated_client):
+        user = authenticated_client.user
+        task = Task.objects.create(user=user, title="A")
+        reminder = Reminder.objects.create(user=user, title="Ping", task=task)
+        url = "/api/tasks/?expand=reminders"
+        etag = authenticated_client.get(url)["ETag"]
+        plain = authenticated_client.get("/api/tasks/")["ETag"]
+
+        reminder.title = "Pong"
+        reminder.save()
+        response = self.revalidate(authenticated_client, url, etag)
+        assert response.status_code == 200
+        assert response.data[0]["reminders"][0]["title"] == "Pong"
+        assert self.revalidate(authenticated_client, "/api/tasks/", plain).status_code == 304
+
+        url = f"/api/tasks/{task.id}/?expand=focus_sessions"
+        etag = authenticated_client.get(url)["ETag"]
+        session = FocusSession.objects.create(user=user, mode_name="Pomodoro", started_at=timezone.now())
+        session.related_tasks.add(task)
+        response = self.revalidate(authenticated_client, url, etag)
+        assert response.status_code == 200
+        assert response.data["focus_sessions"][0]["mode_name"] == "Pomodoro"
+
+    def test_validators_are_per_url_and_per_kind(self, authenticated_client):
+        user = authenticated_client.user
+        hobby = Hobby.objects.create(user=user, name="Chess")
+        list_etag = authenticated_client.get("/api/hobbies/")["ETag"]
+        detail_etag = authenticated_client.get(f"/api/hobbies/{hobby.id}/")["ETag"]
+        assert list_etag != detail_etag
+        assert self.revalidate(authenticated_client, f"/api/hobbies/{hobby.id}/", detail_etag).status_code == 304
+
+        ShoppingItem.objects.create(user=user, name="Milk")
+        assert self.revalidate(authenticated_client, "/api/hobbies/", list_etag).status_code == 304
+
+    def test_other_users_validators_do_not_match(self, authenticated_client, django_user_model):
+        etag = authenticated_client.get("/api/hobbies/")["ETag"]
+        other = django_user_model.objects.create_user(username="other", password="pw")
+        authenticated_client.force_authenticate(user=other)
+        assert self.revalidate(authenticated_client, "/api/hobbies/", etag).status_code == 200
+
+    def test_notifications_track_new_and_read_rows(self, authenticated_client):
+        user = authenticated_client.user
+        Notification.objects.bulk_create([Notification(user=user, type="reminder", message="hi")])
+        etag = authenticated_client.get("/api/notifications/")["ETag"]
+        assert self.revalidate(authenticated_client, "/api/notifications/", etag).status_code == 304
+
+        Notification.objects.filter(user=user).update(is_read=True)
+        assert self.revalidate(authenticated_client, "/api/notifications/", etag).status_code == 200
+
+    def test_discipline_bonus_invalidates_rewards_and_badges(self, authenticated_client):
+        user = authenticated_client.user
+        RewardSummary.objects.create(user=user)
+        rewards = authenticated_client.get("/api/rewards/")["ETag"]
+        badges = authenticated_client.get("/api/badges/")["ETag"]
+
+        # bulk inserts and a queryset UPDATE, none of them in the change feed
+        award_weekly_discipline(type(user).objects.filter(pk=user.pk))
+        response = self.revalidate(authenticated_client, "/api/rewards/", rewards)
+        assert response.status_code == 200
+        assert response.data[0]["coins"] == DISCIPLINE_COINS
+        assert self.revalidate(authenticated_client, "/api/badges/", badges).status_code == 200
+
+    def test_fired_reminders_invalidate_the_reminder_list(self, authenticated_client):
+        user = authenticated_client.user
+        Reminder.objects.create(user=user, title="Stretch", remind_at=timezone.now())
+        etag = authenticated_client.get("/api/reminders/")["ETag"]
+        assert self.revalidate(authenticated_client, "/api/reminders/", etag).status_code == 304
+
+        assert fire_due_reminders(user) == 1
+        response = self.revalidate(authenticated_client, "/api/reminders/", etag)
+        assert response.status_code == 200
+        assert response.data[0]["notified"] is True
+
+    def test_imported_expenses_invalidate_the_expense_list(self, authenticated_client):
+        etag = authenticated_client.get("/api/expenses/")["ETag"]
+        assert self.revalidate(authenticated_client, "/api/expenses/", etag).status_code == 304
+
+        # bulk-created rows: no post_save, the import records them itself
+        upload = SimpleUploadedFile("bank.csv", b"date,debit,note\n2026-03-01,12.00,Lunch\n")
+        response = authenticated_client.post("/api/shopping/expenses/import/", {"files": [upload]})
+        assert response.status_code == 201
+        response = self.revalidate(authenticated_client, "/api/expenses/", etag)
+        assert response.status_code == 200
+        assert [row["note"] for row in response.data] == ["Lunch"]
@@ -0,0 +1,128 @@
+import io
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from api.budget import budget_status, rebuild_spend_ledger
+from api.currency import convert, rate_on
+from api.expense_analytics import expense_cube
+from api.models import ExchangeRate, Expense, MonthlySpend, UserProfile
+
+User = get_user_model()
+
+RATES = """date,base,quote,rate
+2026-03-01,USD,TND,3.10
+2026-03-15,USD,TND,3.20
+2026-03-01,TND,EUR,0.30
+"""
+
+
+def at(day):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()).replace(hour=12))
+
+
+@pytest.mark.django_db
+class TestExchangeRates:
+
+    @pytest.fixture
+    def load(self, tmp_path):
+        def load(text):
+            path = tmp_path / "rates.csv"
+            path.write_text(text)
+            call_command("import_exchange_rates", str(path), stdout=io.StringIO())
+        return load
+
+    @pytest.fixture
+    def rates(self, load):
+        load(RATES)
+
+    def test_latest_rate_on_or_before_day_and_inverse(self, rates):
+        assert rate_on("USD", "TND", date(2026, 3, 10)) == Decimal("3.10")
+        assert rate_on("USD", "TND", date(2026, 3, 20)) == Decimal("3.20")
+        assert convert(Decimal("30"), "EUR", "TND", date(2026, 3, 20)) == Decimal("100.00")
+        assert rate_on("GBP", "TND", date(2026, 3, 20)) is None
+        assert convert(Decimal("30"), "GBP", "TND", date(2026, 3, 20)) is None
+
+    def test_reimport_updates_rates(self, rates, load):
+        load("date,base,quote,rate\n2026-03-15,USD,TND,3.25\n")
+        assert ExchangeRate.objects.get(base="USD", quote="TND", date=date(2026, 3, 15)).rate == Decimal("3.25")
+
+    def test_bad_dates_and_rates_are_reported_by_line(self, rates, load):
+        text = ("date,base,quote,rate\n2026-04-01,USD,TND,3.30\n2026-02-30,USD,TND,3.40\n"
+                "01/04/2026,USD,EUR,0.90\n2026-04-02,USD,EUR,abc\n")
+        with pytest.raises(CommandError) as error:
+            load(text)
+        message = str(error.value)
+        assert "line 3: '2026-02-30'" in message
+        assert "line 4: '01/04/2026'" in message
+        assert "line 5:" in message and "line 2:" not in message
+        # nothing from a rejected file is written
+        assert not ExchangeRate.objects.filter(date=date(2026, 4, 1)).exists()
+
+
+@pytest.mark.django_db
+class TestHomeCurrencyTotals:
+
+    @pytest.fixture
+    def user(self):
+        user = User.objects.create_user(username="fxbunny", password="carrots")
+        UserProfile.objects.create(user=user, salary_amount=Decimal("1000"), home_currency="TND")
+        return user
+
+    @pytest.fixture
+    def expenses(self, user):
+        for base, quote, day, rate in [("USD", "TND", date(2026, 3, 1), "3.10"), ("USD", "TND", date(2026, 3, 15), "3.20")]:
+            ExchangeRate.objects.create(base=base, quote=quote, date=day, rate=Decimal(rate))
+        Expense.objects.create(user=user, amount=Decimal("10.00"), currency="USD", spent_at=at(date(2026, 3, 5)))
+        Expense.objects.create(user=user, amount=Decimal("10.00"), currency="USD", spent_at=at(date(2026, 3, 20)))
+        Expense.objects.create(user=user, amount=Decimal("50.00"), currency="TND", spent_at=at(date(2026, 3, 21)))
+
+    def test_ledger_is_kept_in_home_currency(self, user, expenses):
+        total = MonthlySpend.objects.get(user=user, month=date(2026, 3, 1), category="*")
+        assert total.total == Decimal("113.00")
+
+    def test_rebuild_converts_inside_the_query(self, user, expenses, django_assert_max_num_queries):
+        with django_assert_max_num_queries(5):
+            rebuild_spend_ledger([user.id])
+        total = MonthlySpend.objects.get(user=user, month=date(2026, 3, 1), category="*")
+        assert total.total == Decimal("113.00")
+
+    def test_rebuild_rounds_each_expense_like_the_incremental_ledger(self, user):
+        ExchangeRate.objects.create(base="GBP", quote="TND", date=date(2026, 3, 1), rate=Decimal("3.105"))
+        for _ in range(3):
+            # 1.01 * 3.105 = 3.13605 -> 3.14 each, 9.42 in total (9.41 if rounded only once)
+            Expense.objects.create(user=user, amount=Decimal("1.01"), currency="GBP", spent_at=at(date(2026, 3, 5)))
+        incremental = MonthlySpend.objects.get(user=user, month=date(2026, 3, 1), category="*").total
+        _, grouped = expense_cube(user.id, date(2026, 3, 1), date(2026, 3, 30), ["currency"])
+
+        rebuild_spend_ledger([user.id])
+        rebuilt = MonthlySpend.objects.get(user=user, month=date(2026, 3, 1), category="*").total
+        assert incremental == rebuilt == grouped[0]["home_total"] == Decimal("9.42")
+
+    def test_cube_reports_home_totals(self, user, expenses):
+        _, rollup = expense_cube(user.id, date(2026, 3, 1), date(2026, 3, 31), ["currency"])
+        _, grouped = expense_cube(user.id, date(2026, 3, 1), date(2026, 3, 30), ["currency"])
+        assert rollup == grouped == [
+            {"currency": "TND", "total": Decimal("50.00"), "home_total": Decimal("50.00"), "count": 1, "unpriced": 0},
+            {"currency": "USD", "total": Decimal("20.00"), "home_total": Decimal("63.00"), "count": 2, "unpriced": 0},
+        ]
+
+    def test_changing_home_currency_reprices_ledger(self, user, expenses):
+        ExchangeRate.objects.create(base="TND", quote="EUR", date=date(2026, 3, 1), rate=Decimal("0.30"))
+        profile = UserProfile.objects.get(user=user)
+        profile.home_currency = "EUR"
+        profile.save()
+
+        total = MonthlySpend.objects.get(user=user, month=date(2026, 3, 1), category="*")
+        # TND converts via the rate; USD has no EUR rate and is left out, counted as unpriced
+        assert (total.total, total.count, total.unpriced) == (Decimal("15.00"), 3, 2)
+        status = budget_status(user.id, date(2026, 3, 31))
+        assert (status["currency"], status["unpriced"]) == ("EUR", 2)
+
+        rebuild_spend_ledger([user.id])
+        total = MonthlySpend.objects.get(user=user, month=date(2026, 3, 1), category="*")
+        assert (total.total, total.count, total.unpriced) == (Decimal("15.00"), 3, 2)
@@ -0,0 +1,190 @@
+import csv
+import io
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+
+from api.expense_import import import_expenses
+from api.models import Expense, MonthlySpend
+
+User = get_user_model()
+
+CSV_FILE = """Date,Amount,Description,Category
+2026-03-01,-12.50,Coffee beans,food
+2026-03-02,-40.00,Groceries,food
+2026-03-02,-40.00,Groceries,food
+not-a-date,-5.00,Broken row,
+2026-03-03,abc,Bad amount,
+2026-03-04,15.00,Refund,food
+"""
+
+OFX_FILE = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS>
+<CURDEF>EUR
+<BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20260305120000<TRNAMT>-23.10<NAME>Bookshop<MEMO>Novel</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20260306
+<TRNAMT>1500.00
+<NAME>Salary
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+QIF_FILE = """!Type:Bank
+D03/07/2026
+T-9.99
+PStreaming
+LSubscriptions
+^
+D03/08/2026
+T-4.50
+PBakery
+^
+"""
+
+
+def lines(text):
+    return io.StringIO(text, newline="")
+
+
+@pytest.mark.django_db
+class TestExpenseImport:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="importbunny", password="carrots")
+
+    def test_csv_rows_are_validated(self, user):
+        report = import_expenses(user, lines(CSV_FILE), "csv")
+
+        # the two identical grocery rows are two purchases, not a duplicate
+        assert (report.rows, report.imported, report.duplicates, report.error_count) == (6, 3, 0, 2)
+        assert report.skipped == 1
+        assert {error["line"] for error in report.errors} == {5, 6}
+        assert sorted(Expense.objects.filter(user=user).values_list("amount", flat=True)) == [
+            Decimal("12.50"), Decimal("40.00"), Decimal("40.00"),
+        ]
+
+    def test_reimport_skips_existing_expenses(self, user):
+        Expense.objects.create(user=user, amount=Decimal("40.00"), note="Groceries",
+                               spent_at=timezone.make_aware(datetime(2026, 3, 2, 9)))
+
+        # the existing expense matches the first grocery row only
+        report = import_expenses(user, lines(CSV_FILE), "csv")
+        assert report.imported == 2
+        assert report.duplicates == 1
+
+        again = import_expenses(user, lines(CSV_FILE), "csv")
+        assert (again.imported, again.duplicates) == (0, 3)
+        assert Expense.objects.filter(user=user).count() == 3
+
+    def test_malformed_csv_is_reported_as_a_file_error(self, user):
+        text = "date,amount,note\n2026-03-01,-1.00," + "x" * (csv.field_size_limit() + 1) + "\n"
+        report = import_expenses(user, lines(text), "csv")
+
+        assert report.imported == 0
+        assert [error["line"] for error in report.errors] == [None]
+        assert "field larger than field limit" in report.errors[0]["error"]
+
+    def test_ofx_imports_debits_only(self, user):
+        report = import_expenses(user, lines(OFX_FILE), "ofx")
+
+        assert (report.rows, report.imported, report.skipped) == (2, 1, 1)
+        expense = Expense.objects.get(user=user)
+        assert (expense.amount, expense.currency, expense.note) == (Decimal("23.10"), "EUR", "Bookshop - Novel")
+        assert timezone.localdate(expense.spent_at) == date(2026, 3, 5)
+
+    def test_qif_records(self, user):
+        report = import_expenses(user, lines(QIF_FILE), "qif")
+
+        assert report.imported == 2
+        assert Expense.objects.get(user=user, note="Streaming").category == "Subscriptions"
+
+    def test_batches_and_ledger_rebuild(self, user, django_assert_max_num_queries):
+        rows = "".join(f"2026-03-{day % 28 + 1:02d},{day}.00,Item {day},misc\n" for day in range(1, 501))
+        progress = []
+
+        # plus the home currency lookup and the change feed write, which SQLite splits into ~100-row chunks
+        with django_assert_max_num_queries(28):
+            report = import_expenses(user, lines("date,debit,note,category\n" + rows), "csv",
+                                     batch_size=200, progress=lambda r: progress.append(r.imported))
+
+        assert report.imported == 500
+        assert progress == [200, 400, 500]
+        total = MonthlySpend.objects.get(user=user, month=date(2026, 3, 1), category="*")
+        assert (total.total, total.count, total.unpriced) == (Decimal(sum(range(1, 501))), 500, 0)
+        assert set(Expense.objects.filter(user=user).values_list("currency", flat=True)) == {"TND"}
+
+    def test_csv_debit_credit_columns_and_types(self, user):
+        report = import_expenses(user, lines(
+            "Date,Debit,Credit,Description\n"
+            "2026-03-01,12.00,,Lunch\n"
+            "2026-03-02,,300.00,Salary\n"
+        ), "csv")
+        assert (report.imported, report.skipped) == (1, 1)
+
+        report = import_expenses(user, lines(
+            "Date,Amount,Type,Description\n"
+            "2026-03-03,8.00,DR,Taxi\n"
+            "2026-03-04,8.00,CR,Taxi refund\n"
+        ), "csv")
+        assert (report.imported, report.skipped) == (1, 1)
+        assert sorted(Expense.objects.filter(user=user).values_list("note", flat=True)) == ["Lunch", "Taxi"]
+
+    def test_decimal_comma_and_thousands_separators(self, user):
+        report = import_expenses(user, lines(
+            "date,amount,note\n"
+            '05.03.2026,"-12,50",Cafe\n'
+            '06.03.2026,"-1.234,50",Rent\n'
+            '07.03.2026,"-1,234",Laptop\n'
+            '08.03.2026,"-2,345.60",Phone\n'
+        ), "csv")
+        assert report.imported == 4
+        assert dict(Expense.objects.filter(user=user).values_list("note", "amount")) == {
+            "Cafe": Decimal("12.50"), "Rent": Decimal("1234.50"),
+            "Laptop": Decimal("1234.00"), "Phone": Decimal("2345.60"),
+        }
+
+    def test_missing_csv_columns_are_reported(self, user):
+        report = import_expenses(user, lines("when,what\n2026-01-01,x\n"), "csv")
+        assert report.imported == 0
+        assert "date and an amount" in report.errors[0]["error"]
+
+
+@pytest.mark.django_db
+class TestExpenseImportEndpoint:
+
+    def test_upload_reports_each_file(self, authenticated_client):
+        response = authenticated_client.post("/api/shopping/expenses/import/", {
+            "files": [
+                SimpleUploadedFile("bank.csv", CSV_FILE.encode()),
+                SimpleUploadedFile("card.qif", QIF_FILE.encode()),
+            ],
+        }, format="multipart")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        reports = {report["file"]: report for report in response.data["files"]}
+        assert reports["bank.csv"]["imported"] == 3
+        assert reports["card.qif"]["imported"] == 2
+        assert Expense.objects.filter(user=authenticated_client.user).count() == 5
+
+    def test_rejects_unknown_file_type(self, authenticated_client):
+        response = authenticated_client.post("/api/shopping/expenses/import/",
+                               {"files": [SimpleUploadedFile("notes.txt", b"hello")]}, format="multipart")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_management_command(self, tmp_path):
+        user = User.objects.create_user(username="cmdbunny", password="carrots")
+        path = tmp_path / "export.ofx"
+        path.write_text(OFX_FILE)
+
+        call_command("import_expenses", str(path), user=user.id, stdout=io.StringIO())
+        assert Expense.objects.filter(user=user, currency="EUR").count() == 1
@@ -0,0 +1,74 @@
+# tests/test_focus_metrics.py
+from datetime import datetime, timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.focus_metrics import time_slot_for
+from api.models import FocusMetric, FocusSession
+
+User = get_user_model()
+
+
+def local(hour, minute=0, days_ago=0):
+    day = timezone.localdate() - timedelta(days=days_ago)
+    return timezone.make_aware(datetime(day.year, day.month, day.day, hour, minute))
+
+
+@pytest.mark.django_db
+class TestFocusMetricAggregation:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="metricbunny", password="x")
+
+    def test_time_slots(self):
+        assert time_slot_for(local(9)) == "morning"
+        assert time_slot_for(local(13)) == "afternoon"
+        assert time_slot_for(local(19)) == "evening"
+        assert time_slot_for(local(2)) == "night"
+
+    def test_running_average_on_created_sessions(self, user):
+        FocusSession.objects.create(user=user, started_at=local(9), ended_at=local(9, 30), interruptions=2)
+        FocusSession.objects.create(user=user, started_at=local(10), ended_at=local(10, 50), interruptions=0)
+
+        metric = FocusMetric.objects.get(user=user, time_slot="morning")
+        assert metric.session_count == 2
+        assert metric.avg_effective_minutes == pytest.approx(40)
+        assert metric.avg_interruptions == pytest.approx(1)
+
+    def test_unfinished_session_not_counted_until_end(self, user):
+        session = FocusSession.objects.create(user=user, started_at=timezone.now() - timedelta(minutes=20))
+        assert not FocusMetric.objects.exists()
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+        client.post(f"/api/focus-sessions/{session.id}/end/")
+
+        metric = FocusMetric.objects.get(user=user)
+        assert metric.session_count == 1
+        assert metric.avg_effective_minutes == pytest.approx(20)
+
+    def test_resaving_ended_session_does_not_double_count(self, user):
+        session = FocusSession.objects.create(user=user, started_at=local(14), ended_at=local(14, 25))
+        session.notes = "felt good"
+        session.save()
+        FocusSession.objects.get(pk=session.pk).save()
+
+        assert FocusMetric.objects.get(user=user).session_count == 1
+
+    def test_backfill_matches_incremental(self, user):
+        FocusSession.objects.create(user=user, started_at=local(9), ended_at=local(9, 30))
+        FocusSession.objects.create(user=user, started_at=local(20, days_ago=1), ended_at=local(21, days_ago=1))
+        FocusSession.objects.create(user=user, started_at=local(20, 5, days_ago=1), ended_at=local(20, 35, days_ago=1))
+        incremental = set(FocusMetric.objects.values_list("date", "time_slot", "session_count", "avg_effective_minutes"))
+
+        FocusMetric.objects.all().delete()
+        call_command("backfill_focus_metrics", chunk_size=1)
+
+        rebuilt = set(FocusMetric.objects.values_list("date", "time_slot", "session_count", "avg_effective_minutes"))
+        assert rebuilt == incremental
+        assert len(rebuilt) == 2
@@ -1,12 +1,15 @@
 # tests/test_focus_sessions.py
+import json
 import pytest
 from datetime import timedelta
 from django.utils import timezone
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 from rest_framework import status
 
-from api.models import FocusMode, FocusSession, RewardSummary, Task
+from api.models import Category, FocusMode, FocusSession, Hobby, RewardSummary, Task
 from api.serializers import FocusSessionSerializer, StartFocusSessionSerializer
 
 
@@ -205,4 +208,112 @@ class TestFocusRewardIntegration:
 
         summary = RewardSummary.objects.get(user=user)
         assert summary.xp >= 67
-        assert summary.coins >= 6   # 67 // 10 = 6
\ No newline at end of file
+        assert summary.coins >= 6   # 67 // 10 = 6
+
+@pytest.mark.django_db
+class TestAllSessionsExport:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="exportbunny", password="x")
+
+    @pytest.fixture
+    def auth_client(self, user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client
+
+    @pytest.fixture
+    def sessions(self, user):
+        now = timezone.now()
+        return [
+            FocusSession.objects.create(
+                user=user,
+                mode_name=f"Mode {i}",
+                started_at=now - timedelta(hours=i + 1),
+                ended_at=now - timedelta(hours=i),
+            )
+            for i in range(5)
+        ]
+
+    def test_jsonl_stream(self, auth_client, sessions):
+        response = auth_client.get("/api/focus/sessions/", {"stream": "jsonl"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        assert [r["id"] for r in rows] == [s.id for s in sessions]
+        assert rows[0]["mode"] == "Mode 0"
+        assert rows[0]["effective_minutes"] == 60
+
+    def test_json_array_stream(self, auth_client, sessions):
+        response = auth_client.get("/api/focus/sessions/", {"stream": "json"})
+        rows = json.loads(b"".join(response.streaming_content))
+        assert len(rows) == 5
+
+    def test_default_is_a_plain_array(self, auth_client, sessions):
+        response = auth_client.get("/api/focus/sessions/")
+        assert response.status_code == status.HTTP_200_OK
+        rows = json.loads(b"".join(response.streaming_content))
+        assert [r["id"] for r in rows] == [s.id for s in sessions]
+        assert rows[0]["mode"] == "Mode 0"
+
+    def test_keyset_pages(self, auth_client, sessions):
+        first = auth_client.get("/api/focus/sessions/", {"page_size": 3})
+        assert [r["id"] for r in first.data["results"]] == [s.id for s in sessions[:3]]
+
+        second = auth_client.get(first.data["next"])
+        assert [r["id"] for r in second.data["results"]] == [s.id for s in sessions[3:]]
+        assert second.data["next"] is None
+
+
+@pytest.mark.django_db
+class TestFocusSessionListQueries:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="querybunny", password="x")
+
+    @pytest.fixture
+    def auth_client(self, user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client
+
+    def add_sessions(self, user, count):
+        category = Category.objects.create(user=user, name=f"Cat {count}")
+        hobby = Hobby.objects.create(user=user, name=f"Hobby {count}", description="")
+        for i in range(count):
+            session = FocusSession.objects.create(user=user, mode_name="Pomodoro")
+            session.related_tasks.set([
+                Task.objects.create(user=user, title=f"Task {i}-{j}", category=category, hobby=hobby)
+                for j in range(2)
+            ])
+
+    def count_queries(self, auth_client, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.get("/api/focus-sessions/", params or {})
+        assert response.status_code == status.HTTP_200_OK
+        return len(ctx.captured_queries), response
+
+    @pytest.mark.parametrize("params", [{}, {"expand": "related_tasks"}])
+    def test_query_count_constant_as_sessions_grow(self, auth_client, user, params):
+        self.add_sessions(user, 2)
+        small, _ = self.count_queries(auth_client, params)
+
+        self.add_sessions(user, 8)
+        large, response = self.count_queries(auth_client, params)
+
+        assert len(response.data) == 10
+        assert large == small
+
+    def test_compact_projection_by_default(self, auth_client, user):
+        self.add_sessions(user, 1)
+
+        _, response = self.count_queries(auth_client)
+        assert set(response.data[0]["related_tasks"][0]) == {"id", "title", "status"}
+
+        _, response = self.count_queries(auth_client, {"expand": "related_tasks"})
+        assert response.data[0]["related_tasks"][0]["category_name"] == "Cat 1"
+        assert response.data[0]["related_tasks"][0]["hobby_name"] == "Hobby 1"
@@ -6,7 +6,8 @@ from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 
-from api.models import Hobby, HobbyActivity
+from api.hobbies import notify_inactive_hobbies, rebuild_hobby_summaries
+from api.models import Hobby, HobbyActivity, HobbyMetricValue, HobbySummary, Notification
 from api.serializers import HobbySerializer, HobbyActivitySerializer
 
 User = get_user_model()
@@ -207,4 +208,141 @@ class TestHobbyActivityEndpoints:
 
         response = auth_client.post(f"/api/hobby-activities/", data, format="json")
         assert response.status_code == status.HTTP_201_CREATED
-        assert response.data["notes"] == "Gratitude entry today"
\ No newline at end of file
+        assert response.data["notes"] == "Gratitude entry today"
+
+@pytest.mark.django_db
+class TestHobbySummary:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="summarybunny", password="carrots")
+
+    @pytest.fixture
+    def hobby(self, user):
+        return Hobby.objects.create(user=user, name="Pottery", description="Wheel throwing")
+
+    def test_activity_writes_keep_summary_current(self, user, hobby):
+        now = timezone.now()
+        first = HobbyActivity.objects.create(user=user, hobby=hobby, timestamp=now - timedelta(days=3),
+                                             custom_data={"duration_minutes": 45})
+        latest = HobbyActivity.objects.create(user=user, hobby=hobby, timestamp=now - timedelta(days=1),
+                                              custom_data={"time_spent": 30})
+        summary = HobbySummary.objects.get(hobby=hobby)
+        assert (summary.activity_count, summary.total_minutes, summary.last_activity_at) == (2, 75, latest.timestamp)
+
+        first = HobbyActivity.objects.get(pk=first.pk)
+        first.custom_data = {"duration_minutes": 60}
+        first.save()
+        HobbyActivity.objects.get(pk=latest.pk).delete()
+
+        summary.refresh_from_db()
+        assert (summary.activity_count, summary.total_minutes, summary.last_activity_at) == (1, 60, first.timestamp)
+
+    def test_rebuild_matches_incremental_summary(self, user, hobby):
+        for days in (1, 5):
+            HobbyActivity.objects.create(user=user, hobby=hobby, timestamp=timezone.now() - timedelta(days=days),
+                                         custom_data={"duration_min": days * 10})
+        before = HobbySummary.objects.values().get(hobby=hobby)
+
+        rebuild_hobby_summaries(Hobby.objects.filter(pk=hobby.pk))
+        assert HobbySummary.objects.values().get(hobby=hobby) == before
+
+    def test_check_inactivity_is_one_query(self, user, hobby, django_assert_max_num_queries):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        active = Hobby.objects.create(user=user, name="Running", description="5k")
+        HobbyActivity.objects.create(user=user, hobby=active)
+        stale = Hobby.objects.create(user=user, name="Chess", description="Openings")
+        HobbyActivity.objects.create(user=user, hobby=stale, timestamp=timezone.now() - timedelta(days=40))
+        Hobby.objects.create(user=user, name="Knitting", description="Scarves", frozen=True)
+
+        with django_assert_max_num_queries(2):
+            response = client.get("/api/hobbies/check-inactivity/")
+        assert response.status_code == status.HTTP_200_OK
+        assert {hobby["name"] for hobby in response.data["inactive"]} == {"Pottery", "Chess"}
+
+    def test_nightly_batch_notifies_once_per_period(self, user, hobby):
+        other = User.objects.create_user(username="otherbunny", password="carrots")
+        Hobby.objects.create(user=other, name="Baking", description="Bread")
+
+        assert notify_inactive_hobbies() == 2
+        assert Notification.objects.filter(type="hobby_inactive").count() == 2
+        assert notify_inactive_hobbies() == 0
+
+        assert notify_inactive_hobbies(now=timezone.now() + timedelta(days=31)) == 2
+
+
+@pytest.mark.django_db
+class TestHobbyMetrics:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="metricbunny", password="carrots")
+
+    @pytest.fixture
+    def hobby(self, user):
+        return Hobby.objects.create(user=user, name="Painting", description="Watercolours",
+                                    metric_fields={"minutes": "duration", "enjoyment": "rating"})
+
+    @pytest.fixture
+    def auth_client(self, user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client
+
+    def log(self, user, hobby, days_ago, **custom_data):
+        return HobbyActivity.objects.create(user=user, hobby=hobby, custom_data=custom_data,
+                                            timestamp=timezone.now() - timedelta(days=days_ago))
+
+    def test_declared_fields_are_extracted_at_write_time(self, user, hobby):
+        activity = self.log(user, hobby, 0, minutes="1:30", enjoyment=8, colour="blue")
+        assert dict(HobbyMetricValue.objects.filter(activity=activity).values_list("field", "value")) == {
+            "minutes": 90.0, "enjoyment": 8.0,
+        }
+
+        activity.custom_data = {"minutes": 45}
+        activity.save()
+        assert list(HobbyMetricValue.objects.filter(activity=activity).values_list("field", "value")) == [
+            ("minutes", 45.0),
+        ]
+
+    def test_changing_metric_fields_reindexes(self, user, hobby):
+        self.log(user, hobby, 1, minutes=30, pages=12)
+        hobby = Hobby.objects.get(pk=hobby.pk)
+        hobby.metric_fields = {"pages": "number"}
+        hobby.save()
+        assert list(HobbyMetricValue.objects.filter(hobby=hobby).values_list("field", "value")) == [("pages", 12.0)]
+
+    def test_api_rejects_badly_typed_values(self, auth_client, hobby):
+        response = auth_client.post("/api/hobby-activities/", {
+            "hobby": hobby.id, "custom_data": {"enjoyment": 42},
+        }, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "enjoyment" in response.data["custom_data"]
+
+        response = auth_client.patch(f"/api/hobbies/{hobby.id}/", {"metric_fields": {"x": "colour"}}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_metrics_series(self, auth_client, user, hobby, django_assert_max_num_queries):
+        self.log(user, hobby, 0, minutes=30, enjoyment=6)
+        self.log(user, hobby, 0, minutes=60, enjoyment=10)
+        self.log(user, hobby, 2, minutes=20)
+        self.log(user, hobby, 60, minutes=500)
+
+        with django_assert_max_num_queries(3):
+            response = auth_client.get(f"/api/hobbies/{hobby.id}/metrics/", {"field": "minutes"})
+        assert response.status_code == status.HTTP_200_OK
+        minutes = response.data["series"]["minutes"]
+        assert [(row["sum"], row["min"], row["max"], row["count"]) for row in minutes] == [
+            (20.0, 20.0, 20.0, 1), (90.0, 30.0, 60.0, 2),
+        ]
+        assert minutes[-1]["period"] == timezone.localdate()
+
+        response = auth_client.get(f"/api/hobbies/{hobby.id}/metrics/", {"bucket": "month"})
+        assert set(response.data["series"]) == {"minutes", "enjoyment"}
+        assert response.data["series"]["enjoyment"][0]["avg"] == 8.0
+
+    def test_metrics_reject_impossible_dates(self, auth_client, hobby):
+        response = auth_client.get(f"/api/hobbies/{hobby.id}/metrics/", {"start": "2026-02-30"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "start" in response.data
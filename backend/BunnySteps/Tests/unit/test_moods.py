@@ -1,12 +1,14 @@
 # tests/test_moods.py
 import pytest
 from datetime import timedelta
+from django.core.cache import caches
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 
 from api.models import MoodLog
+from api.moods import insights_cache_key
 from api.serializers import MoodLogSerializer
 from api.views import MoodLogViewSet
 
@@ -179,4 +181,61 @@ class TestMoodInsightsLogic:
 
         trend = response.data["weekly_trend"]
         assert len(trend) == 7
-        assert all(item["mood"] == 5.0 for item in trend)  # average 5 each day
\ No newline at end of file
+        assert all(item["mood"] == 5.0 for item in trend)  # average 5 each day
+
+@pytest.mark.django_db
+class TestMoodInsightsQueries:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="cachebun", password="x")
+
+    @pytest.fixture
+    def auth_client(self, user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client
+
+    def log(self, user, rating, days_ago=0):
+        log = MoodLog.objects.create(user=user, mood="ok", rating=rating)
+        MoodLog.objects.filter(pk=log.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+        return log
+
+    def test_values_from_single_grouped_query(self, auth_client, user, django_assert_max_num_queries):
+        self.log(user, 4)
+        self.log(user, 8)
+        self.log(user, 9, days_ago=2)
+
+        with django_assert_max_num_queries(2):  # grouped summary + streak
+            response = auth_client.get("/api/mood-logs/insights/")
+
+        data = response.data
+        assert data["today_checkins"] == 2
+        assert data["weekly_average"] == 7.0
+        assert data["weekly_trend"][-1]["mood"] == 6.0
+        assert data["weekly_trend"][-3]["mood"] == 9.0
+        assert data["best_day"] == data["weekly_trend"][-3]["time"]
+
+    def test_cached_until_a_log_changes(self, auth_client, user, django_assert_num_queries):
+        log = self.log(user, 5)
+        auth_client.get("/api/mood-logs/insights/")
+
+        with django_assert_num_queries(0):
+            cached = auth_client.get("/api/mood-logs/insights/")
+        assert cached.data["today_checkins"] == 1
+
+        self.log(user, 9)
+        assert auth_client.get("/api/mood-logs/insights/").data["today_checkins"] == 2
+
+        log.delete()
+        assert auth_client.get("/api/mood-logs/insights/").data["today_checkins"] == 1
+
+    def test_log_writes_invalidate_insights_for_other_workers(self, auth_client, user):
+        # another gunicorn worker: its own cache handle, built from the same settings
+        other_worker = caches.create_connection("default")
+        key = insights_cache_key(user.id, timezone.localdate())
+        auth_client.get("/api/mood-logs/insights/")
+        assert other_worker.get(key) is not None
+
+        self.log(user, 7)
+        assert other_worker.get(key) is None
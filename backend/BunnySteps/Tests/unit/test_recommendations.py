@@ -0,0 +1,86 @@
+# tests/test_recommendations.py
+from datetime import datetime
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.focus_metrics import time_slot_for
+from api.models import FocusProfile, FocusSession
+from api.recommendations import fold_session, recommend
+
+User = get_user_model()
+
+
+def local(hour, minute=0):
+    day = timezone.localdate()
+    return timezone.make_aware(datetime(day.year, day.month, day.day, hour, minute))
+
+
+@pytest.mark.django_db
+class TestAdaptiveRecommendation:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="adaptivebunny", password="x")
+
+    def test_fold_session_is_exponentially_weighted(self):
+        entry = fold_session(None, 40, 0, False)
+        assert entry == [40.0, 0.0, 0.0, 1]
+
+        entry = fold_session(entry, 20, 2, True)
+        assert entry[0] == pytest.approx(34.0)
+        assert entry[1] == pytest.approx(0.6)
+        assert entry[2] == pytest.approx(0.3)
+        assert entry[3] == 2
+
+    def test_profile_updated_on_session_end(self, user):
+        FocusSession.objects.create(user=user, started_at=local(9), ended_at=local(9, 45))
+        FocusSession.objects.create(user=user, started_at=local(15), ended_at=local(15, 15), interruptions=3)
+
+        slots = FocusProfile.objects.get(user=user).slots
+        assert slots["morning"][0] == 45
+        assert slots["afternoon"][1] == 3
+
+        result = recommend(user.id, "afternoon")
+        assert result["best_slot"] == "morning"
+        assert result["recommended_length"] < 15
+
+    def test_unknown_slot_blends_other_slots(self, user):
+        FocusSession.objects.create(user=user, started_at=local(9), ended_at=local(9, 30))
+
+        result = recommend(user.id, "night")
+        assert result["recommended_length"] == 30
+        assert result["best_slot"] == "morning"
+
+    def test_refreshed_profile_is_seen_by_other_workers(self, user):
+        # another gunicorn worker: its own cache handle, built from the same settings
+        other_worker = caches.create_connection("default")
+        assert not isinstance(other_worker, LocMemCache)
+
+        FocusSession.objects.create(user=user, started_at=local(9), ended_at=local(9, 45))
+        assert other_worker.get(f"focus-profile:{user.id}")["morning"][3] == 1
+        FocusSession.objects.create(user=user, started_at=local(9, 50), ended_at=local(10, 20))
+        assert other_worker.get(f"focus-profile:{user.id}")["morning"][3] == 2
+
+    def test_endpoint_is_served_without_session_queries(self, user, django_assert_max_num_queries):
+        FocusSession.objects.create(user=user, started_at=local(10), ended_at=local(10, 50))
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        with django_assert_max_num_queries(0):
+            response = client.get("/api/focus/recommendation/")
+
+        assert response.status_code == 200
+        assert response.data["time_slot"] == time_slot_for(timezone.now())
+        assert response.data["best_slot"] == "morning"
+
+    def test_endpoint_without_history(self, user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        response = client.get("/api/focus/recommendation/")
+        assert response.data == {"message": "Not enough focus history."}
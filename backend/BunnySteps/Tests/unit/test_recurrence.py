@@ -0,0 +1,160 @@
+import io
+from datetime import date, datetime, timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.models import Occurrence, RecurrenceSeries, Reminder, Task
+from api.recurrence import HORIZON_DAYS, compile_rule, occurrences_between
+
+
+def local(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+def expand(rule, dtstart, days=60):
+    return list(compile_rule(rule).between(dtstart, dtstart, dtstart + timedelta(days=days)))
+
+
+class TestRules:
+
+    def test_human_and_rrule_text_compile_to_the_same_rule(self):
+        assert compile_rule("every Mon, Wed") == compile_rule("FREQ=WEEKLY;BYDAY=MO,WE")
+        assert compile_rule("weekdays") == compile_rule("RRULE:FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR")
+        assert compile_rule("every 2 weeks on fri") == compile_rule("FREQ=WEEKLY;INTERVAL=2;BYDAY=FR")
+        assert compile_rule("monthly on the 1st, 15th") == compile_rule("FREQ=MONTHLY;BYMONTHDAY=1,15")
+
+    @pytest.mark.parametrize("rule", [
+        "sometimes", "FREQ=HOURLY", "every 0 days", "monthly on the 40th", "every blurday",
+        "FREQ=WEEKLY;BYMONTHDAY=1", "FREQ=YEARLY;BYMONTHDAY=1", "every 2 years on mon", "FREQ=WEEKLY;BYDAY=2MO",
+    ])
+    def test_invalid_rules_raise(self, rule):
+        with pytest.raises(ValueError):
+            compile_rule(rule)
+
+    def test_weekly_by_day_keeps_time_of_day(self):
+        start = local(2026, 10, 17, 9, 30)  # a Saturday
+        got = expand("every Mon,Wed", start, days=10)
+        assert [(d.date(), d.hour, d.minute) for d in got] == [
+            (date(2026, 10, 19), 9, 30), (date(2026, 10, 21), 9, 30),
+            (date(2026, 10, 26), 9, 30),
+        ]
+
+    def test_month_end_and_last_weekday(self):
+        start = local(2026, 1, 31, 8)
+        assert [d.date() for d in expand("monthly", start, days=100)] == [date(2026, 1, 31), date(2026, 3, 31)]
+        assert [d.date() for d in expand("every month on the last day", start, days=40)] == [
+            date(2026, 1, 31), date(2026, 2, 28),
+        ]
+        assert [d.date() for d in expand("FREQ=MONTHLY;BYDAY=-1FR", start, days=40)] == [date(2026, 2, 27)]
+
+    def test_monthly_byday_and_bymonthday_intersect(self):
+        start = local(2026, 1, 1, 8)
+        assert [d.date() for d in expand("FREQ=MONTHLY;BYDAY=FR;BYMONTHDAY=13", start, days=365)] == [
+            date(2026, 2, 13), date(2026, 3, 13), date(2026, 11, 13),
+        ]
+
+    def test_count_and_until_end_the_series(self):
+        start = local(2026, 10, 1, 7)
+        assert len(expand("daily 5 times", start)) == 5
+        assert expand("daily until 2026-10-03", start)[-1].date() == date(2026, 10, 3)
+
+    def test_skips_ahead_to_the_requested_window(self):
+        rule = compile_rule("every 3 days")
+        start = local(2020, 1, 1, 12)
+        window = local(2026, 10, 1)
+        got = list(rule.between(start, window, window + timedelta(days=7)))
+        assert len(got) in (2, 3)
+        assert all((d - start).days % 3 == 0 for d in got)
+
+
+@pytest.mark.django_db
+class TestMaterialisedOccurrences:
+
+    @pytest.fixture
+    def user(self, authenticated_client):
+        return authenticated_client.user
+
+    def test_task_rule_materialises_up_to_the_horizon(self, user):
+        task = Task.objects.create(user=user, title="Stretch", recurrence_rule="daily",
+                                   preferred_datetime=timezone.now() + timedelta(hours=1))
+        series = RecurrenceSeries.objects.get(task=task)
+        assert series.occurrences.count() == HORIZON_DAYS
+        assert series.materialised_until >= timezone.now() + timedelta(days=HORIZON_DAYS - 1)
+
+    def test_tasks_without_rules_get_no_series(self, user):
+        with CaptureQueriesContext(connection) as queries:
+            Task.objects.create(user=user, title="One-off")
+            task = Task.objects.get(title="One-off")
+            task.title = "Still one-off"
+            task.save()
+        assert not any("api_recurrenceseries" in query["sql"] for query in queries.captured_queries)
+        assert not RecurrenceSeries.objects.exists()
+
+    def test_editing_the_rule_only_replaces_that_series_future(self, user):
+        soon = timezone.now() + timedelta(hours=1)
+        task = Task.objects.create(user=user, title="Gym", recurrence_rule="daily", preferred_datetime=soon)
+        other = Reminder.objects.create(user=user, title="Water", repeat_rule="daily", remind_at=soon)
+        other_ids = set(Occurrence.objects.filter(series__reminder=other).values_list("id", flat=True))
+
+        task = Task.objects.get(pk=task.pk)
+        task.recurrence_rule = "every 7 days"
+        task.save()
+
+        assert Occurrence.objects.filter(series__task=task).count() == 5
+        assert set(Occurrence.objects.filter(series__reminder=other).values_list("id", flat=True)) == other_ids
+
+    def test_clearing_the_rule_drops_the_series(self, user):
+        reminder = Reminder.objects.create(user=user, title="Pills", repeat_rule="daily", remind_at=timezone.now())
+        reminder.repeat_rule = ""
+        reminder.save()
+        assert not RecurrenceSeries.objects.exists()
+        assert not Occurrence.objects.exists()
+
+    def test_ranges_past_the_horizon_extend_lazily(self, user):
+        Task.objects.create(user=user, title="Plants", recurrence_rule="weekly",
+                            preferred_datetime=timezone.now() + timedelta(hours=1))
+        now = timezone.now()
+        assert occurrences_between(user.id, now, now + timedelta(days=90)).count() == 13
+        assert RecurrenceSeries.objects.get().materialised_until == now + timedelta(days=90)
+
+    def test_finite_series_is_marked_exhausted(self, user):
+        Task.objects.create(user=user, title="Course", recurrence_rule="daily 3 times",
+                            preferred_datetime=timezone.now() + timedelta(hours=1))
+        series = RecurrenceSeries.objects.get()
+        assert series.exhausted
+        assert series.occurrences.count() == 3
+
+    def test_command_syncs_rules_written_before_materialisation(self, user):
+        Task.objects.bulk_create([Task(user=user, title="Old", recurrence_rule="daily",
+                                       preferred_datetime=timezone.now() + timedelta(hours=1))])
+        call_command("materialise_occurrences", "--sync", "--days", "10", stdout=io.StringIO())
+        assert Occurrence.objects.count() == HORIZON_DAYS
+
+
+@pytest.mark.django_db
+class TestOccurrenceApi:
+
+    def test_upcoming_lists_tasks_and_reminders_in_order(self, authenticated_client):
+        user = authenticated_client.user
+        now = timezone.now()
+        Task.objects.create(user=user, title="Run", recurrence_rule="daily", preferred_datetime=now + timedelta(hours=2))
+        Reminder.objects.create(user=user, title="Call mum", repeat_rule="weekly", remind_at=now + timedelta(hours=1))
+
+        response = authenticated_client.get("/api/occurrences/upcoming/?days=3")
+        assert response.status_code == 200
+        assert len(response.data) == 4
+        assert response.data[0]["reminder"]["title"] == "Call mum"
+        assert response.data[0]["task"] is None
+        assert response.data[1]["task"]["title"] == "Run"
+
+    def test_invalid_rule_is_rejected(self, authenticated_client):
+        response = authenticated_client.post("/api/reminders/", {"title": "x", "repeat_rule": "whenever"})
+        assert response.status_code == 400
+        assert "repeat_rule" in response.data
+
+    def test_days_is_bounded(self, authenticated_client):
+        assert authenticated_client.get("/api/occurrences/upcoming/?days=999").status_code == 400
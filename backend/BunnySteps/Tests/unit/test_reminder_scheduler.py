@@ -0,0 +1,70 @@
+# tests/test_reminder_scheduler.py
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from api.models import Notification, Reminder
+from api.scheduler import ReminderScheduler
+from api.utils import fire_due_reminders
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestReminderScheduler:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="remindbunny", password="x")
+
+    def test_fires_due_reminders_in_one_batch(self, user, django_assert_max_num_queries):
+        now = timezone.now()
+        for i in range(10):
+            Reminder.objects.create(user=user, title=f"Drink water {i}", remind_at=now - timedelta(minutes=1))
+        Reminder.objects.create(user=user, title="Later", remind_at=now + timedelta(hours=1))
+
+        scheduler = ReminderScheduler()
+        scheduler.sync(now)
+        with django_assert_max_num_queries(6):
+            fired = scheduler.fire_due(now)
+
+        assert fired == 10
+        assert Notification.objects.filter(user=user, type="reminder_due").count() == 10
+        assert Reminder.objects.filter(notified=False).count() == 1
+
+    def test_skips_frozen_and_snoozed(self, user):
+        now = timezone.now()
+        Reminder.objects.create(user=user, title="Frozen", remind_at=now, frozen=True)
+        Reminder.objects.create(user=user, title="Snoozed", remind_at=now,
+                                snoozed_until=now + timedelta(minutes=10))
+
+        scheduler = ReminderScheduler()
+        scheduler.sync(now)
+
+        assert scheduler.fire_due(now) == 0
+        assert scheduler.fire_due(now + timedelta(minutes=11)) == 1
+
+    def test_picks_up_edits_incrementally(self, user):
+        now = timezone.now()
+        reminder = Reminder.objects.create(user=user, title="Stretch", remind_at=now + timedelta(hours=2))
+
+        scheduler = ReminderScheduler()
+        scheduler.sync(now)
+
+        reminder.remind_at = now + timedelta(minutes=5)
+        reminder.save()
+        Reminder.objects.create(user=user, title="New one", remind_at=now + timedelta(minutes=5))
+        scheduler.sync(now + timedelta(seconds=1))
+
+        assert scheduler.fire_due(now + timedelta(minutes=6)) == 2
+        assert scheduler.fire_due(now + timedelta(hours=3)) == 0
+
+    def test_does_not_fire_twice(self, user):
+        now = timezone.now()
+        Reminder.objects.create(user=user, title="Once", remind_at=now)
+
+        assert fire_due_reminders(user) == 1
+        assert fire_due_reminders(user) == 0
+        assert Notification.objects.filter(user=user).count() == 1
@@ -2,10 +2,13 @@
 
 from datetime import timedelta
 
+from django.contrib.auth import get_user_model
 from django.utils import timezone
 import pytest
 
-from api.models import FocusSession, RewardSummary, Task, User, level_up
+from api.models import (
+    FocusSession, Notification, RewardEvent, RewardSummary, Task, User, grant_reward, level_up
+)
 
 
 @pytest.mark.django_db
@@ -52,4 +55,48 @@ class TestRewardSystem:
         session.save()  # triggers reward
 
         summary.refresh_from_db()
-        assert summary.xp >= initial_xp + 30  # at least 30+
\ No newline at end of file
+        assert summary.xp >= initial_xp + 30  # at least 30+
+
+@pytest.mark.django_db
+class TestRewardLedger:
+
+    @pytest.fixture
+    def user(self):
+        return get_user_model().objects.create_user(username="ledgerbunny", password="x")
+
+    def test_grant_is_idempotent_per_key(self, user):
+        assert grant_reward(user.id, "task:1:done", xp=20, coins=5) is True
+        assert grant_reward(user.id, "task:1:done", xp=20, coins=5) is False
+
+        summary = RewardSummary.objects.get(user=user)
+        assert (summary.xp, summary.coins, summary.level) == (20, 5, 1)
+        assert RewardEvent.objects.filter(user=user).count() == 1
+
+    def test_multi_level_jump_in_closed_form(self, user):
+        RewardSummary.objects.create(user=user, xp=30, coins=0, level=2)
+
+        grant_reward(user.id, "focus:9", xp=125, coins=1)
+
+        summary = RewardSummary.objects.get(user=user)
+        # 155 XP -> three level-ups (2 -> 5), bonuses 300 + 400 + 500
+        assert (summary.level, summary.xp, summary.coins) == (5, 5, 1201)
+
+    def test_task_reward_not_repeated_on_resave(self, user):
+        task = Task.objects.create(user=user, title="Once only", status="in_progress")
+        task.status = "done"
+        task.completed = True
+        task.save()
+        task.frozen = True
+        task.save()
+
+        summary = RewardSummary.objects.get(user=user)
+        assert (summary.level, summary.xp, summary.coins) == (2, 0, 210)
+        assert Notification.objects.filter(user=user, type="task_complete").count() == 1
+
+    def test_ended_session_rewarded_once(self, user):
+        session = FocusSession.objects.create(user=user, started_at=timezone.now() - timedelta(minutes=40))
+        session.ended_at = timezone.now()
+        session.save()
+        session.save()
+
+        assert RewardSummary.objects.get(user=user).xp == 40
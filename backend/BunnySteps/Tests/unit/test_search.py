@@ -0,0 +1,84 @@
+import io
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from api.models import Hobby, HobbyActivity, MoodLog, Note, SearchDocument, ShoppingItem, Task
+from api.search import search
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestSearchIndex:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="searcher", password="pw")
+
+    def test_every_source_is_indexed_on_save(self, user):
+        hobby = Hobby.objects.create(user=user, name="Guitar")
+        Task.objects.create(user=user, title="Renew passport", description="bring two photos")
+        Note.objects.create(user=user, title="Trip", body="passport is in the blue drawer")
+        HobbyActivity.objects.create(user=user, hobby=hobby, notes="learned the passport riff")
+        ShoppingItem.objects.create(user=user, name="Passport cover", note="")
+        MoodLog.objects.create(user=user, mood="anxious", note="passport appointment tomorrow")
+
+        kinds = {hit["type"] for hit in search(user.id, "passport")}
+        assert kinds == {"task", "note", "hobby_activity", "shopping_item", "mood_log"}
+
+    def test_results_are_ranked_with_snippets(self, user):
+        Task.objects.create(user=user, title="Water plants", description="the fern needs water twice")
+        Task.objects.create(user=user, title="Call bank", description="ask about the water bill")
+
+        hits = search(user.id, "water")
+        assert hits[0]["title"] == "Water plants"
+        assert "**water**" in hits[0]["snippet"]
+        assert hits[0]["rank"] >= hits[1]["rank"]
+
+    def test_edits_and_deletes_stay_in_sync(self, user):
+        note = Note.objects.create(user=user, body="buy sourdough")
+        note.body = "buy baguette"
+        note.save()
+        assert search(user.id, "sourdough") == []
+        assert [hit["id"] for hit in search(user.id, "baguette")] == [note.id]
+
+        note.delete()
+        assert search(user.id, "baguette") == []
+        assert not SearchDocument.objects.exists()
+
+    def test_users_only_see_their_own_documents(self, user):
+        other = User.objects.create_user(username="other", password="pw")
+        Note.objects.create(user=other, body="secret recipe")
+        assert search(user.id, "recipe") == []
+
+    def test_prefix_accents_and_query_syntax(self, user):
+        Note.objects.create(user=user, body="Meet at the café on Friday")
+        assert len(search(user.id, "cafe")) == 1
+        assert len(search(user.id, "fri")) == 1
+        assert search(user.id, 'fri" OR owner:*') == []
+        assert search(user.id, "  ") == []
+
+    def test_rebuild_command_indexes_bulk_created_rows(self, user):
+        Task.objects.bulk_create([Task(user=user, title=f"Import {i}") for i in range(3)])
+        assert search(user.id, "import") == []
+        call_command("rebuild_search_index", stdout=io.StringIO())
+        assert len(search(user.id, "import")) == 3
+
+
+@pytest.mark.django_db
+class TestSearchApi:
+
+    def test_search_endpoint_filters_by_type(self, authenticated_client):
+        user = authenticated_client.user
+        Task.objects.create(user=user, title="Yoga class")
+        Note.objects.create(user=user, body="yoga felt great")
+
+        response = authenticated_client.get("/api/search/", {"q": "yoga", "type": "note"})
+        assert response.status_code == 200
+        assert [hit["type"] for hit in response.data["results"]] == ["note"]
+
+    def test_unknown_type_is_rejected(self, authenticated_client):
+        response = authenticated_client.get("/api/search/", {"q": "x", "type": "badge"})
+        assert response.status_code == 400
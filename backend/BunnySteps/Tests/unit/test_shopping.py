@@ -1,15 +1,18 @@
 # tests/test_shopping.py
 import pytest
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 
 from api.models import (
-    ShoppingItem, Expense, Category,
+    ShoppingItem, Expense, Category, MonthlySpend, UserProfile,
     Notification  # if you add shopping-related notifications later
 )
+from api.budget import rebuild_spend_ledger
+from api.expense_analytics import expense_cube, rebuild_expense_rollups
 from api.serializers import ShoppingItemSerializer, ExpenseSerializer
 
 User = get_user_model()
@@ -227,6 +230,17 @@ class TestShoppingViews:
         assert float(response.data["amount"]) == 89.99
         assert response.data["currency"] == "TND"
 
+    def test_expense_without_currency_is_in_the_home_currency(self, auth_client, user):
+        UserProfile.objects.create(user=user, home_currency="EUR")
+        response = auth_client.post("/api/expenses/", {"amount": "900.00"}, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["currency"] == "EUR"
+
+        # no rates loaded, yet the expense counts against the 1200 budget in full
+        response = auth_client.post("/api/shopping/items/impulsive/",
+                                    {"name": "Console", "estimated_cost": "500.00"}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
 
 @pytest.mark.django_db
 class TestShoppingBusinessRules:
@@ -257,4 +271,212 @@ class TestShoppingBusinessRules:
         assert "Item 1" in names
         assert "Item 2" in names
         assert "Item 3" not in names
-        assert "Item 4" not in names
\ No newline at end of file
+        assert "Item 4" not in names
+
+@pytest.mark.django_db
+class TestMonthlySpendLedger:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="ledgerbunny", password="carrots")
+
+    @pytest.fixture
+    def auth_client(self, user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client
+
+    def ledger(self, user):
+        return {
+            (row.month, row.category): (row.total, row.count)
+            for row in MonthlySpend.objects.filter(user=user)
+        }
+
+    def test_expense_writes_keep_ledger_current(self, user):
+        march = timezone.make_aware(datetime(2026, 3, 10, 12))
+        april = timezone.make_aware(datetime(2026, 4, 2, 12))
+
+        food = Expense.objects.create(user=user, amount=Decimal("20.00"), category="food", spent_at=march)
+        Expense.objects.create(user=user, amount=Decimal("5.50"), category="fun", spent_at=march)
+        assert self.ledger(user)[(date(2026, 3, 1), "*")] == (Decimal("25.50"), 2)
+
+        food = Expense.objects.get(pk=food.pk)
+        food.amount = Decimal("30.00")
+        food.spent_at = april
+        food.save()
+        ledger = self.ledger(user)
+        assert ledger[(date(2026, 3, 1), "*")] == (Decimal("5.50"), 1)
+        assert ledger[(date(2026, 3, 1), "food")] == (Decimal("0.00"), 0)
+        assert ledger[(date(2026, 4, 1), "food")] == (Decimal("30.00"), 1)
+
+        food.delete()
+        assert self.ledger(user)[(date(2026, 4, 1), "*")] == (Decimal("0.00"), 0)
+
+    def test_rebuild_matches_incremental_ledger(self, user):
+        for amount, category in [("10.00", "food"), ("4.25", "food"), ("8.00", "")]:
+            Expense.objects.create(user=user, amount=Decimal(amount), category=category)
+        incremental = self.ledger(user)
+
+        rebuild_spend_ledger([user.id])
+        assert self.ledger(user) == incremental
+
+    def test_impulsive_item_over_budget_is_rejected(self, auth_client, user):
+        # no currency given and no rates loaded: the expense is in the home currency and counts in full
+        UserProfile.objects.create(user=user, salary_amount=Decimal("100.00"), home_currency="EUR")
+        expense = Expense.objects.create(user=user, amount=Decimal("80.00"))
+        assert expense.currency == "EUR"
+
+        response = auth_client.post("/api/shopping/items/impulsive/",
+                                    {"name": "Headphones", "estimated_cost": "30.00"}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "budget" in response.data["warning"]
+        assert not ShoppingItem.objects.filter(user=user).exists()
+
+        response = auth_client.post("/api/shopping/items/impulsive/",
+                                    {"name": "Socks", "estimated_cost": "15.00"}, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_old_months_do_not_count_against_budget(self, auth_client, user):
+        UserProfile.objects.create(user=user, salary_amount=Decimal("100.00"))
+        Expense.objects.create(user=user, amount=Decimal("500.00"),
+                               spent_at=timezone.now() - timedelta(days=62))
+
+        response = auth_client.post("/api/shopping/items/impulsive/",
+                                    {"name": "Book", "estimated_cost": "20.00"}, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_budget_status(self, auth_client, user, django_assert_max_num_queries):
+        UserProfile.objects.create(user=user, salary_amount=Decimal("300.00"))
+        today = timezone.localdate()
+        Expense.objects.create(user=user, amount=Decimal("60.00"), category="food")
+        Expense.objects.create(user=user, amount=Decimal("30.00"), category="fun")
+        Expense.objects.create(user=user, amount=Decimal("12.00"), currency="GBP", category="fun")
+
+        with django_assert_max_num_queries(4):
+            response = auth_client.get("/api/shopping/budget/")
+        assert response.status_code == status.HTTP_200_OK
+        data = response.data
+        assert data["spent"] == Decimal("90.00")
+        assert data["remaining"] == Decimal("210.00")
+        assert data["unpriced"] == 1
+        assert data["burn_rate"] == (Decimal("90.00") / today.day).quantize(Decimal("0.01"))
+        assert [row["category"] for row in data["categories"]] == ["food", "fun"]
+
+
+@pytest.mark.django_db
+class TestRunningLowAndExpiryHorizon:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="pantrybunny", password="carrots")
+
+    @pytest.fixture
+    def auth_client(self, user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client
+
+    def test_note_keywords_flag_running_low(self, user):
+        item = ShoppingItem.objects.create(user=user, name="Milk", note="Almost over, buy soon")
+        assert item.running_low is True
+
+        plain = ShoppingItem.objects.create(user=user, name="Rice", note="Basmati")
+        assert plain.running_low is False
+
+    def test_running_low_can_be_cleared_directly(self, user):
+        item = ShoppingItem.objects.create(user=user, name="Milk", note="almost over")
+        item = ShoppingItem.objects.get(pk=item.pk)
+        item.running_low = False
+        item.save()
+
+        item.refresh_from_db()
+        assert item.running_low is False
+
+    def test_expiring_view_uses_running_low_flag(self, auth_client, user):
+        today = timezone.localdate()
+        ShoppingItem.objects.create(user=user, name="Flagged", running_low=True)
+        ShoppingItem.objects.create(user=user, name="Soon", expiry_date=today + timedelta(days=2))
+        ShoppingItem.objects.create(user=user, name="Later", expiry_date=today + timedelta(days=10))
+
+        response = auth_client.get("/api/shopping/items/expiring/")
+        assert response.status_code == status.HTTP_200_OK
+        assert {item["name"] for item in response.data} == {"Flagged", "Soon"}
+
+    def test_expiry_horizon_buckets(self, auth_client, user, django_assert_max_num_queries):
+        today = timezone.localdate()
+        for name, days in [("Old", -2), ("Now", 0), ("Soon", 3), ("Week", 6), ("Far", 8)]:
+            ShoppingItem.objects.create(user=user, name=name, expiry_date=today + timedelta(days=days))
+        ShoppingItem.objects.create(user=user, name="Bought", expiry_date=today, purchased=True)
+
+        with django_assert_max_num_queries(3):
+            response = auth_client.get("/api/shopping/items/expiry-horizon/")
+        assert response.status_code == status.HTTP_200_OK
+        names = {bucket: [item["name"] for item in rows] for bucket, rows in response.data.items()}
+        assert names == {"expired": ["Old"], "today": ["Now"], "within_3_days": ["Soon"], "this_week": ["Week"]}
+
+
+@pytest.mark.django_db
+class TestExpenseAnalytics:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="cubebunny", password="carrots")
+
+    @pytest.fixture
+    def auth_client(self, user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client
+
+    @pytest.fixture
+    def expenses(self, user):
+        march = timezone.make_aware(datetime(2026, 3, 10, 12))
+        april = timezone.make_aware(datetime(2026, 4, 20, 12))
+        gadget = ShoppingItem.objects.create(user=user, name="Gadget", item_type="impulsive")
+        Expense.objects.create(user=user, amount=Decimal("10.00"), category="food", currency="TND", spent_at=march)
+        Expense.objects.create(user=user, amount=Decimal("15.00"), category="food", currency="TND", spent_at=march)
+        Expense.objects.create(user=user, amount=Decimal("40.00"), category="fun", currency="USD",
+                               spent_at=april, shopping_item=gadget)
+
+    def test_whole_months_come_from_rollups(self, auth_client, expenses, django_assert_max_num_queries):
+        with django_assert_max_num_queries(3):
+            response = auth_client.get("/api/shopping/expenses/analytics/",
+                                       {"start": "2026-03-01", "end": "2026-04-30"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["source"] == "rollup"
+        assert response.data["results"] == [
+            {"month": date(2026, 3, 1), "category": "food", "currency": "TND", "item_type": "",
+             "total": Decimal("25.00"), "home_total": Decimal("25.00"), "count": 2, "unpriced": 0},
+            {"month": date(2026, 4, 1), "category": "fun", "currency": "USD", "item_type": "impulsive",
+             "total": Decimal("40.00"), "home_total": Decimal("0.00"), "count": 1, "unpriced": 1},
+        ]
+
+    def test_partial_range_falls_back_to_grouped_query(self, auth_client, expenses):
+        response = auth_client.get("/api/shopping/expenses/analytics/",
+                                   {"start": "2026-03-01", "end": "2026-04-15", "group_by": "item_type"})
+        assert response.data["source"] == "expenses"
+        assert response.data["results"] == [
+            {"item_type": "", "total": Decimal("25.00"), "home_total": Decimal("25.00"), "count": 2, "unpriced": 0},
+        ]
+
+    def test_rollups_match_grouped_query_after_edits(self, user, expenses):
+        expense = Expense.objects.filter(user=user, category="food").first()
+        expense.currency = "USD"
+        expense.save()
+        Expense.objects.filter(user=user, category="fun").get().delete()
+
+        start, end = date(2026, 1, 1), date(2026, 12, 31)
+        _, incremental = expense_cube(user.id, start, end)
+        rebuild_expense_rollups([user.id])
+        _, rebuilt = expense_cube(user.id, start, end)
+        assert incremental == rebuilt
+        assert {row["currency"] for row in rebuilt} == {"TND", "USD"}
+
+    def test_rejects_unknown_dimension(self, auth_client):
+        response = auth_client.get("/api/shopping/expenses/analytics/", {"group_by": "color"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_rejects_impossible_dates(self, auth_client):
+        response = auth_client.get("/api/shopping/expenses/analytics/", {"start": "2026-02-30"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "start" in response.data
@@ -0,0 +1,90 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.models import Category, FocusSession, Reminder, Task
+
+
+def task_selects(queries):
+    return [query["sql"] for query in queries.captured_queries if query["sql"].startswith('SELECT "api_task"')]
+
+
+@pytest.mark.django_db
+class TestSparseTaskFields:
+
+    @pytest.fixture
+    def tasks(self, authenticated_client):
+        user = authenticated_client.user
+        category = Category.objects.create(user=user, name="Work", color="#ff0000")
+        tasks = [Task.objects.create(user=user, title=f"Task {i}", description="long text", category=category)
+                 for i in range(3)]
+        for task in tasks:
+            Reminder.objects.create(user=user, title=f"Ping {task.title}", task=task)
+        session = FocusSession.objects.create(user=user, mode_name="Pomodoro", started_at=timezone.now())
+        session.related_tasks.add(tasks[0])
+        return tasks
+
+    def test_fields_narrow_the_payload_and_the_query(self, authenticated_client, tasks):
+        with CaptureQueriesContext(connection) as queries:
+            response = authenticated_client.get("/api/tasks/", {"fields": "id,title,status,priority"})
+
+        assert response.status_code == 200
+        assert set(response.data[0]) == {"id", "title", "status", "priority"}
+        (sql,) = task_selects(queries)
+        assert '"api_task"."description"' not in sql
+        assert "JOIN" not in sql
+
+    def test_related_names_are_joined_only_when_asked_for(self, authenticated_client, tasks):
+        with CaptureQueriesContext(connection) as queries:
+            response = authenticated_client.get("/api/tasks/", {"fields": "id,category_name"})
+
+        assert [row["category_name"] for row in response.data] == ["Work"] * 3
+        (sql,) = task_selects(queries)
+        assert '"api_category"."name"' in sql
+        assert '"api_category"."color"' not in sql
+        assert not any("api_reminder" in query["sql"] for query in queries.captured_queries)
+
+    def test_default_payload_skips_unused_prefetches(self, authenticated_client, tasks):
+        with CaptureQueriesContext(connection) as queries:
+            response = authenticated_client.get("/api/tasks/")
+
+        assert response.data[0]["category_color"] == "#ff0000"
+        assert "reminders" not in response.data[0]
+        assert not any("api_reminder" in query["sql"] or "api_focussession" in query["sql"]
+                       for query in queries.captured_queries)
+
+    def test_expand_prefetches_relations_once(self, authenticated_client, tasks, django_assert_max_num_queries):
+        user = authenticated_client.user
+        Task.objects.bulk_create([Task(user=user, title=f"Extra {i}") for i in range(10)])
+
+        # the relations are prefetched once; the ETag version also reads both expanded kinds
+        with django_assert_max_num_queries(9):
+            response = authenticated_client.get(
+                "/api/tasks/", {"fields": "id,title", "expand": "reminders,focus_sessions"}
+            )
+
+        rows = {row["id"]: row for row in response.data}
+        assert set(rows[tasks[0].id]) == {"id", "title", "reminders", "focus_sessions"}
+        assert rows[tasks[0].id]["reminders"][0]["title"] == "Ping Task 0"
+        assert rows[tasks[0].id]["focus_sessions"][0]["mode_name"] == "Pomodoro"
+        assert rows[tasks[1].id]["focus_sessions"] == []
+
+    def test_detail_and_keyset_pages_accept_fields(self, authenticated_client, tasks):
+        detail = authenticated_client.get(f"/api/tasks/{tasks[0].id}/", {"fields": "id,title", "expand": "reminders"})
+        assert set(detail.data) == {"id", "title", "reminders"}
+
+        page = authenticated_client.get("/api/tasks/", {"fields": "id", "page_size": 2})
+        assert [set(row) for row in page.data["results"]] == [{"id"}, {"id"}]
+        rest = authenticated_client.get(page.data["next"])
+        assert [row["id"] for row in rest.data["results"]] == [tasks[0].id]
+
+    def test_unknown_names_are_ignored_and_writes_return_the_full_task(self, authenticated_client, tasks):
+        response = authenticated_client.get("/api/tasks/", {"fields": "id,nope", "expand": "everything"})
+        assert set(response.data[0]) == {"id"}
+
+        patched = authenticated_client.patch(f"/api/tasks/{tasks[0].id}/?fields=id", {"title": "Renamed"},
+                                             format="json")
+        assert patched.status_code == 200
+        assert patched.data["title"] == "Renamed"
+        assert patched.data["description"] == "long text"
@@ -0,0 +1,72 @@
+# tests/test_streaks.py
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.models import FocusSession, MoodLog, Streak, Task
+from api.streaks import touch_streak
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestStreaks:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="streakbunny", password="x")
+
+    def test_touch_extends_resets_and_ignores_repeats(self, user):
+        today = timezone.localdate()
+        for days_ago in (4, 3, 3, 2):
+            touch_streak(user.id, "mood", today - timedelta(days=days_ago))
+        streak = Streak.objects.get(user=user, kind="mood")
+        assert (streak.current, streak.longest) == (3, 3)
+
+        touch_streak(user.id, "mood", today)
+        streak.refresh_from_db()
+        assert (streak.current, streak.longest) == (1, 3)
+        assert streak.last_active_date == today
+
+    def test_touch_is_one_query_when_row_exists(self, user, django_assert_num_queries):
+        today = timezone.localdate()
+        touch_streak(user.id, "task", today - timedelta(days=1))
+
+        with django_assert_num_queries(1):
+            touch_streak(user.id, "task", today)
+
+    def test_updated_by_mood_focus_and_task_saves(self, user):
+        now = timezone.now()
+        MoodLog.objects.create(user=user, mood="happy", rating=8)
+        FocusSession.objects.create(user=user, started_at=now - timedelta(minutes=30), ended_at=now)
+        task = Task.objects.create(user=user, title="Done soon")
+        task.status = "done"
+        task.completed = True
+        task.save()
+
+        streaks = {s.kind: s.current for s in Streak.objects.filter(user=user)}
+        assert streaks == {"mood": 1, "focus": 1, "task": 1}
+
+    def test_mood_insights_reads_streak_row(self, user):
+        MoodLog.objects.create(user=user, mood="calm", rating=6)
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        assert client.get("/api/mood-logs/insights/").data["streak"] == 1
+        assert client.get("/api/streaks/").data[0]["current"] == 1
+
+    def test_rebuild_from_history(self, user):
+        for days_ago in (6, 5, 4, 1, 0):
+            log = MoodLog.objects.create(user=user, mood="ok")
+            MoodLog.objects.filter(pk=log.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+        Streak.objects.all().delete()
+
+        call_command("rebuild_streaks", kinds=["mood"])
+
+        streak = Streak.objects.get(user=user, kind="mood")
+        assert (streak.current, streak.longest) == (2, 3)
+        assert streak.current_on(timezone.localdate()) == 2
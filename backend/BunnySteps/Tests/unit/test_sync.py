@@ -0,0 +1,107 @@
+import io
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from api.expense_import import import_expenses
+from api.models import Expense, FocusSession, Hobby, Note, SyncChange, Task, grant_reward
+from api.sync import changes_since
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestChangeFeed:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="syncer", password="pw")
+
+    def test_saves_and_deletes_advance_a_per_user_sequence(self, user):
+        task = Task.objects.create(user=user, title="A")
+        note = Note.objects.create(user=user, body="hello")
+        other = User.objects.create_user(username="other", password="pw")
+        Task.objects.create(user=other, title="not mine")
+
+        feed = changes_since(user.id, 0)
+        assert feed["cursor"] == 2
+        assert [row["id"] for row in feed["changes"]["tasks"]] == [task.id]
+        assert [row["id"] for row in feed["changes"]["notes"]] == [note.id]
+
+        task.title = "A2"
+        task.save()
+        note_id = note.id
+        note.delete()
+        feed = changes_since(user.id, 2)
+        assert feed["changes"]["tasks"][0]["title"] == "A2"
+        assert feed["deleted"] == {"notes": [note_id]}
+        assert feed["cursor"] == 4
+
+    def test_nothing_changed_is_an_empty_page(self, user):
+        Task.objects.create(user=user, title="A")
+        cursor = changes_since(user.id, 0)["cursor"]
+        assert changes_since(user.id, cursor) == {"cursor": cursor, "has_more": False, "changes": {}, "deleted": {}}
+
+    def test_one_row_per_object_however_often_it_changes(self, user):
+        hobby = Hobby.objects.create(user=user, name="Chess")
+        for name in ("Go", "Shogi", "Chess"):
+            hobby.name = name
+            hobby.save()
+        assert SyncChange.objects.filter(kind="hobbies").count() == 1
+        assert changes_since(user.id, 0)["changes"]["hobbies"][0]["name"] == "Chess"
+
+    def test_pages_follow_the_sequence(self, user):
+        for i in range(5):
+            Note.objects.create(user=user, body=f"n{i}")
+        first = changes_since(user.id, 0, limit=3)
+        assert first["has_more"] and len(first["changes"]["notes"]) == 3
+        second = changes_since(user.id, first["cursor"], limit=3)
+        assert not second["has_more"] and len(second["changes"]["notes"]) == 2
+
+    def test_updates_without_save_signals_are_recorded(self, user):
+        session = FocusSession.objects.create(user=user)
+        task = Task.objects.create(user=user, title="Focus on me")
+        cursor = changes_since(user.id, 0)["cursor"]
+
+        session.related_tasks.add(task)
+        grant_reward(user.id, "test:bonus", coins=5)
+
+        feed = changes_since(user.id, cursor)
+        assert [row["id"] for row in feed["changes"]["focus-sessions"]] == [session.id]
+        assert feed["changes"]["rewards"][0]["coins"] >= 5
+
+    def test_imported_expenses_are_recorded(self, user):
+        Expense.objects.create(user=user, amount=Decimal("3.00"), note="Coffee")
+        cursor = changes_since(user.id, 0)["cursor"]
+
+        csv = "date,debit,note\n2026-03-01,12.00,Lunch\n2026-03-02,8.00,Taxi\n2026-03-03,5.00,Snack\n"
+        import_expenses(user, io.StringIO(csv), "csv", batch_size=2)
+
+        feed = changes_since(user.id, cursor)
+        assert sorted(row["note"] for row in feed["changes"]["expenses"]) == ["Lunch", "Snack", "Taxi"]
+        assert feed["cursor"] == cursor + 3
+
+    def test_deleting_the_account_drops_its_feed(self, user):
+        Task.objects.create(user=user, title="A")
+        user.delete()
+        assert not SyncChange.objects.exists()
+
+
+@pytest.mark.django_db
+class TestSyncApi:
+
+    def test_sync_endpoint_pages_through_changes(self, authenticated_client):
+        user = authenticated_client.user
+        Task.objects.create(user=user, title="A")
+
+        response = authenticated_client.get("/api/sync/", {"since": 0})
+        assert response.status_code == 200
+        assert response.data["changes"]["tasks"][0]["title"] == "A"
+
+        again = authenticated_client.get("/api/sync/", {"since": response.data["cursor"]})
+        assert again.data["changes"] == {} and again.data["deleted"] == {}
+
+    def test_bad_cursor_is_rejected(self, authenticated_client):
+        assert authenticated_client.get("/api/sync/", {"since": "abc"}).status_code == 400
+        assert authenticated_client.get("/api/sync/", {"since": -1}).status_code == 400
@@ -0,0 +1,104 @@
+import pytest
+
+from api.models import Badge, Notification, Reminder, RewardEvent, RewardSummary, SearchDocument, Streak, Task
+from api.sync import changes_since
+
+
+@pytest.mark.django_db
+class TestBulkTasks:
+
+    URL = "/api/tasks/bulk/"
+
+    def make_tasks(self, user, count):
+        return Task.objects.bulk_create([Task(user=user, title=f"Task {i}") for i in range(count)])
+
+    def test_completes_a_large_batch_in_a_handful_of_queries(self, authenticated_client, django_assert_max_num_queries):
+        user = authenticated_client.user
+        warm_up, *tasks = self.make_tasks(user, 201)
+        authenticated_client.post(self.URL, {"operations": [{"op": "complete", "ids": [warm_up.id]}]}, format="json")
+        ids = [task.id for task in tasks]
+
+        # nothing per task: the count includes savepoints, and SQLite splits bulk writes into ~100-row chunks
+        with django_assert_max_num_queries(45):
+            response = authenticated_client.post(
+                self.URL, {"operations": [{"op": "complete", "ids": ids}]}, format="json"
+            )
+
+        assert response.status_code == 200
+        assert len(response.data["completed"]) == 200
+        assert response.data["xp"] == 200 * 50 and response.data["coins"] == 200 * 10
+        assert set(response.data["badges"]) == {"daily_2_tasks", "daily_3_tasks", "tasks_100"}
+        assert Task.objects.filter(user=user, status="done", completed=True).count() == 201
+        assert RewardEvent.objects.filter(user=user).count() == 201
+        assert Notification.objects.filter(user=user, type="task_complete").count() == 201
+        assert Streak.objects.get(user=user, kind="task").current == 1
+
+    def test_summary_matches_one_grant_per_task(self, authenticated_client):
+        user = authenticated_client.user
+        ids = [task.id for task in self.make_tasks(user, 7)]
+        authenticated_client.post(self.URL, {"operations": [{"op": "complete", "ids": ids}]}, format="json")
+
+        summary = RewardSummary.objects.get(user=user)
+        # 350 XP = 7 level-ups from level 1: 70 coins + 100 * (2 + 3 + ... + 8)
+        assert (summary.level, summary.xp, summary.coins) == (8, 0, 70 + 100 * 35)
+
+    def test_already_rewarded_tasks_are_not_paid_twice(self, authenticated_client):
+        user = authenticated_client.user
+        first, second = self.make_tasks(user, 2)
+        first.status = "done"
+        first.save()
+
+        response = authenticated_client.post(
+            self.URL, {"operations": [{"op": "complete", "ids": [first.id, second.id]}]}, format="json"
+        )
+        assert response.data["completed"] == [second.id]
+        assert response.data["xp"] == 50
+        assert RewardEvent.objects.filter(user=user).count() == 2
+        assert Badge.objects.filter(user=user, key="daily_2_tasks").exists()
+
+    def test_mixed_operations_apply_in_order(self, authenticated_client):
+        user = authenticated_client.user
+        a, b, c = self.make_tasks(user, 3)
+        Reminder.objects.create(user=user, title="Ping", task=c)
+        cursor = changes_since(user.id, 0)["cursor"]
+
+        response = authenticated_client.post(self.URL, {"operations": [
+            {"op": "freeze", "ids": [a.id, b.id]},
+            {"op": "unfreeze", "ids": [b.id]},
+            {"op": "set_priority", "ids": [a.id], "priority": "high"},
+            {"op": "delete", "ids": [c.id, 999999]},
+        ]}, format="json")
+
+        assert response.status_code == 200
+        assert response.data["updated"] == [a.id, b.id]
+        assert response.data["deleted"] == [c.id]
+        assert response.data["missing"] == [999999]
+        a.refresh_from_db()
+        b.refresh_from_db()
+        assert (a.frozen, a.priority, b.frozen) == (True, "high", False)
+        assert not Task.objects.filter(pk=c.id).exists()
+        assert not SearchDocument.objects.filter(kind="task", object_id=c.id).exists()
+
+        feed = changes_since(user.id, cursor)
+        assert {row["id"] for row in feed["changes"]["tasks"]} == {a.id, b.id}
+        assert feed["deleted"]["tasks"] == [c.id]
+        assert "reminders" in feed["deleted"]
+
+    def test_other_users_tasks_are_untouched(self, authenticated_client, django_user_model):
+        other = django_user_model.objects.create_user(username="other", password="pw")
+        (task,) = self.make_tasks(other, 1)
+        response = authenticated_client.post(
+            self.URL, {"operations": [{"op": "delete", "ids": [task.id]}]}, format="json"
+        )
+        assert response.data["missing"] == [task.id]
+        assert Task.objects.filter(pk=task.id).exists()
+
+    @pytest.mark.parametrize("payload", [
+        {},
+        {"operations": []},
+        {"operations": [{"op": "explode", "ids": [1]}]},
+        {"operations": [{"op": "set_priority", "ids": [1]}]},
+        {"operations": [{"op": "delete", "ids": list(range(1, 502))}]},
+    ])
+    def test_invalid_batches_are_rejected(self, authenticated_client, payload):
+        assert authenticated_client.post(self.URL, payload, format="json").status_code == 400
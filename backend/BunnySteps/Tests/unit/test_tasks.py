@@ -253,6 +253,67 @@ class TestTaskViewSet:
         assert response.data["frozen"] is False
 
 
+@pytest.mark.django_db
+class TestTaskPagination:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="pagebunny", password="hop")
+
+    @pytest.fixture
+    def api(self, user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client
+
+    def test_cursor_pages_walk_all_tasks_once(self, api, user):
+        same_time = timezone.now()
+        for i in range(5):
+            task = Task.objects.create(user=user, title=f"Task {i}")
+            Task.objects.filter(pk=task.pk).update(created_at=same_time)
+
+        seen = []
+        response = api.get("/api/tasks/", {"page_size": 2})
+        while True:
+            assert response.status_code == status.HTTP_200_OK
+            seen += [t["id"] for t in response.data["results"]]
+            if not response.data["next"]:
+                break
+            response = api.get(response.data["next"])
+
+        assert len(seen) == 5
+        assert seen == sorted(seen, reverse=True)
+
+    def test_cursor_page_stable_under_inserts(self, api, user):
+        for i in range(4):
+            Task.objects.create(user=user, title=f"Old {i}")
+
+        first = api.get("/api/tasks/", {"page_size": 2})
+        Task.objects.create(user=user, title="Brand new")
+        second = api.get(first.data["next"])
+
+        titles = [t["title"] for t in second.data["results"]]
+        assert titles == ["Old 1", "Old 0"]
+
+    def test_offset_pagination_available(self, api, user):
+        for i in range(3):
+            Task.objects.create(user=user, title=f"Task {i}")
+
+        response = api.get("/api/tasks/", {"limit": 2, "offset": 2})
+        assert response.data["count"] == 3
+        assert len(response.data["results"]) == 1
+
+    def test_unpaginated_by_default(self, api, user):
+        Task.objects.create(user=user, title="Plain list")
+
+        response = api.get("/api/tasks/")
+        assert isinstance(response.data, list)
+
+    def test_invalid_cursor_returns_404(self, api):
+        response = api.get("/api/tasks/", {"cursor": "not-a-cursor"})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
 @pytest.mark.django_db
 class TestTaskRewardIntegration:
 
@@ -1,9 +1,12 @@
 # tests/test_weekly_discipline.py
 
 from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.utils import timezone
 import pytest
-from api.models import Badge, Expense, RewardSummary, ShoppingItem, User, check_weekly_discipline
+from rest_framework.test import APIClient
+from api.models import Badge, Expense, RewardEvent, RewardSummary, ShoppingItem, User, check_weekly_discipline
 
 
 @pytest.mark.django_db
@@ -37,4 +40,51 @@ class TestWeeklyDiscipline:
 
         check_weekly_discipline(user)
 
-        assert not Badge.objects.filter(user=user, key="no_impulsive_week").exists()
\ No newline at end of file
+        assert not Badge.objects.filter(user=user, key="no_impulsive_week").exists()
+
+@pytest.mark.django_db
+class TestWeeklyDisciplineBatch:
+
+    @pytest.fixture
+    def users(self):
+        User = get_user_model()
+        return [User.objects.create_user(username=f"batchbun{i}", password="x") for i in range(4)]
+
+    def test_batch_awards_only_clean_users(self, users, django_assert_max_num_queries):
+        clean, impulsive, old_impulse, already = users
+        item = ShoppingItem.objects.create(user=impulsive, name="Gadget", item_type="impulsive")
+        Expense.objects.create(user=impulsive, amount=30, shopping_item=item)
+        old_item = ShoppingItem.objects.create(user=old_impulse, name="Old gadget", item_type="impulsive")
+        Expense.objects.create(user=old_impulse, amount=30, shopping_item=old_item,
+                               spent_at=timezone.now() - timedelta(days=10))
+        Badge.objects.create(user=already, key="no_impulsive_week", title="Discipline Bunny")
+
+        with django_assert_max_num_queries(8):
+            call_command("award_weekly_discipline")
+
+        awarded = set(Badge.objects.filter(key="no_impulsive_week").values_list("user_id", flat=True))
+        assert awarded == {clean.id, old_impulse.id, already.id}
+        assert RewardSummary.objects.get(user=clean).coins == 100
+        assert not RewardSummary.objects.filter(user=already).exists()
+
+    def test_rerun_does_not_pay_twice(self, users):
+        call_command("award_weekly_discipline")
+        call_command("award_weekly_discipline")
+
+        assert RewardSummary.objects.get(user=users[0]).coins == 100
+
+    def test_removed_badge_is_restored_without_paying_again(self, users):
+        call_command("award_weekly_discipline")
+        Badge.objects.filter(user=users[0]).delete()
+        call_command("award_weekly_discipline")
+
+        assert Badge.objects.filter(user=users[0], key="no_impulsive_week").exists()
+        assert RewardEvent.objects.filter(user=users[0]).count() == 1
+        assert RewardSummary.objects.get(user=users[0]).coins == 100
+
+    def test_profile_read_does_not_award(self, users):
+        client = APIClient()
+        client.force_authenticate(user=users[0])
+
+        client.get("/api/profile/")
+        assert not Badge.objects.filter(user=users[0]).exists()
@@ -1,8 +1,9 @@
 from django.contrib import admin
 from .models import (
-    Category, Task, FocusMode, FocusSession, FocusMetric,
+    Category, Task, FocusMode, FocusSession, FocusMetric, FocusProfile,
     Hobby, HobbyActivity, Reminder, Note, MoodLog,
-    ShoppingItem, Expense, Badge, RewardSummary
+    ShoppingItem, Expense, Badge, BadgeCounter, ExchangeRate, ExpenseRollup, HobbyMetricValue, HobbySummary,
+    MonthlySpend, Occurrence, RecurrenceSeries, RewardSummary, SearchDocument, SyncChange, SyncCounter, RewardEvent, Streak
 )
 
 admin.site.register(Category)
@@ -10,6 +11,7 @@ admin.site.register(Task)
 admin.site.register(FocusMode)
 admin.site.register(FocusSession)
 admin.site.register(FocusMetric)
+admin.site.register(FocusProfile)
 admin.site.register(Hobby)
 admin.site.register(HobbyActivity)
 admin.site.register(Reminder)
@@ -18,4 +20,17 @@ admin.site.register(MoodLog)
 admin.site.register(ShoppingItem)
 admin.site.register(Expense)
 admin.site.register(Badge)
+admin.site.register(BadgeCounter)
+admin.site.register(MonthlySpend)
+admin.site.register(ExpenseRollup)
+admin.site.register(ExchangeRate)
+admin.site.register(HobbySummary)
+admin.site.register(HobbyMetricValue)
+admin.site.register(RecurrenceSeries)
+admin.site.register(Occurrence)
+admin.site.register(SearchDocument)
+admin.site.register(SyncCounter)
+admin.site.register(SyncChange)
 admin.site.register(RewardSummary)
+admin.site.register(RewardEvent)
+admin.site.register(Streak)
@@ -6,3 +6,14 @@ class ApiConfig(AppConfig):
     name = 'api'
     def ready(self):
         import api.models  # This triggers signal registration
+        import api.focus_metrics
+        import api.moods
+        import api.streaks
+        import api.badges
+        import api.budget
+        import api.expense_analytics
+        import api.hobbies
+        import api.hobby_metrics
+        import api.recurrence
+        import api.search
+        import api.sync
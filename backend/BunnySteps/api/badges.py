@@ -0,0 +1,123 @@
+# api/badges.py
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Badge, BadgeCounter, MoodLog
+from .signals import focus_session_ended, task_completed
+
+ALL_TIME = date(1970, 1, 1)
+
+
+class BadgeRule:
+    """
+    A badge declared as data: earned when `threshold` matching `event`s happen
+    within one `window` ("day", "week" or "all"). `predicate(payload)` narrows
+    which events count; rules without one share a counter per event/window.
+    """
+
+    def __init__(self, key, title, description, event, threshold, window="all", predicate=None):
+        self.key = key
+        self.title = title
+        self.description = description
+        self.event = event
+        self.threshold = threshold
+        self.window = window
+        self.predicate = predicate
+
+    @property
+    def counter(self):
+        return self.key if self.predicate else f"{self.event}:{self.window}"
+
+    def matches(self, payload):
+        return self.predicate is None or self.predicate(payload)
+
+
+BADGE_RULES = [
+    BadgeRule("daily_2_tasks", "Productive Bunny", "Completed 2 tasks today",
+              event="task_completed", threshold=2, window="day"),
+    BadgeRule("daily_3_tasks", "Task Master", "Completed 3 tasks in one day",
+              event="task_completed", threshold=3, window="day"),
+    BadgeRule("tasks_100", "Centurion Bunny", "Completed 100 tasks",
+              event="task_completed", threshold=100),
+    BadgeRule("deep_focus", "Deep Diver", "Finished a focus session of an hour or more",
+              event="focus_completed", threshold=1, predicate=lambda p: p.get("minutes", 0) >= 60),
+    BadgeRule("focus_week_10", "Focused Week", "Finished 10 focus sessions in one week",
+              event="focus_completed", threshold=10, window="week"),
+    BadgeRule("mood_week_7", "In Touch", "Logged your mood 7 times in one week",
+              event="mood_logged", threshold=7, window="week"),
+]
+
+RULES_BY_EVENT = defaultdict(list)
+for _rule in BADGE_RULES:
+    RULES_BY_EVENT[_rule.event].append(_rule)
+
+
+def window_start(window, day):
+    if window == "day":
+        return day
+    if window == "week":
+        return day - timedelta(days=day.weekday())
+    return ALL_TIME
+
+
+def increment_counter(user_id, counter, start, by=1):
+    """Add `by` to a counter row and return its new value."""
+    rows = BadgeCounter.objects.filter(user_id=user_id, counter=counter, window_start=start)
+    with transaction.atomic():
+        # the UPDATE locks the row until commit, so the read below sees our own increment
+        if not rows.update(count=F("count") + by):
+            try:
+                with transaction.atomic():
+                    BadgeCounter.objects.create(user_id=user_id, counter=counter, window_start=start, count=by)
+                return by
+            except IntegrityError:
+                rows.update(count=F("count") + by)
+        return rows.values_list("count", flat=True).get()
+
+
+def record_event(user_id, event, day=None, count=1, **payload):
+    """
+    Count `count` occurrences of `event` for the user and award every rule whose
+    counter just reached its threshold. Returns the keys of newly earned badges.
+    """
+    day = day or timezone.localdate()
+    rules = [rule for rule in RULES_BY_EVENT.get(event, []) if rule.matches(payload)]
+
+    counts = {}
+    for rule in rules:
+        if rule.counter not in counts:
+            counts[rule.counter] = increment_counter(user_id, rule.counter, window_start(rule.window, day), count)
+
+    earned = []
+    for rule in rules:
+        # counters only grow within a window, so crossing the threshold happens once per window
+        if counts[rule.counter] - count < rule.threshold <= counts[rule.counter]:
+            _, created = Badge.objects.get_or_create(
+                user_id=user_id, key=rule.key,
+                defaults={"title": rule.title, "description": rule.description},
+            )
+            if created:
+                earned.append(rule.key)
+    return earned
+
+
+@receiver(task_completed)
+def task_badges(sender, task, **kwargs):
+    record_event(task.user_id, "task_completed")
+
+
+@receiver(focus_session_ended)
+def focus_badges(sender, session, **kwargs):
+    record_event(session.user_id, "focus_completed", minutes=session.effective_minutes or 0)
+
+
+@receiver(post_save, sender=MoodLog)
+def mood_badges(sender, instance, created, **kwargs):
+    if created:
+        record_event(instance.user_id, "mood_logged")
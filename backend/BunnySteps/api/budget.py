@@ -0,0 +1,155 @@
+# api/budget.py
+import calendar
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .currency import DEFAULT_HOME_CURRENCY, convert, home_currency, home_currency_changed, with_home_amount
+from .models import Expense, MonthlySpend, UserProfile
+from .utils import increment_or_create
+
+ALL = MonthlySpend.ALL_CATEGORIES
+# matches UserProfile.salary_amount's default for users without a profile
+DEFAULT_MONTHLY_BUDGET = Decimal("1200")
+
+
+def day_of(value):
+    """The (local) date of a date or datetime."""
+    if hasattr(value, "hour"):
+        return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    return value
+
+
+def month_of(value):
+    """First day of the (local) month containing a date or datetime."""
+    return day_of(value).replace(day=1)
+
+
+def apply_spend(key, home, sign=1):
+    """
+    Add (or with sign=-1, remove) one expense, given by its ledger key, from its
+    month's total and category rows, converted into the `home` currency (or
+    counted as unpriced when there is no rate).
+    """
+    month = month_of(key.spent_at)
+    amount = convert(key.amount, key.currency, home, day_of(key.spent_at))
+    for category in {ALL, key.category or ""}:
+        increment_or_create(
+            MonthlySpend, {"user_id": key.user_id, "month": month, "category": category},
+            total=(amount or 0) * sign, count=sign, unpriced=sign if amount is None else 0,
+        )
+
+
+def rebuild_spend_ledger(user_ids):
+    """
+    Recompute MonthlySpend rows for `user_ids` from one grouped query,
+    converting into each user's home currency inside the aggregate.
+    """
+    rows = (
+        with_home_amount(Expense.objects.filter(user_id__in=user_ids))
+        .annotate(month=TruncMonth("spent_at"))
+        .values("user_id", "month", "category")
+        .annotate(total=Sum("home_amount"), count=Count("id"),
+                  unpriced=Count("id", filter=Q(home_amount__isnull=True)))
+        .order_by()
+    )
+
+    ledger = {}
+    for row in rows:
+        month = month_of(row["month"])
+        for key in (ALL, row["category"]):
+            entry = ledger.setdefault(
+                (row["user_id"], month, key),
+                MonthlySpend(user_id=row["user_id"], month=month, category=key),
+            )
+            entry.total += row["total"] or 0
+            entry.count += row["count"]
+            entry.unpriced += row["unpriced"]
+
+    with transaction.atomic():
+        MonthlySpend.objects.filter(user_id__in=user_ids).delete()
+        MonthlySpend.objects.bulk_create(ledger.values())
+    return len(ledger)
+
+
+def monthly_budget(user_id):
+    salary = UserProfile.objects.filter(user_id=user_id).values_list("salary_amount", flat=True).first()
+    return salary if salary is not None else DEFAULT_MONTHLY_BUDGET
+
+
+def month_spent(user_id, month):
+    total = (
+        MonthlySpend.objects
+        .filter(user_id=user_id, month=month, category=ALL)
+        .values_list("total", flat=True)
+        .first()
+    )
+    return total or Decimal("0")
+
+
+def budget_status(user_id, today=None):
+    """
+    This month's budget against the ledger, in the user's home currency:
+    remaining budget, average daily burn so far, and month-end spend
+    projected from that burn rate. `unpriced` counts expenses left out of
+    these figures because their currency has no rate yet.
+    """
+    today = today or timezone.localdate()
+    month = today.replace(day=1)
+    profile = UserProfile.objects.filter(user_id=user_id).values("salary_amount", "home_currency").first() or {}
+    budget = profile.get("salary_amount", DEFAULT_MONTHLY_BUDGET)
+
+    rows = list(MonthlySpend.objects.filter(user_id=user_id, month=month).order_by("-total"))
+    month_row = next((row for row in rows if row.category == ALL), None)
+    spent = month_row.total if month_row else Decimal("0")
+
+    days_in_month = calendar.monthrange(today.year, today.month)[1]
+    burn_rate = spent / today.day
+    projected = burn_rate * days_in_month
+
+    return {
+        "month": month,
+        "currency": profile.get("home_currency", DEFAULT_HOME_CURRENCY),
+        "budget": budget,
+        "spent": spent,
+        "remaining": budget - spent,
+        "burn_rate": burn_rate.quantize(Decimal("0.01")),
+        "projected_spend": projected.quantize(Decimal("0.01")),
+        "projected_over_budget": projected > budget,
+        "unpriced": month_row.unpriced if month_row else 0,
+        "categories": [
+            {"category": row.category, "total": row.total, "count": row.count}
+            for row in rows if row.category != ALL
+        ],
+    }
+
+
+@receiver(post_save, sender=Expense)
+def expense_saved(sender, instance, created, **kwargs):
+    old, new = instance._loaded_ledger_key, instance.ledger_key()
+    if not created and old is None:
+        # edited without knowing the previous values (deferred fields, manual pk)
+        rebuild_spend_ledger([instance.user_id])
+    elif old != new:
+        home = home_currency(instance.user_id)
+        if old is not None:
+            apply_spend(old, home, sign=-1)
+        apply_spend(new, home)
+
+
+@receiver(post_delete, sender=Expense)
+def expense_deleted(sender, instance, **kwargs):
+    key = instance._loaded_ledger_key or instance.ledger_key()
+    if key is not None:
+        apply_spend(key, home_currency(key.user_id), sign=-1)
+
+
+@receiver(post_save, sender=UserProfile)
+def reprice_spend_ledger(sender, instance, created, **kwargs):
+    if home_currency_changed(instance, created):
+        rebuild_spend_ledger([instance.user_id])
@@ -0,0 +1,98 @@
+# api/calendar_feed.py
+import heapq
+from datetime import timedelta
+
+from django.db.models import Q
+
+from .models import FocusSession, Reminder, Task
+from .recurrence import occurrences_between
+
+MAX_WINDOW_DAYS = 366
+# longest a focus session or a preferred-time block is looked back for: sessions left
+# open for longer count as abandoned, so they do not show up in every later window
+MAX_EVENT_LENGTH = timedelta(days=1)
+
+
+def event(source, obj_id, title, start, end=None, **extra):
+    return {"type": source, "id": obj_id, "title": title, "start": start, "end": end, **extra}
+
+
+def task_events(user_id, start, end, field, label):
+    """
+    Due dates are points in the window; a preferred time with an estimate is a
+    block, listed when it overlaps the window even if it starts (up to
+    MAX_EVENT_LENGTH) before it.
+    """
+    since = start - MAX_EVENT_LENGTH if label == "preferred" else start
+    tasks = (
+        Task.objects.filter(user_id=user_id, **{f"{field}__gte": since, f"{field}__lt": end})
+        .only("id", "title", "status", "estimated_minutes", field)
+        .order_by(field, "id")
+    )
+    for task in tasks:
+        at = getattr(task, field)
+        finish = at + timedelta(minutes=task.estimated_minutes) if label == "preferred" and task.estimated_minutes else None
+        if at < start and (finish is None or finish <= start):
+            continue
+        yield event("task", task.id, task.title, at, finish, kind=label, status=task.status)
+
+
+def reminder_events(user_id, start, end):
+    reminders = (
+        Reminder.objects.filter(user_id=user_id, remind_at__gte=start, remind_at__lt=end)
+        .only("id", "title", "frozen", "remind_at")
+        .order_by("remind_at", "id")
+    )
+    for reminder in reminders:
+        yield event("reminder", reminder.id, reminder.title, reminder.remind_at, kind="reminder", frozen=reminder.frozen)
+
+
+def focus_events(user_id, start, end):
+    """
+    Sessions overlapping [start, end): started before `end` and ended after `start`,
+    or still open and started at most MAX_EVENT_LENGTH before `start`. The
+    (user, ended_at) and (user, started_at) indexes bound both branches to the
+    window, so old history is never read.
+    """
+    sessions = (
+        FocusSession.objects.filter(user_id=user_id, started_at__lt=end)
+        .filter(Q(ended_at__gt=start) | Q(ended_at__isnull=True, started_at__gte=start - MAX_EVENT_LENGTH))
+        .only("id", "mode_name", "started_at", "ended_at", "is_hyperfocus")
+        .order_by("started_at", "id")
+    )
+    for session in sessions:
+        yield event(
+            "focus_session", session.id, session.mode_name or "Focus session",
+            session.started_at, session.ended_at, kind="focus", is_hyperfocus=session.is_hyperfocus,
+        )
+
+
+def occurrence_events(user_id, start, end):
+    for occurrence in occurrences_between(user_id, start, end):
+        owner = occurrence.series.task or occurrence.series.reminder
+        source = "task" if occurrence.series.task_id else "reminder"
+        yield event(source, owner.id, owner.title, occurrence.at, kind="occurrence", occurrence_id=occurrence.id)
+
+
+def calendar_events(user_id, start, end):
+    """
+    Everything of the user's overlapping [start, end), oldest first: task due and
+    preferred times, reminders, focus sessions and recurrence occurrences. Each
+    source is one indexed range query already sorted by time, so they are merged
+    lazily instead of re-sorted; an occurrence at a task/reminder's own time is
+    listed once.
+    """
+    streams = [
+        occurrence_events(user_id, start, end),
+        task_events(user_id, start, end, "due_date", "due"),
+        task_events(user_id, start, end, "preferred_datetime", "preferred"),
+        reminder_events(user_id, start, end),
+        focus_events(user_id, start, end),
+    ]
+    seen = set()
+    for item in heapq.merge(*streams, key=lambda item: item["start"]):
+        key = (item["type"], item["id"], item["start"])
+        if key in seen:
+            continue
+        seen.add(key)
+        yield item
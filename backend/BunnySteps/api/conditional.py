@@ -0,0 +1,127 @@
+# api/conditional.py
+import hashlib
+
+from django.db.models import Count, Max, Q
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import Badge, Notification, Reminder, RewardSummary, SyncChange
+from .sparse import SparseQuerysetMixin, requested
+from .sync import KINDS
+
+# representations that embed another kind's fields (names of related objects)
+DEPENDENCIES = {
+    "tasks": ("categories", "hobbies"),
+    "focus-sessions": ("tasks",),
+    "hobby-activities": ("hobbies",),
+    "expenses": ("shopping-items",),
+}
+
+
+def kind_version(user_id, kinds):
+    """The user's latest change seq across `kinds`: one (user, kind, seq) index seek per kind."""
+    changes = SyncChange.objects.filter(user_id=user_id).order_by("-seq").values_list("seq", flat=True)
+    return max(changes.filter(kind=kind).first() or 0 for kind in kinds)
+
+
+def reward_version(user_id):
+    """award_weekly_discipline() pays its bonus with a queryset UPDATE: the summary's own stamp tracks it."""
+    return RewardSummary.objects.filter(user_id=user_id).values_list("updated_at", flat=True).first()
+
+
+def badge_version(user_id):
+    """award_weekly_discipline() bulk-inserts badges; removals are in the change feed."""
+    stats = Badge.objects.filter(user_id=user_id).aggregate(count=Count("id"), last=Max("id"))
+    return f"{stats['count']}.{stats['last']}"
+
+
+def reminder_version(user_id):
+    """
+    fire_reminders() marks reminders notified with a queryset UPDATE; only a
+    recorded save can clear the flag, so the count only grows between changes.
+    """
+    return Reminder.objects.filter(user_id=user_id, notified=True).count()
+
+
+# kinds some batch paths write without recording a change (no signal, and a
+# change-feed entry per user would cost those jobs two queries per user); other
+# bulk writers (task_bulk, expense_import) call record_changes themselves
+ROW_VERSIONS = {"rewards": reward_version, "badges": badge_version, "reminders": reminder_version}
+
+
+def version(user_id, kinds):
+    """kind_version(), plus the row-derived part of any kind in ROW_VERSIONS."""
+    parts = [kind_version(user_id, kinds)]
+    parts += [ROW_VERSIONS[kind](user_id) for kind in sorted(set(kinds) & ROW_VERSIONS.keys())]
+    return ".".join(str(part) for part in parts)
+
+
+def notification_version(user_id):
+    """Notifications are bulk-inserted without signals, so their version is read off the rows."""
+    stats = Notification.objects.filter(user_id=user_id).aggregate(
+        count=Count("id"), last=Max("id"), unread=Count("id", filter=Q(is_read=False)),
+    )
+    return f"{stats['count']}.{stats['last']}.{stats['unread']}"
+
+
+def expanded_kinds(view):
+    """Kinds the read embeds through ?expand= (api/sparse.py), from the nested serializers' models."""
+    if not isinstance(view, SparseQuerysetMixin):
+        return ()
+    expandable = getattr(view.get_serializer_class().Meta, "expandable", {})
+    fields = [expandable[name]() for name in sorted(requested(view.request, "expand") & expandable.keys())]
+    return tuple(KINDS[getattr(field, "child", field).Meta.model] for field in fields)
+
+
+def weakly_matches(etag, header):
+    """If-None-Match uses weak comparison: W/"x" and "x" are the same validator."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(candidate.removeprefix("W/") == bare for candidate in parse_etags(header))
+
+
+class ConditionalGetMixin:
+    """
+    Weak ETags for list/retrieve, derived from the user's change versions
+    (api/sync.py) and, for kinds in ROW_VERSIONS, from the rows themselves. A
+    matching If-None-Match is answered 304 before the queryset runs or anything
+    is serialised.
+    """
+
+    def etag_version(self):
+        kind = KINDS.get(self.get_serializer_class().Meta.model)
+        if kind is None:
+            return None
+        return version(self.request.user.pk, (kind, *DEPENDENCIES.get(kind, ()), *expanded_kinds(self)))
+
+    def current_etag(self):
+        version = self.etag_version()
+        if version is None:
+            return None
+        request = self.request
+        raw = f"{request.user.pk}|{request.get_full_path()}|{request.accepted_media_type}|{version}"
+        return f'W/"{hashlib.sha1(raw.encode()).hexdigest()[:24]}"'
+
+    def conditional(self, handler, request, *args, **kwargs):
+        etag = self.current_etag()
+        if etag and weakly_matches(etag, request.headers.get("If-None-Match")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+            if not etag or response.status_code != status.HTTP_200_OK:
+                return response
+        response["ETag"] = etag
+        # per-user data: browsers may keep it but must revalidate, shared caches must not
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
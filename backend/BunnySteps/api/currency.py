@@ -0,0 +1,117 @@
+# api/currency.py
+import csv
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from django.db.models import Case, DecimalField, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Round, TruncDate
+from django.utils.dateparse import parse_date
+
+from .models import DEFAULT_HOME_CURRENCY, ExchangeRate, UserProfile
+
+RATE_FIELD = DecimalField(max_digits=20, decimal_places=8)
+
+
+def home_currency(user_id):
+    return UserProfile.currency_of(user_id)
+
+
+def home_currency_changed(profile, created):
+    """Whether a just-saved UserProfile moved the user to another home currency."""
+    previous = DEFAULT_HOME_CURRENCY if created else profile._loaded_home_currency
+    return profile.home_currency != previous
+
+
+def rate_on(currency, home, day):
+    """
+    Rate converting `currency` into `home` on `day`: the latest direct rate on or
+    before `day`, else the inverse of the latest opposite rate, else None. An
+    unpriced currency is left out of home totals and counted as unpriced rather
+    than guessed at par.
+    """
+    if currency == home:
+        return Decimal("1")
+    rates = ExchangeRate.objects.filter(date__lte=day).order_by("-date")
+    direct = rates.filter(base=currency, quote=home).values_list("rate", flat=True).first()
+    if direct is not None:
+        return direct
+    inverse = rates.filter(base=home, quote=currency).values_list("rate", flat=True).first()
+    return 1 / inverse if inverse else None
+
+
+def convert(amount, currency, home, day):
+    """
+    `amount` in the `home` currency, or None when there is no rate for it. Rounded
+    to the cent half away from zero, like SQL ROUND() in with_home_amount(), so the
+    incremental ledgers and their rebuilds add up the same per-expense figures.
+    """
+    rate = rate_on(currency, home, day)
+    if rate is None:
+        return None
+    return (Decimal(amount) * rate).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def rate_expression(currency="currency", home="home_currency", day="spent_on"):
+    """
+    SQL version of rate_on(), for annotating querysets: `currency`, `home` and `day`
+    name fields/annotations on the outer query. Conversion stays inside the
+    aggregate query (one correlated lookup on the rate index per row); NULL when
+    the currency is unpriced.
+    """
+    rates = ExchangeRate.objects.filter(date__lte=OuterRef(day)).order_by("-date")
+    direct = rates.filter(base=OuterRef(currency), quote=OuterRef(home)).values("rate")[:1]
+    inverse = (
+        rates.filter(base=OuterRef(home), quote=OuterRef(currency))
+        .annotate(inverse=Value(Decimal("1"), output_field=RATE_FIELD) / F("rate"))
+        .values("inverse")[:1]
+    )
+    return Case(
+        When(**{currency: F(home)}, then=Value(Decimal("1"))),
+        default=Coalesce(Subquery(direct), Subquery(inverse)),
+        output_field=RATE_FIELD,
+    )
+
+
+def with_home_amount(expenses):
+    """
+    Annotate Expense rows with the owner's home currency and `home_amount`, rounded
+    to the cent per row as convert() does (NULL when unpriced).
+    """
+    home = UserProfile.objects.filter(user_id=OuterRef("user_id")).values("home_currency")[:1]
+    return expenses.annotate(
+        home_currency=Coalesce(Subquery(home), Value(DEFAULT_HOME_CURRENCY)),
+        spent_on=TruncDate("spent_at"),
+    ).annotate(
+        home_amount=Round(F("amount") * rate_expression(), 2),
+    )
+
+
+def load_rates(lines):
+    """
+    Upsert rates from CSV lines with a `date,base,quote,rate` header.
+    Returns (rows written, set of currencies touched). Raises ValueError naming
+    every line with an unreadable date or rate, before anything is written.
+    """
+    rows, errors = {}, []
+    reader = csv.DictReader(lines)
+    for record in reader:
+        base, quote = record["base"].strip().upper(), record["quote"].strip().upper()
+        raw_date, raw_rate = record["date"].strip(), record["rate"].strip()
+        try:
+            day = parse_date(raw_date)
+        except ValueError:
+            day = None
+        try:
+            rate = Decimal(raw_rate)
+        except InvalidOperation:
+            rate = None
+        if day is None or rate is None or not rate.is_finite() or rate <= 0:
+            errors.append(f"line {reader.line_num}: {raw_date!r}, {raw_rate!r}")
+            continue
+        rows[(base, quote, day)] = ExchangeRate(base=base, quote=quote, date=day, rate=rate)
+    if errors:
+        raise ValueError("bad date or rate on " + "; ".join(errors))
+    ExchangeRate.objects.bulk_create(
+        rows.values(), batch_size=1000,
+        update_conflicts=True, unique_fields=["base", "quote", "date"], update_fields=["rate"],
+    )
+    return len(rows), {currency for base, quote, _ in rows for currency in (base, quote)}
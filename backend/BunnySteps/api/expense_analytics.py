@@ -0,0 +1,140 @@
+# api/expense_analytics.py
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DateField, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .budget import day_of, month_of
+from .currency import convert, home_currency, home_currency_changed, with_home_amount
+from .models import Expense, ExpenseRollup, ShoppingItem, UserProfile
+from .utils import increment_or_create
+
+DIMENSIONS = ("month", "category", "currency", "item_type")
+
+
+def item_type_for(shopping_item_id):
+    if shopping_item_id is None:
+        return ""
+    return ShoppingItem.objects.filter(pk=shopping_item_id).values_list("item_type", flat=True).first() or ""
+
+
+def apply_rollup(key, home, sign=1):
+    """
+    Add (or with sign=-1, remove) one expense, given by its ledger key, from its
+    rollup row; `home_total` is converted into the `home` currency (or the
+    expense counted as unpriced when there is no rate).
+    """
+    home_amount = convert(key.amount, key.currency, home, day_of(key.spent_at))
+    increment_or_create(
+        ExpenseRollup,
+        {
+            "user_id": key.user_id,
+            "month": month_of(key.spent_at),
+            "category": key.category or "",
+            "currency": key.currency,
+            "item_type": item_type_for(key.shopping_item_id),
+        },
+        total=Decimal(key.amount) * sign,
+        home_total=(home_amount or 0) * sign,
+        count=sign,
+        unpriced=sign if home_amount is None else 0,
+    )
+
+
+def grouped_expenses(expenses):
+    """Annotate `expenses` with every cube dimension and `home_amount`, ready for .values(...)."""
+    return with_home_amount(expenses).annotate(
+        month=TruncMonth("spent_at", output_field=DateField()),
+        item_type=Coalesce("shopping_item__item_type", Value("")),
+    )
+
+
+def rebuild_expense_rollups(user_ids):
+    """Recompute ExpenseRollup rows for `user_ids` from one grouped query."""
+    rows = (
+        grouped_expenses(Expense.objects.filter(user_id__in=user_ids))
+        .values("user_id", *DIMENSIONS)
+        .annotate(total=Sum("amount"), home_total=Coalesce(Sum("home_amount"), Value(Decimal("0"))),
+                  count=Count("id"), unpriced=Count("id", filter=Q(home_amount__isnull=True)))
+        .order_by()
+    )
+    rollups = [ExpenseRollup(**row) for row in rows]
+    with transaction.atomic():
+        ExpenseRollup.objects.filter(user_id__in=user_ids).delete()
+        ExpenseRollup.objects.bulk_create(rollups)
+    return len(rollups)
+
+
+def is_whole_months(start, end):
+    return start.day == 1 and (end + timedelta(days=1)).day == 1
+
+
+def expense_cube(user_id, start, end, group_by=DIMENSIONS):
+    """
+    Expense totals between `start` and `end` (inclusive dates) grouped by `group_by`.
+    Ranges made of whole months are summed from ExpenseRollup; anything else falls
+    back to one grouped query over Expense. `total` is in the expense's own currency,
+    `home_total` in the user's home currency and `unpriced` counts the expenses it
+    leaves out for lack of a rate. Returns (source, rows).
+    """
+    group_by = list(group_by)
+    if is_whole_months(start, end):
+        source = "rollup"
+        rows = (
+            ExpenseRollup.objects
+            .filter(user_id=user_id, month__gte=start, month__lte=end)
+            .values(*group_by)
+            .annotate(spent=Sum("total"), home_spent=Sum("home_total"), entries=Sum("count"),
+                      unpriced=Sum("unpriced"))
+        )
+    else:
+        source = "expenses"
+        rows = (
+            grouped_expenses(Expense.objects.filter(
+                user_id=user_id, spent_at__date__gte=start, spent_at__date__lte=end,
+            ))
+            .values(*group_by)
+            .annotate(spent=Sum("amount"), home_spent=Sum("home_amount"), entries=Count("id"),
+                      unpriced=Count("id", filter=Q(home_amount__isnull=True)))
+        )
+    # rollup rows emptied by deletes stay behind with count 0
+    rows = rows.filter(entries__gt=0).order_by(*group_by)
+    return source, [
+        {
+            **{dim: row[dim] for dim in group_by},
+            "total": row["spent"],
+            "home_total": round(row["home_spent"] or Decimal("0"), 2),
+            "count": row["entries"],
+            "unpriced": row["unpriced"],
+        }
+        for row in rows
+    ]
+
+
+@receiver(post_save, sender=Expense)
+def expense_rollup_saved(sender, instance, created, **kwargs):
+    old, new = instance._loaded_ledger_key, instance.ledger_key()
+    if not created and old is None:
+        rebuild_expense_rollups([instance.user_id])
+    elif old != new:
+        home = home_currency(instance.user_id)
+        if old is not None:
+            apply_rollup(old, home, sign=-1)
+        apply_rollup(new, home)
+
+
+@receiver(post_delete, sender=Expense)
+def expense_rollup_deleted(sender, instance, **kwargs):
+    key = instance._loaded_ledger_key or instance.ledger_key()
+    if key is not None:
+        apply_rollup(key, home_currency(key.user_id), sign=-1)
+
+
+@receiver(post_save, sender=UserProfile)
+def reprice_expense_rollups(sender, instance, created, **kwargs):
+    if home_currency_changed(instance, created):
+        rebuild_expense_rollups([instance.user_id])
@@ -0,0 +1,303 @@
+# api/expense_import.py
+import csv
+import re
+from collections import Counter
+from datetime import datetime, time
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+
+from .budget import rebuild_spend_ledger
+from .currency import home_currency
+from .expense_analytics import rebuild_expense_rollups
+from .models import Expense
+from .sync import deferred_changes, record_changes
+
+IMPORT_FORMATS = ("csv", "ofx", "qif")
+MAX_REPORTED_ERRORS = 100
+
+CSV_COLUMNS = {
+    "date": ("date", "spent_at", "transaction date", "posted date"),
+    "amount": ("amount", "value"),
+    "debit": ("debit", "withdrawal", "spent"),
+    "credit": ("credit", "deposit"),
+    "type": ("type", "transaction type", "dr/cr", "debit/credit", "credit/debit"),
+    "note": ("note", "description", "memo", "payee", "name"),
+    "category": ("category",),
+    "currency": ("currency",),
+}
+CSV_DEBIT_TYPES = ("d", "dr", "debit", "withdrawal", "payment", "purchase")
+CSV_CREDIT_TYPES = ("c", "cr", "credit", "deposit", "refund")
+CSV_DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d.%m.%Y", "%Y/%m/%d")
+QIF_DATE_FORMATS = ("%m/%d/%Y", "%m/%d'%y", "%m/%d/%y", "%d/%m/%Y", "%Y-%m-%d")
+OFX_TAG = re.compile(r"<(/?)(\w+)>([^<]*)")
+
+
+def detect_format(filename, declared=None):
+    kind = (declared or filename.rsplit(".", 1)[-1]).lower()
+    if kind not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported file type '{kind}'. Use one of: {', '.join(IMPORT_FORMATS)}.")
+    return kind
+
+
+def parse_date(value, formats):
+    value = value.strip()
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date '{value}'")
+
+
+THOUSANDS_COMMAS = re.compile(r"[-+]?\d{1,3}(,\d{3})+")
+THOUSANDS_DOTS = re.compile(r"[-+]?\d{1,3}(\.\d{3}){2,}")
+
+
+def parse_amount(value):
+    """
+    A decimal amount in either notation: 1,234.50 / 1.234,50 / 1 234,50. A lone
+    comma is the decimal point ("12,50") unless exactly three digits follow each
+    comma ("1,234"), which reads as thousands.
+    """
+    try:
+        text = value.strip().replace(" ", "").replace("\u00a0", "")
+    except AttributeError:
+        raise ValueError(f"Invalid amount '{value}'")
+    if "," in text and "." in text:
+        # whichever separator comes last is the decimal point
+        thousands = "," if text.rindex(".") > text.rindex(",") else "."
+        text = text.replace(thousands, "").replace(",", ".")
+    elif THOUSANDS_COMMAS.fullmatch(text):
+        text = text.replace(",", "")
+    elif THOUSANDS_DOTS.fullmatch(text):
+        text = text.replace(".", "")
+    elif text.count(",") == 1:
+        text = text.replace(",", ".")
+    try:
+        amount = Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount '{value}'")
+    if not amount.is_finite():
+        raise ValueError(f"Invalid amount '{value}'")
+    return amount
+
+
+# Readers stream a file and yield (line_number, raw_record) one transaction at a
+# time; converters turn a raw record into date/amount/note[/category/currency]
+# fields, raising ValueError for that record only. Amounts are positive for spend.
+
+def read_csv(lines):
+    reader = csv.reader(lines)
+    header = [name.strip().lower() for name in next(reader, [])]
+    columns = {}
+    for field, aliases in CSV_COLUMNS.items():
+        for alias in aliases:
+            if alias in header:
+                columns[field] = header.index(alias)
+                break
+    if "date" not in columns or not {"amount", "debit"} & columns.keys():
+        raise ValueError("CSV header needs a date and an amount column.")
+
+    for row in reader:
+        if any(cell.strip() for cell in row):
+            yield reader.line_num, {field: row[index] if index < len(row) else "" for field, index in columns.items()}
+
+
+def csv_amount(raw):
+    """
+    Normalise the file's sign convention to the OFX/QIF one (spend positive,
+    credits skipped): a debit/credit type column decides the direction, a debit
+    column holds spend as positive numbers, and a single signed amount column is
+    negative for spend, as bank exports are.
+    """
+    if raw.get("debit", "").strip():
+        return parse_amount(raw["debit"]).copy_abs()
+    if not raw.get("amount", "").strip():
+        if raw.get("credit", "").strip() or "debit" in raw:
+            return Decimal(0)  # a credit-only row of a debit/credit export
+        raise ValueError("Row has no amount")
+    amount = parse_amount(raw["amount"])
+    direction = raw.get("type", "").strip().lower()
+    if direction in CSV_DEBIT_TYPES:
+        return amount.copy_abs()
+    if direction in CSV_CREDIT_TYPES:
+        return -amount.copy_abs()
+    return -amount
+
+
+def csv_fields(raw):
+    return {
+        **raw,
+        "date": parse_date(raw["date"], CSV_DATE_FORMATS),
+        "amount": csv_amount(raw),
+    }
+
+
+def read_ofx(lines):
+    currency, current, start_line = None, None, 0
+    for line_number, line in enumerate(lines, 1):
+        for closing, tag, value in OFX_TAG.findall(line):
+            tag, value = tag.upper(), value.strip()
+            if tag == "CURDEF" and not closing:
+                currency = value
+            elif tag == "STMTTRN":
+                if not closing:
+                    current, start_line = {}, line_number
+                elif current is not None:
+                    yield start_line, {**current, "CURDEF": currency}
+                    current = None
+            elif current is not None and not closing:
+                current[tag] = value
+
+
+def ofx_fields(raw):
+    if "DTPOSTED" not in raw or "TRNAMT" not in raw:
+        raise ValueError("Transaction is missing DTPOSTED or TRNAMT")
+    return {
+        "date": parse_date(raw["DTPOSTED"][:8], ("%Y%m%d",)),
+        "amount": -parse_amount(raw["TRNAMT"]),
+        "note": " - ".join(filter(None, (raw.get("NAME"), raw.get("MEMO")))),
+        "currency": raw["CURDEF"],
+    }
+
+
+def read_qif(lines):
+    record, start_line = {}, None
+    for line_number, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if not line or line.startswith("!"):
+            continue
+        code, value = line[0], line[1:]
+        if code != "^":
+            if start_line is None:
+                start_line = line_number
+            record[code] = value
+            continue
+        if record:
+            yield start_line, record
+        record, start_line = {}, None
+
+
+def qif_fields(raw):
+    amount = raw.get("T") or raw.get("U")
+    if "D" not in raw or amount is None:
+        raise ValueError("Record is missing a date (D) or amount (T)")
+    return {
+        "date": parse_date(raw["D"], QIF_DATE_FORMATS),
+        "amount": -parse_amount(amount),
+        "note": " - ".join(filter(None, (raw.get("P"), raw.get("M")))),
+        "category": raw.get("L", ""),
+    }
+
+
+FORMATS = {"csv": (read_csv, csv_fields), "ofx": (read_ofx, ofx_fields), "qif": (read_qif, qif_fields)}
+
+
+class ImportReport:
+    def __init__(self, name, kind):
+        self.name = name
+        self.kind = kind
+        self.rows = 0
+        self.imported = 0
+        self.duplicates = 0
+        self.skipped = 0
+        self.errors = []
+        self.error_count = 0
+
+    def error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def as_dict(self):
+        return {
+            "file": self.name,
+            "type": self.kind,
+            "rows": self.rows,
+            "imported": self.imported,
+            "duplicates": self.duplicates,
+            "skipped": self.skipped,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+
+def import_expenses(user, lines, kind, name="", currency=None, batch_size=1000, progress=None):
+    """
+    Stream-import one file's transactions as Expenses for `user`, in `currency`
+    (default: the user's home currency) unless a row names its own.
+    Rows are validated as they are read, de-duplicated by content hash against
+    the user's existing expenses, and written with bulk_create in
+    batches, all in one transaction. Debits (negative amounts in OFX/QIF and
+    signed CSVs, see csv_amount) are imported; credits are skipped. Calls `progress(report)` after every batch.
+    """
+    report = ImportReport(name, kind)
+    currency = currency or home_currency(user.pk)
+    # identical rows in one file are separate transactions (two equal coffees): each
+    # repeat hashes with its occurrence number, so a re-import still matches them all
+    occurrences = Counter()
+    batch = []
+
+    def flush():
+        hashes = [expense.content_hash for expense in batch]
+        existing = set(
+            Expense.objects.filter(user=user, content_hash__in=hashes).values_list("content_hash", flat=True)
+        )
+        fresh = [expense for expense in batch if expense.content_hash not in existing]
+        Expense.objects.bulk_create(fresh, batch_size=batch_size)
+        # bulk_create sends no post_save, so the sync feed is told here
+        record_changes(user.pk, "expenses", [expense.pk for expense in fresh])
+        report.imported += len(fresh)
+        report.duplicates += len(batch) - len(fresh)
+        batch.clear()
+        if progress:
+            progress(report)
+
+    reader, to_fields = FORMATS[kind]
+    # the change feed entries of every batch are written once, at the end
+    with transaction.atomic(), deferred_changes():
+        try:
+            for line, raw in reader(lines):
+                report.rows += 1
+                try:
+                    fields = to_fields(raw)
+                except ValueError as exc:
+                    report.error(line, str(exc))
+                    continue
+
+                amount, note = fields["amount"], (fields.get("note") or "").strip()
+                if amount <= 0:
+                    report.skipped += 1
+                    continue
+                if amount >= Decimal("1e10"):
+                    report.error(line, f"Amount {amount} is too large")
+                    continue
+
+                content = (fields["date"], amount, note)
+                content_hash = Expense.hash_content(*content, occurrence=occurrences[content])
+                occurrences[content] += 1
+
+                batch.append(Expense(
+                    user=user,
+                    amount=amount.quantize(Decimal("0.01")),
+                    currency=(fields.get("currency") or currency)[:8],
+                    category=(fields.get("category") or "")[:120],
+                    note=note,
+                    spent_at=timezone.make_aware(datetime.combine(fields["date"], time(12))),
+                    content_hash=content_hash,
+                ))
+                if len(batch) >= batch_size:
+                    flush()
+        except (ValueError, csv.Error) as exc:
+            # the file itself is unreadable (e.g. a CSV without date/amount columns, or malformed)
+            report.error(None, str(exc))
+        if batch:
+            flush()
+
+        # bulk_create skips the ledger signals; rebuild this user's rows in one grouped query each
+        if report.imported:
+            rebuild_spend_ledger([user.id])
+            rebuild_expense_rollups([user.id])
+    return report
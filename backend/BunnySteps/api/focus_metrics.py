@@ -0,0 +1,107 @@
+# api/focus_metrics.py
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Case, CharField, Count, F, Value, When
+from django.db.models.functions import Coalesce, ExtractHour, TruncDate
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import FocusMetric, FocusSession
+from .recommendations import update_focus_profile
+from .signals import focus_session_ended
+
+# (slot, first hour, last hour exclusive) in the project's local time
+TIME_SLOTS = [
+    ("morning", 5, 12),
+    ("afternoon", 12, 17),
+    ("evening", 17, 22),
+]
+NIGHT_SLOT = "night"
+
+
+def time_slot_for(moment):
+    hour = timezone.localtime(moment).hour
+    for slot, start, end in TIME_SLOTS:
+        if start <= hour < end:
+            return slot
+    return NIGHT_SLOT
+
+
+def time_slot_expression(hour_field="hour"):
+    """SQL equivalent of `time_slot_for` over an annotated local hour."""
+    return Case(
+        *[When(**{f"{hour_field}__gte": start, f"{hour_field}__lt": end}, then=Value(slot))
+          for slot, start, end in TIME_SLOTS],
+        default=Value(NIGHT_SLOT),
+        output_field=CharField(),
+    )
+
+
+def record_session_metric(session):
+    """
+    Fold one finished session into its (user, date, time_slot) FocusMetric
+    row with running-average arithmetic, in a single UPDATE.
+    """
+    minutes = session.effective_minutes or 0
+    key = {
+        "user_id": session.user_id,
+        "date": timezone.localtime(session.started_at).date(),
+        "time_slot": time_slot_for(session.started_at),
+    }
+    count = F("session_count")
+    running_update = {
+        "avg_effective_minutes": (F("avg_effective_minutes") * count + minutes) / (count + 1.0),
+        "avg_interruptions": (F("avg_interruptions") * count + session.interruptions) / (count + 1.0),
+        "session_count": count + 1,
+    }
+
+    if FocusMetric.objects.filter(**key).update(**running_update):
+        return
+    try:
+        with transaction.atomic():
+            FocusMetric.objects.create(
+                **key,
+                avg_effective_minutes=minutes,
+                avg_interruptions=session.interruptions,
+                session_count=1,
+            )
+    except IntegrityError:
+        # another request created the row first
+        FocusMetric.objects.filter(**key).update(**running_update)
+
+
+def rebuild_focus_metrics(user_ids):
+    """Recompute FocusMetric rows for `user_ids` from their sessions with one grouped query."""
+    rows = (
+        FocusSession.objects
+        .filter(user_id__in=user_ids, ended_at__isnull=False)
+        .annotate(date=TruncDate("started_at"), hour=ExtractHour("started_at"))
+        .annotate(time_slot=time_slot_expression())
+        .values("user_id", "date", "time_slot")
+        .annotate(
+            avg_minutes=Avg(Coalesce("effective_minutes", 0)),
+            count=Count("id"),
+            avg_interruptions=Avg("interruptions"),
+        )
+        .order_by()
+    )
+    metrics = [
+        FocusMetric(
+            user_id=row["user_id"],
+            date=row["date"],
+            time_slot=row["time_slot"],
+            avg_effective_minutes=row["avg_minutes"] or 0.0,
+            session_count=row["count"],
+            avg_interruptions=row["avg_interruptions"] or 0.0,
+        )
+        for row in rows
+    ]
+    with transaction.atomic():
+        FocusMetric.objects.filter(user_id__in=user_ids).delete()
+        FocusMetric.objects.bulk_create(metrics, batch_size=1000)
+    return len(metrics)
+
+
+@receiver(focus_session_ended)
+def update_focus_metrics(sender, session, **kwargs):
+    record_session_metric(session)
+    update_focus_profile(session, time_slot_for(session.started_at))
@@ -0,0 +1,144 @@
+# api/hobbies.py
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Hobby, HobbyActivity, HobbySummary, Notification
+
+INACTIVITY_DAYS = 30
+
+
+def latest_activity_at():
+    """Subquery for the newest activity timestamp of the outer row's hobby."""
+    return Subquery(
+        HobbyActivity.objects.filter(hobby_id=OuterRef("hobby_id"))
+        .order_by("-timestamp")
+        .values("timestamp")[:1]
+    )
+
+
+def add_activity(hobby_id, timestamp, minutes):
+    """Count one logged activity in its hobby's summary with a single UPDATE."""
+    updated = HobbySummary.objects.filter(hobby_id=hobby_id).update(
+        activity_count=F("activity_count") + 1,
+        total_minutes=F("total_minutes") + minutes,
+        last_activity_at=Greatest(Coalesce("last_activity_at", Value(timestamp)), Value(timestamp)),
+    )
+    if not updated:
+        # hobby predates the summary table; build its row from history
+        rebuild_hobby_summaries(Hobby.objects.filter(pk=hobby_id))
+
+
+def remove_activity(hobby_id, minutes):
+    """Take one activity out of its hobby's summary; the newest timestamp is re-read."""
+    HobbySummary.objects.filter(hobby_id=hobby_id).update(
+        activity_count=F("activity_count") - 1,
+        total_minutes=F("total_minutes") - minutes,
+        last_activity_at=latest_activity_at(),
+    )
+
+
+def rebuild_hobby_summaries(hobbies):
+    """Recompute HobbySummary rows for a Hobby queryset from one grouped query."""
+    stats = {
+        row["hobby_id"]: row
+        for row in (
+            HobbyActivity.objects.filter(hobby__in=hobbies)
+            .values("hobby_id")
+            .annotate(last=Max("timestamp"), count=Count("id"))
+            .order_by()
+        )
+    }
+    minutes = defaultdict(float)
+    rows = HobbyActivity.objects.filter(hobby__in=hobbies).values_list("hobby_id", "custom_data")
+    for hobby_id, custom_data in rows.iterator():
+        minutes[hobby_id] += HobbyActivity.duration_from(custom_data)
+
+    summaries = [
+        HobbySummary(
+            hobby_id=hobby_id,
+            user_id=user_id,
+            last_activity_at=stats.get(hobby_id, {}).get("last"),
+            activity_count=stats.get(hobby_id, {}).get("count", 0),
+            total_minutes=minutes[hobby_id],
+        )
+        for hobby_id, user_id in hobbies.values_list("pk", "user_id")
+    ]
+    HobbySummary.objects.bulk_create(
+        summaries, batch_size=1000,
+        update_conflicts=True, unique_fields=["hobby"],
+        update_fields=["last_activity_at", "activity_count", "total_minutes"],
+    )
+    return len(summaries)
+
+
+def inactive_hobbies(summaries, cutoff):
+    """Summaries of unfrozen hobbies with no activity since `cutoff` (or none ever)."""
+    return summaries.filter(hobby__frozen=False).filter(
+        Q(last_activity_at__lt=cutoff) | Q(last_activity_at__isnull=True)
+    )
+
+
+def notify_inactive_hobbies(now=None, days=INACTIVITY_DAYS, batch_size=1000):
+    """
+    Set-based inactivity sweep over every user: one indexed range query finds
+    hobbies idle for `days`, then per batch the notifications are bulk-inserted
+    and the summaries stamped in one UPDATE, so a hobby is nudged at most once
+    every `days`. Returns the number of notifications created.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=days)
+    due = list(
+        inactive_hobbies(HobbySummary.objects.all(), cutoff)
+        .filter(Q(inactivity_notified_at__isnull=True) | Q(inactivity_notified_at__lt=cutoff))
+        .order_by("hobby_id")
+        .values_list("hobby_id", "user_id", "hobby__name")
+    )
+
+    for start in range(0, len(due), batch_size):
+        chunk = due[start:start + batch_size]
+        with transaction.atomic():
+            Notification.objects.bulk_create([
+                Notification(
+                    user_id=user_id,
+                    type="hobby_inactive",
+                    title=f"Missing {name}?",
+                    message=f"You haven't logged any {name} in {days} days. Fancy a session?",
+                )
+                for _, user_id, name in chunk
+            ])
+            HobbySummary.objects.filter(hobby_id__in=[hobby_id for hobby_id, _, _ in chunk]).update(
+                inactivity_notified_at=now
+            )
+    return len(due)
+
+
+@receiver(post_save, sender=Hobby)
+def create_hobby_summary(sender, instance, created, **kwargs):
+    if created:
+        HobbySummary.objects.get_or_create(hobby=instance, defaults={"user_id": instance.user_id})
+
+
+@receiver(post_save, sender=HobbyActivity)
+def hobby_activity_saved(sender, instance, created, **kwargs):
+    old, new = instance._loaded_summary_key, instance.summary_key()
+    if not created and old is None:
+        # edited without knowing the previous values (deferred fields, manual pk)
+        rebuild_hobby_summaries(Hobby.objects.filter(pk=instance.hobby_id))
+    elif old != new:
+        if old is not None:
+            remove_activity(old[0], old[2])
+        add_activity(*new)
+
+
+@receiver(post_delete, sender=HobbyActivity)
+def hobby_activity_deleted(sender, instance, **kwargs):
+    key = instance._loaded_summary_key or instance.summary_key()
+    if key is not None:
+        remove_activity(key[0], key[2])
@@ -0,0 +1,136 @@
+# api/hobby_metrics.py
+import re
+
+from django.db import transaction
+from django.db.models import Avg, Count, DateField, Max, Min, Sum
+from django.db.models.functions import Trunc
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Hobby, HobbyActivity, HobbyMetricValue
+
+RATING_RANGE = (0, 10)
+BUCKETS = ("day", "week", "month")
+CLOCK_DURATION = re.compile(r"^(\d+):([0-5]\d)(?::([0-5]\d))?$")
+
+
+def parse_metric(kind, value):
+    """
+    Numeric value of one custom_data entry declared as `kind`; raises ValueError.
+    Durations are minutes, given as a number or as "H:MM" / "H:MM:SS".
+    """
+    if isinstance(value, bool):
+        raise ValueError("expected a number")
+    if kind == "duration" and isinstance(value, str):
+        match = CLOCK_DURATION.match(value.strip())
+        if not match:
+            raise ValueError("expected minutes or H:MM")
+        hours, minutes, seconds = match.groups()
+        return int(hours) * 60 + int(minutes) + int(seconds or 0) / 60
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("expected a number")
+    if number != number or number in (float("inf"), float("-inf")):
+        raise ValueError("expected a finite number")
+    if kind == "duration" and number < 0:
+        raise ValueError("duration cannot be negative")
+    if kind == "rating" and not RATING_RANGE[0] <= number <= RATING_RANGE[1]:
+        raise ValueError(f"rating must be between {RATING_RANGE[0]} and {RATING_RANGE[1]}")
+    return number
+
+
+def validate_metric_fields(metric_fields):
+    if not isinstance(metric_fields, dict):
+        raise ValueError("metric_fields must map field names to a type")
+    for field, kind in metric_fields.items():
+        if kind not in Hobby.METRIC_TYPES:
+            raise ValueError(f"'{field}' must be one of: {', '.join(Hobby.METRIC_TYPES)}")
+        if len(field) > 64:
+            raise ValueError(f"'{field[:20]}...' is longer than 64 characters")
+
+
+def validate_custom_data(metric_fields, custom_data):
+    """Errors per declared field whose custom_data value does not parse; {} when all are fine."""
+    errors = {}
+    data = custom_data if isinstance(custom_data, dict) else {}
+    for field, kind in (metric_fields or {}).items():
+        if data.get(field) is None:
+            continue
+        try:
+            parse_metric(kind, data[field])
+        except ValueError as exc:
+            errors[field] = str(exc)
+    return errors
+
+
+def metric_values(activity, metric_fields):
+    """HobbyMetricValue rows for one activity; undeclared or unparseable entries are skipped."""
+    data = activity.custom_data if isinstance(activity.custom_data, dict) else {}
+    rows = []
+    for field, kind in (metric_fields or {}).items():
+        if data.get(field) is None:
+            continue
+        try:
+            value = parse_metric(kind, data[field])
+        except ValueError:
+            continue
+        rows.append(HobbyMetricValue(
+            activity_id=activity.pk, hobby_id=activity.hobby_id,
+            field=field, value=value, timestamp=activity.timestamp,
+        ))
+    return rows
+
+
+def reindex_hobby_metrics(hobby):
+    """Re-extract every activity of `hobby` after its metric_fields changed."""
+    activities = HobbyActivity.objects.filter(hobby=hobby).only("id", "hobby_id", "timestamp", "custom_data")
+    with transaction.atomic():
+        HobbyMetricValue.objects.filter(hobby=hobby).delete()
+        rows = []
+        for activity in activities.iterator(chunk_size=2000):
+            rows.extend(metric_values(activity, hobby.metric_fields))
+        HobbyMetricValue.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def metric_series(hobby, start, end, bucket="day", fields=None):
+    """
+    sum/avg/min/max/count per (field, period) for `hobby` between the `start`
+    and `end` datetimes, from one grouped query on the (hobby, field, timestamp)
+    index. Returns {field: [rows ordered by period]}.
+    """
+    values = HobbyMetricValue.objects.filter(hobby=hobby, timestamp__gte=start, timestamp__lt=end)
+    if fields:
+        values = values.filter(field__in=fields)
+    rows = (
+        values
+        .annotate(period=Trunc("timestamp", bucket, output_field=DateField()))
+        .values("field", "period")
+        .annotate(sum=Sum("value"), avg=Avg("value"), min=Min("value"), max=Max("value"), count=Count("id"))
+        .order_by("field", "period")
+    )
+
+    series = {}
+    for row in rows:
+        series.setdefault(row.pop("field"), []).append(row)
+    return series
+
+
+@receiver(post_save, sender=HobbyActivity)
+def extract_activity_metrics(sender, instance, created, **kwargs):
+    if "hobby" in instance._state.fields_cache:
+        metric_fields = instance.hobby.metric_fields
+    else:
+        metric_fields = Hobby.objects.filter(pk=instance.hobby_id).values_list("metric_fields", flat=True).first()
+    if not created:
+        HobbyMetricValue.objects.filter(activity_id=instance.pk).delete()
+    rows = metric_values(instance, metric_fields)
+    if rows:
+        HobbyMetricValue.objects.bulk_create(rows)
+
+
+@receiver(post_save, sender=Hobby)
+def reindex_on_metric_fields_change(sender, instance, created, **kwargs):
+    if not created and instance.metric_fields != instance._loaded_metric_fields:
+        reindex_hobby_metrics(instance)
@@ -0,0 +1,15 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from api.models import award_weekly_discipline
+
+
+class Command(BaseCommand):
+    help = "Award the no-impulsive-week badge and coin bonus to every eligible user (run nightly)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        awarded = award_weekly_discipline(get_user_model().objects.all(), batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Awarded {awarded} user(s)"))
@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from api.focus_metrics import rebuild_focus_metrics, time_slot_for
+from api.recommendations import rebuild_focus_profile
+
+
+class Command(BaseCommand):
+    help = "Rebuild FocusMetric rows and focus profiles from all historical focus sessions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500,
+                            help="Users rebuilt per grouped query")
+        parser.add_argument("--user", type=int, action="append", dest="users",
+                            help="Only rebuild these user ids (repeatable)")
+
+    def handle(self, *args, **options):
+        user_ids = options["users"] or get_user_model().objects.order_by("pk").values_list("pk", flat=True)
+        user_ids = list(user_ids)
+        chunk_size = options["chunk_size"]
+
+        total = 0
+        for start in range(0, len(user_ids), chunk_size):
+            total += rebuild_focus_metrics(user_ids[start:start + chunk_size])
+        for user_id in user_ids:
+            rebuild_focus_profile(user_id, time_slot_for)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {total} focus metric row(s) for {len(user_ids)} user(s)"
+        ))
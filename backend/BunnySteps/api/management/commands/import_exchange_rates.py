@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.budget import rebuild_spend_ledger
+from api.currency import load_rates
+from api.expense_analytics import rebuild_expense_rollups
+from api.models import Expense
+
+
+class Command(BaseCommand):
+    help = ("Load dated exchange rates from a CSV file (date,base,quote,rate) and "
+            "re-price the spend ledger of users with expenses in those currencies.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file with a date,base,quote,rate header")
+        parser.add_argument("--chunk-size", type=int, default=500,
+                            help="Users re-priced per grouped query")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], encoding="utf-8-sig", newline="") as lines:
+                written, currencies = load_rates(lines)
+        except KeyError as exc:
+            raise CommandError(f"Could not read rates: missing column {exc}")
+        except ValueError as exc:
+            raise CommandError(f"Could not read rates: {exc}")
+
+        user_ids = list(
+            Expense.objects.filter(currency__in=currencies)
+            .order_by("user_id").values_list("user_id", flat=True).distinct()
+        )
+        chunk_size = options["chunk_size"]
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            rebuild_spend_ledger(chunk)
+            rebuild_expense_rollups(chunk)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded {written} rate(s) for {len(currencies)} currencies; re-priced {len(user_ids)} user(s)"
+        ))
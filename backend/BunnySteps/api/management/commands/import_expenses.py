@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from api.expense_import import detect_format, import_expenses
+
+
+class Command(BaseCommand):
+    help = "Stream-import CSV/OFX/QIF bank exports as expenses for one user."
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", help="Files to import")
+        parser.add_argument("--user", type=int, required=True, help="User id to import for")
+        parser.add_argument("--file-type", choices=["csv", "ofx", "qif"],
+                            help="Override detection from the file extension")
+        parser.add_argument("--currency",
+                            help="Currency for rows that do not name one (default: the user's home currency)")
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Rows per bulk insert")
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(pk=options["user"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with id {options['user']}")
+
+        for path in options["paths"]:
+            try:
+                kind = detect_format(path, options["file_type"])
+            except ValueError as exc:
+                raise CommandError(str(exc))
+
+            with open(path, encoding="utf-8-sig", errors="replace", newline="") as lines:
+                report = import_expenses(
+                    user, lines, kind, name=path,
+                    currency=options["currency"],
+                    batch_size=options["batch_size"],
+                    progress=lambda r: self.stdout.write(f"  {r.name}: {r.rows} row(s) read, {r.imported} imported"),
+                )
+
+            for error in report.errors:
+                self.stderr.write(f"  {path}:{error['line'] or '-'}: {error['error']}")
+            self.stdout.write(self.style.SUCCESS(
+                f"{path}: imported {report.imported} of {report.rows} row(s) "
+                f"({report.duplicates} duplicate(s), {report.skipped} skipped, {report.error_count} error(s))"
+            ))
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.recurrence import HORIZON_DAYS, extend_horizon, sync_existing_series
+
+
+class Command(BaseCommand):
+    help = "Materialise upcoming occurrences of recurring tasks and reminders (run nightly)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=HORIZON_DAYS,
+                            help=f"Horizon to materialise up to, in days from now (default {HORIZON_DAYS})")
+        parser.add_argument("--sync", action="store_true",
+                            help="First (re)build series for every task/reminder that has a rule")
+        parser.add_argument("--user", type=int, action="append", dest="users",
+                            help="Only these user ids (repeatable)")
+
+    def handle(self, *args, **options):
+        users = options["users"]
+        if options["sync"]:
+            synced = sync_existing_series(users)
+            self.stdout.write(f"Synced {synced} recurring series")
+
+        until = timezone.now() + timedelta(days=options["days"])
+        created = 0
+        for user_id in users or [None]:
+            created += extend_horizon(until, user_id=user_id)
+        self.stdout.write(self.style.SUCCESS(f"Materialised {created} occurrence(s) up to {until:%Y-%m-%d}"))
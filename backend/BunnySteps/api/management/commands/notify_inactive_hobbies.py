@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from api.hobbies import INACTIVITY_DAYS, notify_inactive_hobbies
+
+
+class Command(BaseCommand):
+    help = "Notify every user about unfrozen hobbies with no activity for a while (run nightly)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=INACTIVITY_DAYS,
+                            help="Days without activity before a hobby counts as inactive")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        sent = notify_inactive_hobbies(days=options["days"], batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} inactivity notification(s)"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from api.hobbies import rebuild_hobby_summaries
+from api.models import Hobby
+
+
+class Command(BaseCommand):
+    help = "Rebuild HobbySummary rows from all logged hobby activities."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", dest="users",
+                            help="Only rebuild these user ids (repeatable)")
+
+    def handle(self, *args, **options):
+        hobbies = Hobby.objects.all()
+        if options["users"]:
+            hobbies = hobbies.filter(user_id__in=options["users"])
+        total = rebuild_hobby_summaries(hobbies)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} hobby summary row(s)"))
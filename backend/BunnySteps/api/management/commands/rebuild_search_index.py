@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from api.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index from tasks, notes, hobby activities, shopping items and mood logs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", dest="users",
+                            help="Only rebuild these user ids (repeatable)")
+        parser.add_argument("--chunk-size", type=int, default=2000,
+                            help="Rows read and written per batch")
+
+    def handle(self, *args, **options):
+        total = rebuild_search_index(options["users"], chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} document(s)"))
@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from api.budget import rebuild_spend_ledger
+from api.expense_analytics import rebuild_expense_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the MonthlySpend ledger and ExpenseRollup rows from all historical expenses."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500,
+                            help="Users rebuilt per grouped query")
+        parser.add_argument("--user", type=int, action="append", dest="users",
+                            help="Only rebuild these user ids (repeatable)")
+
+    def handle(self, *args, **options):
+        user_ids = options["users"] or get_user_model().objects.order_by("pk").values_list("pk", flat=True)
+        user_ids = list(user_ids)
+        chunk_size = options["chunk_size"]
+
+        ledger = rollups = 0
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            ledger += rebuild_spend_ledger(chunk)
+            rollups += rebuild_expense_rollups(chunk)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {ledger} ledger row(s) and {rollups} rollup row(s) for {len(user_ids)} user(s)"
+        ))
@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from api.streaks import STREAK_SOURCES, rebuild_streak
+
+
+class Command(BaseCommand):
+    help = "Recompute mood, focus and task streaks from history."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", dest="users",
+                            help="Only rebuild these user ids (repeatable)")
+        parser.add_argument("--kind", choices=sorted(STREAK_SOURCES), action="append", dest="kinds")
+
+    def handle(self, *args, **options):
+        user_ids = options["users"] or list(
+            get_user_model().objects.order_by("pk").values_list("pk", flat=True)
+        )
+        kinds = options["kinds"] or sorted(STREAK_SOURCES)
+
+        for user_id in user_ids:
+            for kind in kinds:
+                rebuild_streak(user_id, kind)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt streaks for {len(user_ids)} user(s)"))
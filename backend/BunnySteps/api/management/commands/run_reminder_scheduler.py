@@ -0,0 +1,37 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from api.scheduler import ReminderScheduler
+
+
+class Command(BaseCommand):
+    help = "Fire due reminders for all users from a background loop."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--poll-interval", type=float, default=15.0,
+                            help="Max seconds between syncs with the reminders table")
+        parser.add_argument("--horizon-hours", type=float, default=6.0,
+                            help="How far ahead reminders are kept in memory")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--once", action="store_true",
+                            help="Run a single sync/fire pass and exit (for cron)")
+
+    def handle(self, *args, **options):
+        scheduler = ReminderScheduler(
+            horizon=timedelta(hours=options["horizon_hours"]),
+            batch_size=options["batch_size"],
+        )
+        poll_interval = options["poll_interval"]
+
+        while True:
+            scheduler.sync()
+            fired = scheduler.fire_due()
+            if fired:
+                self.stdout.write(f"Fired {fired} reminder(s)")
+            if options["once"]:
+                return
+
+            wait = scheduler.seconds_until_next()
+            time.sleep(poll_interval if wait is None else min(wait, poll_interval))
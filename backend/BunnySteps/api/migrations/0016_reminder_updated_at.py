@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_task_user_created_id_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reminder',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Lets the reminder scheduler reload edits incrementally'),
+        ),
+        migrations.AddIndex(
+            model_name='reminder',
+            index=models.Index(fields=['notified', 'remind_at'], name='api_reminde_notifie_e40d84_idx'),
+        ),
+    ]
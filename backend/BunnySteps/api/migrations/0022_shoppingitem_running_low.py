@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def flag_running_low(apps, schema_editor):
+    # one-off scan so items flagged only through their note keep showing as running low
+    ShoppingItem = apps.get_model('api', 'ShoppingItem')
+    keywords = models.Q()
+    for keyword in ('almost over', 'running low', 'almost out'):
+        keywords |= models.Q(note__icontains=keyword)
+    ShoppingItem.objects.filter(keywords).update(running_low=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_monthlyspend'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shoppingitem',
+            name='running_low',
+            field=models.BooleanField(default=False, help_text='Almost used up. Set from note keywords on save, or directly by the user'),
+        ),
+        migrations.AddIndex(
+            model_name='shoppingitem',
+            index=models.Index(fields=['user', 'purchased', 'expiry_date'], name='shop_user_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shoppingitem',
+            index=models.Index(condition=models.Q(('purchased', False), ('running_low', True)), fields=['user'], name='shop_user_running_low_idx'),
+        ),
+        migrations.RunPython(flag_running_low, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:07
+
+from django.conf import settings
+import hashlib
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def hash_existing_expenses(apps, schema_editor):
+    # same recipe as Expense.hash_content
+    Expense = apps.get_model('api', 'Expense')
+    batch = []
+    for expense in Expense.objects.only('id', 'spent_at', 'amount', 'note').iterator(chunk_size=2000):
+        raw = f"{timezone.localdate(expense.spent_at).isoformat()}|{expense.amount:.2f}|{expense.note.strip()}"
+        expense.content_hash = hashlib.sha256(raw.encode()).hexdigest()
+        batch.append(expense)
+        if len(batch) >= 2000:
+            Expense.objects.bulk_update(batch, ['content_hash'])
+            batch = []
+    Expense.objects.bulk_update(batch, ['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_expenserollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expense',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, help_text='Hash of (day, amount, note); used to skip duplicate imports', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'content_hash'], name='expense_user_hash_idx'),
+        ),
+        migrations.RunPython(hash_existing_expenses, migrations.RunPython.noop),
+    ]
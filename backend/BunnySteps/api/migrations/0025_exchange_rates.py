@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_expense_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expenserollup',
+            name='home_total',
+            field=models.DecimalField(decimal_places=2, default=0, help_text="`total` converted to the user's home currency", max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='home_currency',
+            field=models.CharField(default='TND', help_text='Currency that salary and spending totals are reported in', max_length=8),
+        ),
+        migrations.CreateModel(
+            name='ExchangeRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('base', models.CharField(max_length=8)),
+                ('quote', models.CharField(max_length=8)),
+                ('date', models.DateField()),
+                ('rate', models.DecimalField(decimal_places=8, max_digits=20)),
+            ],
+            options={
+                'unique_together': {('base', 'quote', 'date')},
+            },
+        ),
+    ]
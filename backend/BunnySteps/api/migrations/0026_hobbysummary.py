@@ -0,0 +1,84 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:15
+
+import django.db.models.deletion
+from django.conf import settings
+from collections import defaultdict
+
+from django.db import migrations, models
+
+DURATION_KEYS = ('duration_minutes', 'duration_min', 'time_spent')
+
+
+def summarise_existing_hobbies(apps, schema_editor):
+    # same rules as api.hobbies.rebuild_hobby_summaries, on the historical models
+    Hobby = apps.get_model('api', 'Hobby')
+    HobbyActivity = apps.get_model('api', 'HobbyActivity')
+    HobbySummary = apps.get_model('api', 'HobbySummary')
+
+    stats = {
+        row['hobby_id']: row
+        for row in HobbyActivity.objects.values('hobby_id')
+        .annotate(last=models.Max('timestamp'), count=models.Count('id')).order_by()
+    }
+    minutes = defaultdict(float)
+    for hobby_id, data in HobbyActivity.objects.values_list('hobby_id', 'custom_data').iterator():
+        data = data if isinstance(data, dict) else {}
+        for key in DURATION_KEYS:
+            value = data.get(key)
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0:
+                minutes[hobby_id] += value
+                break
+
+    HobbySummary.objects.bulk_create([
+        HobbySummary(
+            hobby_id=hobby_id, user_id=user_id,
+            last_activity_at=stats.get(hobby_id, {}).get('last'),
+            activity_count=stats.get(hobby_id, {}).get('count', 0),
+            total_minutes=minutes[hobby_id],
+        )
+        for hobby_id, user_id in Hobby.objects.values_list('pk', 'user_id').iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_exchange_rates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HobbySummary',
+            fields=[
+                ('hobby', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='api.hobby')),
+                ('last_activity_at', models.DateTimeField(blank=True, null=True)),
+                ('activity_count', models.IntegerField(default=0)),
+                ('total_minutes', models.FloatField(default=0)),
+                ('inactivity_notified_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='type',
+            field=models.CharField(choices=[('reminder', 'Reminder'), ('task_complete', 'Task Complete'), ('level_up', 'Level Up'), ('badge_earned', 'Badge Earned'), ('reminder_due', 'Reminder Due'), ('weekly_discipline', 'Weekly Discipline'), ('hobby_inactive', 'Hobby Inactive')], max_length=30),
+        ),
+        migrations.AddIndex(
+            model_name='hobbyactivity',
+            index=models.Index(fields=['hobby', '-timestamp'], name='hobby_activity_latest_idx'),
+        ),
+        migrations.AddField(
+            model_name='hobbysummary',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hobby_summaries', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='hobbysummary',
+            index=models.Index(fields=['user', 'last_activity_at'], name='hobby_summary_user_last_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hobbysummary',
+            index=models.Index(fields=['last_activity_at'], name='hobby_summary_last_idx'),
+        ),
+        migrations.RunPython(summarise_existing_hobbies, migrations.RunPython.noop),
+    ]
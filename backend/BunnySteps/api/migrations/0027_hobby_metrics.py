@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_hobbysummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hobby',
+            name='metric_fields',
+            field=models.JSONField(blank=True, default=dict, help_text='Typed custom_data fields to chart, e.g. {"minutes": "duration", "pages": "number"}'),
+        ),
+        migrations.CreateModel(
+            name='HobbyMetricValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(max_length=64)),
+                ('value', models.FloatField()),
+                ('timestamp', models.DateTimeField()),
+                ('activity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='metric_values', to='api.hobbyactivity')),
+                ('hobby', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='metric_values', to='api.hobby')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hobby', 'field', 'timestamp'], name='hobby_metric_series_idx')],
+            },
+        ),
+    ]
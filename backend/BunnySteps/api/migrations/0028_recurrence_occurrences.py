@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0027_hobby_metrics'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecurrenceSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rule', models.CharField(max_length=500)),
+                ('dtstart', models.DateTimeField()),
+                ('materialised_until', models.DateTimeField()),
+                ('exhausted', models.BooleanField(default=False)),
+                ('reminder', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='recurrence', to='api.reminder')),
+                ('task', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='recurrence', to='api.task')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recurrence_series', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Occurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('at', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to=settings.AUTH_USER_MODEL)),
+                ('series', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='api.recurrenceseries')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='recurrenceseries',
+            index=models.Index(fields=['exhausted', 'materialised_until'], name='recurrence_horizon_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='occurrence',
+            index=models.Index(fields=['user', 'at'], name='occurrence_user_at_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='occurrence',
+            unique_together={('series', 'at')},
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0028_recurrence_occurrences'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='focussession',
+            index=models.Index(fields=['user', 'ended_at'], name='focus_user_ended_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reminder',
+            index=models.Index(fields=['user', 'remind_at'], name='reminder_user_remind_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'due_date'], name='task_user_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'preferred_datetime'], name='task_user_preferred_idx'),
+        ),
+    ]
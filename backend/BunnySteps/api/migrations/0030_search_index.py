@@ -0,0 +1,98 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+SQLITE_INDEX = [
+    "CREATE VIRTUAL TABLE api_searchdocument_fts USING fts5("
+    "owner, title, body, tokenize = 'unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER api_searchdocument_fts_ai AFTER INSERT ON api_searchdocument BEGIN "
+    "INSERT INTO api_searchdocument_fts (rowid, owner, title, body) "
+    "VALUES (new.id, 'u' || new.user_id, new.title, new.body); END",
+    "CREATE TRIGGER api_searchdocument_fts_ad AFTER DELETE ON api_searchdocument BEGIN "
+    "DELETE FROM api_searchdocument_fts WHERE rowid = old.id; END",
+    "CREATE TRIGGER api_searchdocument_fts_au AFTER UPDATE ON api_searchdocument "
+    "WHEN old.title IS NOT new.title OR old.body IS NOT new.body OR old.user_id IS NOT new.user_id BEGIN "
+    "UPDATE api_searchdocument_fts SET owner = 'u' || new.user_id, title = new.title, body = new.body "
+    "WHERE rowid = new.id; END",
+]
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS api_searchdocument_fts_ai",
+    "DROP TRIGGER IF EXISTS api_searchdocument_fts_ad",
+    "DROP TRIGGER IF EXISTS api_searchdocument_fts_au",
+    "DROP TABLE IF EXISTS api_searchdocument_fts",
+]
+POSTGRES_INDEX = [
+    "ALTER TABLE api_searchdocument ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(body, '')), 'B')) STORED",
+    "CREATE INDEX api_searchdocument_vector_idx ON api_searchdocument USING GIN (search_vector)",
+]
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS api_searchdocument_vector_idx",
+    "ALTER TABLE api_searchdocument DROP COLUMN IF EXISTS search_vector",
+]
+
+# same sources as api.search.SOURCES: model -> (kind, title field, body field)
+SOURCES = {
+    'Task': ('task', 'title', 'description'),
+    'Note': ('note', 'title', 'body'),
+    'HobbyActivity': ('hobby_activity', None, 'notes'),
+    'ShoppingItem': ('shopping_item', 'name', 'note'),
+    'MoodLog': ('mood_log', 'mood', 'note'),
+}
+
+
+def run(statements_by_vendor):
+    def forwards(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return forwards
+
+
+def index_existing_rows(apps, schema_editor):
+    SearchDocument = apps.get_model('api', 'SearchDocument')
+    for model_name, (kind, title_field, body_field) in SOURCES.items():
+        fields = [name for name in ('id', 'user_id', 'created_at', title_field, body_field) if name]
+        batch = []
+        for row in apps.get_model('api', model_name).objects.values(*fields).iterator(chunk_size=2000):
+            title = (row.get(title_field) or '')[:255] if title_field else ''
+            body = row[body_field] or ''
+            if title.strip() or body.strip():
+                batch.append(SearchDocument(
+                    user_id=row['user_id'], kind=kind, object_id=row['id'],
+                    title=title, body=body, created_at=row['created_at'],
+                ))
+        SearchDocument.objects.bulk_create(batch, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0029_calendar_range_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=32)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('title', models.CharField(blank=True, max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(
+            run({'sqlite': SQLITE_INDEX, 'postgresql': POSTGRES_INDEX}),
+            run({'sqlite': SQLITE_DROP, 'postgresql': POSTGRES_DROP}),
+        ),
+        migrations.RunPython(index_existing_rows, migrations.RunPython.noop),
+    ]
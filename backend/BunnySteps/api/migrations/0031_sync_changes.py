@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:35
+
+import django.db.models.deletion
+from django.conf import settings
+from collections import defaultdict
+
+from django.db import migrations, models
+
+# same kinds as api.sync.SYNCED, in the order existing rows are numbered
+SYNCED = [
+    ('categories', 'Category'), ('tasks', 'Task'), ('focus-sessions', 'FocusSession'),
+    ('hobbies', 'Hobby'), ('hobby-activities', 'HobbyActivity'), ('reminders', 'Reminder'),
+    ('notes', 'Note'), ('mood-logs', 'MoodLog'), ('shopping-items', 'ShoppingItem'),
+    ('expenses', 'Expense'), ('badges', 'Badge'), ('rewards', 'RewardSummary'),
+]
+
+
+def record_existing_rows(apps, schema_editor):
+    # so a first sync (since=0) returns everything the user already has
+    SyncChange = apps.get_model('api', 'SyncChange')
+    SyncCounter = apps.get_model('api', 'SyncCounter')
+    last_seq = defaultdict(int)
+    for kind, model_name in SYNCED:
+        rows = apps.get_model('api', model_name).objects.filter(user__isnull=False).order_by('pk')
+        batch = []
+        for object_id, user_id in rows.values_list('pk', 'user_id').iterator(chunk_size=2000):
+            last_seq[user_id] += 1
+            batch.append(SyncChange(user_id=user_id, seq=last_seq[user_id], kind=kind, object_id=object_id))
+        SyncChange.objects.bulk_create(batch, batch_size=1000)
+    SyncCounter.objects.bulk_create(
+        [SyncCounter(user_id=user_id, last_seq=seq) for user_id, seq in last_seq.items()], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0030_search_index'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='sync_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('last_seq', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SyncChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.PositiveBigIntegerField()),
+                ('kind', models.CharField(max_length=32)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('deleted', models.BooleanField(default=False)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sync_changes', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'seq'], name='sync_change_user_seq_idx')],
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(record_existing_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0031_sync_changes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='syncchange',
+            index=models.Index(fields=['user', 'kind', 'seq'], name='sync_change_user_kind_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0032_sync_change_kind_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expenserollup',
+            name='unpriced',
+            field=models.IntegerField(default=0, help_text='Expenses left out of `home_total`: no rate to the home currency'),
+        ),
+        migrations.AddField(
+            model_name='monthlyspend',
+            name='unpriced',
+            field=models.IntegerField(default=0, help_text='Expenses left out of `total`: no rate to the home currency'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0033_spend_unpriced_counts'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='expense',
+            name='currency',
+            field=models.CharField(blank=True, help_text="Left blank, the owner's home currency when the expense is saved", max_length=8),
+        ),
+    ]
@@ -1,9 +1,16 @@
+import hashlib
+from collections import namedtuple
+from decimal import Decimal
+
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Exists, F, OuterRef
 from django.utils import timezone
 from django.contrib.postgres.indexes import BrinIndex  # optional for time series scaling
 from django.core.validators import MinValueValidator
 
+from .signals import focus_session_ended, task_completed
+
 User = settings.AUTH_USER_MODEL
 
 
@@ -89,14 +96,39 @@ class Task(models.Model):
     completed_at = models.DateTimeField(null=True, blank=True)
     completed = models.BooleanField(default=False)
     _old_status = None
+    # (rule, anchor) as last loaded/saved; edits re-materialise occurrences (api/recurrence.py)
+    _loaded_recurrence_key = None
+
+    class Meta:
+        indexes = [
+            # keyset pagination: WHERE user = ? AND (created_at, id) < (?, ?)
+            models.Index(fields=["user", "-created_at", "-id"], name="task_user_created_id_idx"),
+            # calendar range reads (api/calendar_feed.py)
+            models.Index(fields=["user", "due_date"], name="task_user_due_idx"),
+            models.Index(fields=["user", "preferred_datetime"], name="task_user_preferred_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_recurrence_key = instance.recurrence_key()
+        return instance
+
+    def recurrence_key(self):
+        fields = self.__dict__
+        if not all(name in fields for name in ("recurrence_rule", "preferred_datetime", "due_date", "created_at")):
+            return None
+        anchor = fields["preferred_datetime"] or fields["due_date"] or fields["created_at"]
+        return (fields["recurrence_rule"].strip(), anchor)
+
     def save(self, *args, **kwargs):
         if self.completed and not self.completed_at:
             self.completed_at = timezone.now()
         super().save(*args, **kwargs)
+        self._loaded_recurrence_key = self.recurrence_key()
 
 
 # ---------- Focus Mode (user-defined / presets) ----------
@@ -143,12 +175,27 @@ class FocusSession(models.Model):
         indexes = [
             models.Index(fields=["user", "started_at"]),
             BrinIndex(fields=["started_at"]),
+            # overlap reads: ended_at > window start bounds the scan to the window
+            models.Index(fields=["user", "ended_at"], name="focus_user_ended_idx"),
         ]
 
+    # ended_at as last loaded/saved; lets save() spot the moment a session ends
+    _loaded_ended_at = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_ended_at = instance.__dict__.get("ended_at")
+        return instance
+
     def save(self, *args, **kwargs):
         if self.ended_at and not self.effective_minutes:
             self.effective_minutes = int((self.ended_at - self.started_at).total_seconds() // 60)
+        just_ended = self.ended_at is not None and self._loaded_ended_at is None
         super().save(*args, **kwargs)
+        self._loaded_ended_at = self.ended_at
+        if just_ended:
+            focus_session_ended.send(sender=FocusSession, session=self)
 
     def __str__(self):
         return f"FocusSession({self.user}, {self.mode_name or self.mode})"
@@ -171,6 +218,17 @@ class FocusMetric(models.Model):
         unique_together = ("user", "date", "time_slot")
 
 
+class FocusProfile(models.Model):
+    """
+    Per-user exponentially weighted focus model, one entry per time slot:
+    {"morning": [avg_minutes, avg_interruptions, hyperfocus_rate, sessions], ...}
+    Updated incrementally when a session ends (see api/recommendations.py).
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="focus_profile")
+    slots = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
 # ---------- Hobby and HobbyActivity ----------
 class Hobby(models.Model):
     """
@@ -183,6 +241,25 @@ class Hobby(models.Model):
     description = models.CharField(max_length=300)
     Note = models.CharField(max_length=300, blank=True)
     frozen = models.BooleanField(default=False)
+    METRIC_TYPES = ("number", "duration", "rating")
+    metric_fields = models.JSONField(
+        default=dict, blank=True,
+        help_text='Typed custom_data fields to chart, e.g. {"minutes": "duration", "pages": "number"}',
+    )
+
+    # metric_fields as last loaded/saved; a change re-extracts this hobby's metric values
+    _loaded_metric_fields = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_metric_fields = instance.__dict__.get("metric_fields")
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_metric_fields = self.metric_fields
+
     def __str__(self):
         return f"{self.name} ({self.user})"
     def freeze(self, reason: str = ""):
@@ -203,6 +280,82 @@ class HobbyActivity(models.Model):
     custom_data = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # custom_data keys that hold the logged duration in minutes, first match wins
+    DURATION_KEYS = ("duration_minutes", "duration_min", "time_spent")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["hobby", "-timestamp"], name="hobby_activity_latest_idx"),
+        ]
+
+    # values as last loaded/saved; lets the hobby summary apply edits as deltas
+    _loaded_summary_key = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_summary_key = instance.summary_key()
+        return instance
+
+    @classmethod
+    def duration_from(cls, custom_data):
+        data = custom_data if isinstance(custom_data, dict) else {}
+        for key in cls.DURATION_KEYS:
+            value = data.get(key)
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0:
+                return float(value)
+        return 0.0
+
+    @property
+    def duration_minutes(self):
+        return self.duration_from(self.custom_data)
+
+    def summary_key(self):
+        fields = self.__dict__
+        if not all(name in fields for name in ("hobby_id", "timestamp", "custom_data")):
+            return None
+        return (fields["hobby_id"], fields["timestamp"], self.duration_minutes)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_summary_key = self.summary_key()
+
+
+class HobbyMetricValue(models.Model):
+    """
+    One typed metric pulled out of HobbyActivity.custom_data at write time
+    (see Hobby.metric_fields and api/hobby_metrics.py). Durations are in minutes.
+    """
+    activity = models.ForeignKey(HobbyActivity, on_delete=models.CASCADE, related_name="metric_values")
+    hobby = models.ForeignKey(Hobby, on_delete=models.CASCADE, related_name="metric_values")
+    field = models.CharField(max_length=64)
+    value = models.FloatField()
+    timestamp = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["hobby", "field", "timestamp"], name="hobby_metric_series_idx"),
+        ]
+
+
+class HobbySummary(models.Model):
+    """
+    Per-hobby activity rollup maintained from HobbyActivity writes (api/hobbies.py).
+    `last_activity_at` is null until the first activity is logged.
+    """
+    hobby = models.OneToOneField(Hobby, on_delete=models.CASCADE, primary_key=True, related_name="summary")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="hobby_summaries")
+    last_activity_at = models.DateTimeField(null=True, blank=True)
+    activity_count = models.IntegerField(default=0)
+    total_minutes = models.FloatField(default=0)
+    inactivity_notified_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "last_activity_at"], name="hobby_summary_user_last_idx"),
+            models.Index(fields=["last_activity_at"], name="hobby_summary_last_idx"),
+        ]
+
 
 # ---------- Reminders ----------
 class Reminder(models.Model):
@@ -220,7 +373,34 @@ class Reminder(models.Model):
     freeze_reason = models.TextField(blank=True)
     snoozed_until = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, help_text="Lets the reminder scheduler reload edits incrementally")
     notified = models.BooleanField(default=False, help_text="Prevents duplicate notifications")
+
+    # (rule, anchor) as last loaded/saved; edits re-materialise occurrences (api/recurrence.py)
+    _loaded_recurrence_key = None
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["notified", "remind_at"]),
+            models.Index(fields=["user", "remind_at"], name="reminder_user_remind_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_recurrence_key = instance.recurrence_key()
+        return instance
+
+    def recurrence_key(self):
+        fields = self.__dict__
+        if not all(name in fields for name in ("repeat_rule", "remind_at", "created_at")):
+            return None
+        return (fields["repeat_rule"].strip(), fields["remind_at"] or fields["created_at"])
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_recurrence_key = self.recurrence_key()
+
     def freeze(self, reason: str = ""):
         self.frozen = True
         self.freeze_reason = reason
@@ -232,6 +412,38 @@ class Reminder(models.Model):
         self.save()
 
 
+class RecurrenceSeries(models.Model):
+    """
+    A Task.recurrence_rule or Reminder.repeat_rule expanded into Occurrence rows
+    up to `materialised_until` (api/recurrence.py). Exactly one of task/reminder is set;
+    `exhausted` marks a COUNT/UNTIL rule with nothing left to materialise.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="recurrence_series")
+    task = models.OneToOneField(Task, null=True, blank=True, on_delete=models.CASCADE, related_name="recurrence")
+    reminder = models.OneToOneField(Reminder, null=True, blank=True, on_delete=models.CASCADE, related_name="recurrence")
+    rule = models.CharField(max_length=500)
+    dtstart = models.DateTimeField()
+    materialised_until = models.DateTimeField()
+    exhausted = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["exhausted", "materialised_until"], name="recurrence_horizon_idx"),
+        ]
+
+
+class Occurrence(models.Model):
+    series = models.ForeignKey(RecurrenceSeries, on_delete=models.CASCADE, related_name="occurrences")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="occurrences")
+    at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("series", "at")
+        indexes = [
+            models.Index(fields=["user", "at"], name="occurrence_user_at_idx"),
+        ]
+
+
 # ---------- Notes / Journal / Future Self ----------
 class Note(models.Model):
     """
@@ -256,10 +468,119 @@ class MoodLog(models.Model):
     note = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+# ---------- Search ----------
+class SearchDocument(models.Model):
+    """
+    Searchable text of one task, note, hobby activity, shopping item or mood log,
+    kept in sync on save/delete (api/search.py). The inverted index over these rows
+    lives outside the ORM: an FTS5 table on SQLite, a tsvector column + GIN on Postgres.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="search_documents")
+    kind = models.CharField(max_length=32)
+    object_id = models.PositiveBigIntegerField()
+    title = models.CharField(max_length=255, blank=True)
+    body = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("kind", "object_id")
+
+
+# ---------- Delta sync ----------
+class SyncCounter(models.Model):
+    """Per-user change sequence; every recorded change takes the next number (api/sync.py)."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="sync_counter")
+    last_seq = models.PositiveBigIntegerField(default=0)
+
+
+class SyncChange(models.Model):
+    """
+    Latest change of one user-owned object: a new save or delete moves the row to a
+    new `seq`, so the feed stays one row per object. `deleted` rows are tombstones.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="sync_changes")
+    seq = models.PositiveBigIntegerField()
+    kind = models.CharField(max_length=32)
+    object_id = models.PositiveBigIntegerField()
+    deleted = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = ("kind", "object_id")
+        indexes = [
+            models.Index(fields=["user", "seq"], name="sync_change_user_seq_idx"),
+            # per-kind versions for conditional GETs (api/conditional.py)
+            models.Index(fields=["user", "kind", "seq"], name="sync_change_user_kind_idx"),
+        ]
+
+
+# ---------- Streaks (maintained incrementally, see api/streaks.py) ----------
+class Streak(models.Model):
+    KINDS = [
+        ("mood", "Mood check-in"),
+        ("focus", "Focus session"),
+        ("task", "Task completed"),
+    ]
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="streaks")
+    kind = models.CharField(max_length=20, choices=KINDS)
+    current = models.PositiveIntegerField(default=0, help_text="Consecutive days ending at last_active_date")
+    longest = models.PositiveIntegerField(default=0)
+    last_active_date = models.DateField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ("user", "kind")
+
+    def current_on(self, day):
+        """Streak as seen on `day`: it counts only if the user was active that day."""
+        return self.current if self.last_active_date == day else 0
+
+# home currency of users without a profile, and of expenses entered without a currency
+DEFAULT_HOME_CURRENCY = "TND"
+
+
 # models.py - add to User via profile or settings
 class UserProfile(models.Model):  # Or extend User
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     salary_amount = models.DecimalField(max_digits=10, decimal_places=2, default=1200)  # Monthly DT
+    home_currency = models.CharField(max_length=8, default=DEFAULT_HOME_CURRENCY,
+                                     help_text="Currency that salary and spending totals are reported in")
+
+    # home_currency as last loaded/saved; a change re-prices the user's spend ledger
+    _loaded_home_currency = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_home_currency = instance.__dict__.get("home_currency")
+        return instance
+
+    @staticmethod
+    def currency_of(user_id):
+        """The user's home currency (the default for users without a profile)."""
+        currency = UserProfile.objects.filter(user_id=user_id).values_list("home_currency", flat=True).first()
+        return currency or DEFAULT_HOME_CURRENCY
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_home_currency = self.home_currency
+
+
+class ExchangeRate(models.Model):
+    """
+    Dated exchange rate: 1 `base` = `rate` `quote` from `date` until the next row.
+    Loaded from files with the `import_exchange_rates` command; see api/currency.py.
+    """
+    base = models.CharField(max_length=8)
+    quote = models.CharField(max_length=8)
+    date = models.DateField()
+    rate = models.DecimalField(max_digits=20, decimal_places=8)
+
+    class Meta:
+        unique_together = ("base", "quote", "date")
+
+    def __str__(self):
+        return f"{self.date} 1 {self.base} = {self.rate} {self.quote}"
+
+
 # ---------- Shopping, expiration detection, and money tracking ----------
 class Category_items(models.Model):
     """
@@ -314,16 +635,146 @@ class ShoppingItem(models.Model):
         choices=PRIORITY_CHOICES,
         default='medium'
     )
+    running_low = models.BooleanField(
+        default=False,
+        help_text="Almost used up. Set from note keywords on save, or directly by the user",
+    )
+
+    RUNNING_LOW_KEYWORDS = ("almost over", "running low", "almost out")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "purchased", "expiry_date"], name="shop_user_expiry_idx"),
+            models.Index(fields=["user"], condition=models.Q(running_low=True, purchased=False),
+                         name="shop_user_running_low_idx"),
+        ]
+
+    # note as last loaded/saved; keywords only set running_low when the note changes
+    _loaded_note = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_note = instance.__dict__.get("note")
+        return instance
+
+    @classmethod
+    def note_says_running_low(cls, note):
+        note = (note or "").lower()
+        return any(keyword in note for keyword in cls.RUNNING_LOW_KEYWORDS)
+
+    def save(self, *args, **kwargs):
+        if self.note != self._loaded_note and not self.running_low and self.note_says_running_low(self.note):
+            self.running_low = True
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "running_low"}
+        super().save(*args, **kwargs)
+        self._loaded_note = self.note
+
+
+# the Expense fields that the spend ledger and the expense rollups are keyed on
+ExpenseLedgerKey = namedtuple(
+    "ExpenseLedgerKey", ["user_id", "spent_at", "category", "currency", "shopping_item_id", "amount"]
+)
+
+
 class Expense(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="expenses")
     shopping_item = models.ForeignKey(ShoppingItem, null=True, blank=True, on_delete=models.SET_NULL,
                                       related_name="expenses")
     amount = models.DecimalField(max_digits=12, decimal_places=2)
-    currency = models.CharField(max_length=8, default="USD")
+    currency = models.CharField(max_length=8, blank=True,
+                                help_text="Left blank, the owner's home currency when the expense is saved")
     category = models.CharField(max_length=120, blank=True)
     note = models.TextField(blank=True)
     spent_at = models.DateTimeField(default=timezone.now)
     created_at = models.DateTimeField(auto_now_add=True)
+    content_hash = models.CharField(max_length=64, blank=True, editable=False,
+                                    help_text="Hash of (day, amount, note); used to skip duplicate imports")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "content_hash"], name="expense_user_hash_idx"),
+        ]
+
+    @staticmethod
+    def hash_content(day, amount, note, occurrence=0):
+        """`occurrence` numbers identical transactions within one imported file (the first is 0)."""
+        raw = f"{day.isoformat()}|{Decimal(amount):.2f}|{(note or '').strip()}"
+        if occurrence:
+            raw += f"|{occurrence}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    # values as last loaded/saved; lets the spend ledger apply edits as deltas
+    _loaded_ledger_key = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_ledger_key = instance.ledger_key()
+        return instance
+
+    def ledger_key(self):
+        fields = self.__dict__
+        if not all(name in fields for name in ExpenseLedgerKey._fields):
+            return None
+        return ExpenseLedgerKey(*(fields[name] for name in ExpenseLedgerKey._fields))
+
+    def save(self, *args, **kwargs):
+        filled = {"content_hash"}
+        if not self.currency:
+            # counted in the user's totals as entered, without needing an exchange rate
+            self.currency = UserProfile.currency_of(self.user_id)
+            filled.add("currency")
+        spent_at = self.spent_at
+        day = timezone.localdate(spent_at) if timezone.is_aware(spent_at) else spent_at.date()
+        self.content_hash = self.hash_content(day, self.amount, self.note)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, *filled}
+        super().save(*args, **kwargs)
+        # after post_save, so every ledger receiver sees the previous values
+        self._loaded_ledger_key = self.ledger_key()
+
+
+class MonthlySpend(models.Model):
+    """
+    Per-user, per-month spend ledger maintained from Expense writes (api/budget.py).
+    `category` holds the Expense.category, or "*" for the month's total.
+    `total` is in the user's home currency (UserProfile.home_currency).
+    """
+    ALL_CATEGORIES = "*"
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="monthly_spend")
+    month = models.DateField(help_text="First day of the month")
+    category = models.CharField(max_length=120)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+    unpriced = models.IntegerField(default=0, help_text="Expenses left out of `total`: no rate to the home currency")
+
+    class Meta:
+        unique_together = ("user", "month", "category")
+
+
+class ExpenseRollup(models.Model):
+    """
+    Expense totals per user, month, category, currency and linked item type
+    ("" when the expense has no shopping item). Maintained by api/expense_analytics.py.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="expense_rollups")
+    month = models.DateField(help_text="First day of the month")
+    category = models.CharField(max_length=120, blank=True)
+    currency = models.CharField(max_length=8)
+    item_type = models.CharField(max_length=10, blank=True)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    home_total = models.DecimalField(max_digits=14, decimal_places=2, default=0,
+                                     help_text="`total` converted to the user's home currency")
+    count = models.IntegerField(default=0)
+    unpriced = models.IntegerField(default=0, help_text="Expenses left out of `home_total`: no rate to the home currency")
+
+    class Meta:
+        unique_together = ("user", "month", "category", "currency", "item_type")
 
 
 # ---------- Rewards / Badges ----------
@@ -338,6 +789,20 @@ class Badge(models.Model):
     class Meta:
         unique_together = ("user", "key")
 
+class BadgeCounter(models.Model):
+    """
+    Rolling per-user event counter backing the badge rules in api/badges.py.
+    One row per (user, counter, window); `window_start` is the first day of the
+    day/week window, or 1970-01-01 for all-time counters.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="badge_counters")
+    counter = models.CharField(max_length=120)
+    window_start = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("user", "counter", "window_start")
+
 # ---------- Simple Reward summary (cached) ----------
 # ---------- Reward Summary (one per user) ----------
 class RewardSummary(models.Model):
@@ -354,33 +819,101 @@ from django.dispatch import receiver
 from datetime import timedelta
 
 # Level up logic
+REQUIRED_XP = 50
+
+
 def level_up(summary: RewardSummary):
-    required_xp = 50
-    if summary.xp >= required_xp:
-        summary.xp -= required_xp   # ✅ subtract instead of double
-        summary.level += 1
-        summary.coins += summary.level * 100  # bonus
+    """Apply every level-up `summary.xp` allows (closed form) and save."""
+    levels = summary.xp // REQUIRED_XP
+    if levels:
+        summary.xp -= levels * REQUIRED_XP   # ✅ subtract instead of double
+        # bonus of 100 * new level for each level gained
+        summary.coins += 100 * (levels * summary.level + levels * (levels + 1) // 2)
+        summary.level += levels
         summary.save(update_fields=['level', 'xp', 'coins'])
 
 
-# Connect signals — THIS IS USUALLY MISSING!
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+# ---------- Reward ledger (append-only, one row per source event) ----------
+class RewardEvent(models.Model):
+    """
+    Every XP/coin grant, keyed by its source event (e.g. "task:12:done", "focus:7").
+    The unique key makes grants idempotent; RewardSummary is the running projection.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="reward_events")
+    key = models.CharField(max_length=120)
+    xp = models.IntegerField(default=0)
+    coins = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("user", "key")
+
+    def __str__(self):
+        return f"{self.key} (+{self.xp} XP, +{self.coins} coins)"
+
+
+def grant_reward(user_id, key, xp=0, coins=0):
+    """
+    Record a reward once per `key` and fold it into RewardSummary with a single
+    UPDATE (level-ups computed in closed form, so concurrent grants never lose
+    updates). Returns False if `key` was already granted.
+    """
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                RewardEvent.objects.create(user_id=user_id, key=key, xp=xp, coins=coins)
+        except IntegrityError:
+            return False
+        fold_into_summary(user_id, xp, coins)
+    return True
+
+
+def grant_rewards(user_id, grants):
+    """
+    Bulk form of grant_reward for `grants` ({key: (xp, coins)}): keys not granted
+    yet are inserted in one statement and folded into RewardSummary with one
+    UPDATE. Returns the keys granted now.
+    """
+    with transaction.atomic():
+        granted = set(
+            RewardEvent.objects.filter(user_id=user_id, key__in=list(grants)).values_list("key", flat=True)
+        )
+        fresh = {key: amounts for key, amounts in grants.items() if key not in granted}
+        if fresh:
+            RewardEvent.objects.bulk_create(
+                [RewardEvent(user_id=user_id, key=key, xp=xp, coins=coins) for key, (xp, coins) in fresh.items()]
+            )
+            fold_into_summary(
+                user_id, sum(xp for xp, _ in fresh.values()), sum(coins for _, coins in fresh.values())
+            )
+    return list(fresh)
+
 
-@receiver(post_save, sender=FocusSession)
-def award_focus_rewards(sender, instance, created, **kwargs):
-    if not created:
-        return  # ✅ prevents rewards on refresh
+def fold_into_summary(user_id, xp, coins):
+    """Add xp/coins to the user's RewardSummary in one UPDATE, level-ups in closed form."""
+    total_xp = F("xp") + xp
+    levels = total_xp / REQUIRED_XP
+    projection = {
+        "xp": total_xp - levels * REQUIRED_XP,
+        "level": F("level") + levels,
+        "coins": F("coins") + coins + 100 * (levels * F("level") + levels * (levels + 1) / 2),
+        "updated_at": timezone.now(),
+    }
+    if not RewardSummary.objects.filter(user_id=user_id).update(**projection):
+        RewardSummary.objects.get_or_create(user_id=user_id)
+        RewardSummary.objects.filter(user_id=user_id).update(**projection)
 
-    if instance.ended_at and instance.effective_minutes:
-        summary, _ = RewardSummary.objects.get_or_create(user=instance.user)
-        minutes = instance.effective_minutes or 0
 
-        summary.xp += minutes
-        summary.coins += minutes // 10
+# Connect signals — THIS IS USUALLY MISSING!
+from django.db.models.signals import post_save
+from django.dispatch import receiver
 
-        level_up(summary)
-        summary.save()
+@receiver(focus_session_ended)
+def award_focus_rewards(sender, session, **kwargs):
+    # ✅ keyed per session, so re-saving or re-ending never pays twice
+    minutes = session.effective_minutes or 0
+    if minutes:
+        grant_reward(session.user_id, f"focus:{session.pk}", xp=minutes, coins=minutes // 10)
 
 from django.db.models.signals import post_save
 from django.dispatch import receiver
@@ -391,34 +924,9 @@ def award_task_rewards(sender, instance, created, **kwargs):
     if created:
         return  # ✅ no rewards on creation
 
-    if instance._old_status != "done" and instance.status == "done":
-        summary, _ = RewardSummary.objects.get_or_create(user=instance.user)
-
-        summary.xp += 50
-        summary.coins += 10
-        level_up(summary)
-        summary.save()
-
-        # Daily achievements
-        today = timezone.now().date()
-        completed_today = Task.objects.filter(
-            user=instance.user,
-            status="done",
-            completed_at__date=today
-        ).count()
-
-        if completed_today >= 3:
-            Badge.objects.get_or_create(
-                user=instance.user,
-                key="daily_3_tasks",
-                defaults={"title": "Task Master", "description": "Completed 3 tasks in one day"}
-            )
-        elif completed_today >= 2:
-            Badge.objects.get_or_create(
-                user=instance.user,
-                key="daily_2_tasks",
-                defaults={"title": "Productive Bunny", "description": "Completed 2 tasks today"}
-            )
+    if instance.status == "done" and grant_reward(instance.user_id, f"task:{instance.pk}:done", xp=50, coins=10):
+        # Daily achievements are declared in api/badges.py
+        task_completed.send(sender=Task, task=instance)
         Notification.objects.create(
             user=instance.user,
             type='task_complete',
@@ -431,38 +939,82 @@ def award_task_rewards(sender, instance, created, **kwargs):
 from django.utils import timezone
 from datetime import timedelta
 
-def check_weekly_discipline(user):
-    today = timezone.now().date()
-
-    # ✅ Skip if already rewarded today
-    if Badge.objects.filter(user=user, key="no_impulsive_week", earned_at__date=today).exists():
-        return
-
-    week_ago = timezone.now() - timedelta(days=7)
-
-    has_impulsive_buy = Expense.objects.filter(
-        user=user,
-        spent_at__gte=week_ago,
-        shopping_item__item_type='impulsive'
-    ).exists()
-
-    if not has_impulsive_buy:
-        summary, _ = RewardSummary.objects.get_or_create(user=user)
-
-        # ✅ SAFE BADGE CREATION
-        badge, created = Badge.objects.get_or_create(
-            user=user,
-            key="no_impulsive_week",
-            defaults={
-                "title": "Discipline Bunny",
-                "description": "No impulsive buys for 7 days!",
-            }
+DISCIPLINE_BADGE = {
+    "key": "no_impulsive_week",
+    "title": "Discipline Bunny",
+    "description": "No impulsive buys for 7 days!",
+}
+DISCIPLINE_COINS = 100
+
+
+def award_weekly_discipline(users, now=None, batch_size=1000):
+    """
+    Set-based no-impulsive-week evaluation for every user in `users`:
+    one anti-join query finds users without the badge and without an
+    impulsive expense in the last 7 days, then per batch the badges and
+    ledger events are bulk-inserted and the bonus applied in one UPDATE
+    to the users whose ledger event was inserted by this run (a user whose
+    badge was removed, or an overlapping run, never pays twice).
+    Returns the number of users paid.
+    """
+    now = now or timezone.now()
+    week_ago = now - timedelta(days=7)
+    key = DISCIPLINE_BADGE["key"]
+
+    eligible = list(
+        users
+        .exclude(Exists(Badge.objects.filter(user=OuterRef("pk"), key=key)))
+        .exclude(Exists(Expense.objects.filter(
+            user=OuterRef("pk"),
+            spent_at__gte=week_ago,
+            shopping_item__item_type='impulsive'
+        )))
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+
+    paid = 0
+    for start in range(0, len(eligible), batch_size):
+        chunk = eligible[start:start + batch_size]
+        for attempt in range(2):
+            try:
+                paid += _award_discipline_chunk(chunk, now)
+                break
+            except IntegrityError:
+                # a concurrent run inserted some of the events first; retry against its rows
+                if attempt:
+                    raise
+    return paid
+
+
+def _award_discipline_chunk(chunk, now):
+    event_key = f"badge:{DISCIPLINE_BADGE['key']}"
+    with transaction.atomic():
+        Badge.objects.bulk_create(
+            [Badge(user_id=pk, **DISCIPLINE_BADGE) for pk in chunk], ignore_conflicts=True
         )
+        already_paid = set(
+            RewardEvent.objects.filter(user_id__in=chunk, key=event_key).values_list("user_id", flat=True)
+        )
+        fresh = [pk for pk in chunk if pk not in already_paid]
+        if not fresh:
+            return 0
+        # no ignore_conflicts: an event inserted concurrently must abort the chunk, not be paid again
+        RewardEvent.objects.bulk_create(
+            [RewardEvent(user_id=pk, key=event_key, coins=DISCIPLINE_COINS) for pk in fresh]
+        )
+        RewardSummary.objects.bulk_create(
+            [RewardSummary(user_id=pk) for pk in fresh], ignore_conflicts=True
+        )
+        RewardSummary.objects.filter(user_id__in=fresh).update(
+            coins=F("coins") + DISCIPLINE_COINS, updated_at=now
+        )
+    return len(fresh)
+
 
-        # ✅ ONLY ADD COINS IF BADGE WAS JUST CREATED
-        if created:
-            summary.coins += 100
-            summary.save()
+def check_weekly_discipline(user):
+    """Single-user form of award_weekly_discipline (the nightly job covers everyone)."""
+    return award_weekly_discipline(type(user)._default_manager.filter(pk=user.pk))
 # models.py (append at the end)
 
 # models.py — update Notification model
@@ -474,6 +1026,7 @@ class Notification(models.Model):
         ('badge_earned', 'Badge Earned'),
         ('reminder_due', 'Reminder Due'),
         ('weekly_discipline', 'Weekly Discipline'),
+        ('hobby_inactive', 'Hobby Inactive'),
     ]
 
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="notifications")
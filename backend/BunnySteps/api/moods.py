@@ -0,0 +1,61 @@
+# api/moods.py
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import MoodLog
+
+INSIGHTS_CACHE_TIMEOUT = 60 * 60
+
+
+def insights_cache_key(user_id, day):
+    # keyed by day so the 7-day window rolls over at midnight without invalidation
+    return f"mood-insights:{user_id}:{day.isoformat()}"
+
+
+def weekly_mood_summary(user, today):
+    """
+    Per-day rating totals for the last 7 days from one grouped query.
+    Returns (weekly_average, today_checkins, weekly_trend).
+    """
+    week_ago = timezone.now() - timedelta(days=7)
+    per_day = {
+        row["day"]: row
+        for row in (
+            MoodLog.objects
+            .filter(user=user, created_at__gte=week_ago)
+            .annotate(day=TruncDate("created_at"))
+            .values("day")
+            .annotate(checkins=Count("id"), rated=Count("rating"), rating_sum=Sum("rating"))
+            .order_by()
+        )
+    }
+
+    rated = sum(row["rated"] for row in per_day.values())
+    rating_sum = sum(row["rating_sum"] or 0 for row in per_day.values())
+    weekly_average = rating_sum / rated if rated else 0
+
+    trend = []
+    for i in range(6, -1, -1):
+        day = today - timedelta(days=i)
+        row = per_day.get(day)
+        day_avg = row["rating_sum"] / row["rated"] if row and row["rated"] else 0
+        trend.append({
+            "time": day.strftime("%a"),
+            "mood": round(day_avg, 1)
+        })
+
+    today_checkins = per_day[today]["checkins"] if today in per_day else 0
+    return weekly_average, today_checkins, trend
+
+
+@receiver(post_save, sender=MoodLog)
+@receiver(post_delete, sender=MoodLog)
+def invalidate_mood_insights(sender, instance, **kwargs):
+    # the cache is shared by every worker (settings.CACHES), so this reaches the entry they all read
+    cache.delete(insights_cache_key(instance.user_id, timezone.localdate()))
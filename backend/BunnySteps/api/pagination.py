@@ -0,0 +1,113 @@
+# api/pagination.py
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on (timestamp, id), newest first.
+    The cursor holds the last row of the previous page, so every page is one
+    indexed range scan (no OFFSET) and stays stable while new rows are inserted.
+    """
+    timestamp_field = "created_at"
+    page_size = 50
+    max_page_size = 200
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.has_next = False
+
+        queryset = queryset.order_by(f"-{self.timestamp_field}", "-id")
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            stamp, pk = cursor
+            queryset = queryset.filter(
+                Q(**{f"{self.timestamp_field}__lt": stamp}) |
+                Q(**{self.timestamp_field: stamp, "id__lt": pk})
+            )
+
+        rows = list(queryset[:self.page_size + 1])
+        if len(rows) > self.page_size:
+            self.has_next = True
+            rows = rows[:self.page_size]
+        self.last_row = rows[-1] if rows else None
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            stamp, pk = base64.urlsafe_b64decode(encoded.encode()).decode().split("|")
+            return datetime.fromisoformat(stamp), int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row):
+        stamp = getattr(row, self.timestamp_field).isoformat()
+        return base64.urlsafe_b64encode(f"{stamp}|{row.pk}".encode()).decode()
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.last_row))
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "results": data,
+        })
+
+
+class TaskCursorPagination(KeysetPagination):
+    timestamp_field = "created_at"
+
+
+class SessionCursorPagination(KeysetPagination):
+    timestamp_field = "started_at"
+
+
+class TaskOffsetPagination(LimitOffsetPagination):
+    """OFFSET-style pages (?limit=&offset=) for the admin UI."""
+    default_limit = 50
+    max_limit = 200
+
+
+class OptionalPaginationMixin:
+    """
+    Lists stay unpaginated unless the client opts in, so existing callers that
+    expect a plain array keep working:
+      ?cursor= / ?page_size=  -> keyset pagination
+      ?limit= / ?offset=      -> offset pagination
+    """
+    cursor_pagination_class = None
+    offset_pagination_class = None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            params = self.request.query_params
+            self._paginator = None
+            if self.cursor_pagination_class and ("cursor" in params or "page_size" in params):
+                self._paginator = self.cursor_pagination_class()
+            elif self.offset_pagination_class and ("limit" in params or "offset" in params):
+                self._paginator = self.offset_pagination_class()
+        return self._paginator
@@ -0,0 +1,110 @@
+# api/recommendations.py
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import FocusProfile, FocusSession
+
+# weight of the newest session in the moving averages
+ALPHA = 0.3
+MIN_LENGTH = 5
+MAX_LENGTH = 120
+# safe to keep a day: session ends refresh the entry in the cache every worker shares (settings.CACHES)
+CACHE_TIMEOUT = 60 * 60 * 24
+
+# positions inside a FocusProfile.slots entry
+MINUTES, INTERRUPTIONS, HYPERFOCUS, SESSIONS = range(4)
+
+
+def _cache_key(user_id):
+    return f"focus-profile:{user_id}"
+
+
+def _blend(old, new):
+    return round(old + ALPHA * (new - old), 3)
+
+
+def fold_session(entry, minutes, interruptions, hyperfocus):
+    """Return `entry` updated with one more session (EWMA; the first session seeds it)."""
+    hyperfocus = 1.0 if hyperfocus else 0.0
+    if not entry:
+        return [float(minutes), float(interruptions), hyperfocus, 1]
+    return [
+        _blend(entry[MINUTES], minutes),
+        _blend(entry[INTERRUPTIONS], interruptions),
+        _blend(entry[HYPERFOCUS], hyperfocus),
+        entry[SESSIONS] + 1,
+    ]
+
+
+def update_focus_profile(session, slot):
+    with transaction.atomic():
+        profile, _ = FocusProfile.objects.select_for_update().get_or_create(user_id=session.user_id)
+        profile.slots[slot] = fold_session(
+            profile.slots.get(slot),
+            session.effective_minutes or 0,
+            session.interruptions,
+            session.is_hyperfocus,
+        )
+        profile.save(update_fields=["slots", "updated_at"])
+    cache.set(_cache_key(session.user_id), profile.slots, CACHE_TIMEOUT)
+
+
+def rebuild_focus_profile(user_id, slot_for):
+    """Replay a user's finished sessions in order to rebuild their profile."""
+    slots = {}
+    sessions = (
+        FocusSession.objects
+        .filter(user_id=user_id, ended_at__isnull=False)
+        .order_by("ended_at")
+        .values_list("started_at", "effective_minutes", "interruptions", "is_hyperfocus")
+    )
+    for started_at, minutes, interruptions, hyperfocus in sessions.iterator(chunk_size=2000):
+        slot = slot_for(started_at)
+        slots[slot] = fold_session(slots.get(slot), minutes or 0, interruptions, hyperfocus)
+    FocusProfile.objects.update_or_create(user_id=user_id, defaults={"slots": slots})
+    cache.set(_cache_key(user_id), slots, CACHE_TIMEOUT)
+
+
+def get_focus_slots(user_id):
+    slots = cache.get(_cache_key(user_id))
+    if slots is None:
+        slots = FocusProfile.objects.filter(user_id=user_id).values_list("slots", flat=True).first() or {}
+        cache.set(_cache_key(user_id), slots, CACHE_TIMEOUT)
+    return slots
+
+
+def recommended_length(entry):
+    # frequent interruptions -> shorter sessions, frequent hyperfocus -> longer ones
+    minutes = entry[MINUTES] / (1 + 0.25 * entry[INTERRUPTIONS]) * (1 + 0.2 * entry[HYPERFOCUS])
+    minutes = int(round(minutes / 5.0) * 5)
+    return max(MIN_LENGTH, min(MAX_LENGTH, minutes))
+
+
+def slot_score(entry):
+    return entry[MINUTES] / (1 + entry[INTERRUPTIONS]) * (1 + 0.5 * entry[HYPERFOCUS])
+
+
+def recommend(user_id, slot):
+    """
+    Recommendation for `slot` plus the best slot of the day, from the cached
+    per-slot model. Returns None when the user has no finished sessions yet.
+    """
+    slots = get_focus_slots(user_id)
+    if not slots:
+        return None
+
+    entry = slots.get(slot)
+    if entry is None:
+        # no history in this slot yet: session-weighted blend of the others
+        total = sum(e[SESSIONS] for e in slots.values())
+        entry = [sum(e[i] * e[SESSIONS] for e in slots.values()) / total for i in range(3)] + [0]
+
+    best_slot = max(slots, key=lambda name: slot_score(slots[name]))
+    return {
+        "time_slot": slot,
+        "recommended_length": recommended_length(entry),
+        "best_slot": best_slot,
+        "best_slot_length": recommended_length(slots[best_slot]),
+        "interruption_rate": round(entry[INTERRUPTIONS], 2),
+        "hyperfocus_rate": round(entry[HYPERFOCUS], 2),
+    }
@@ -0,0 +1,364 @@
+# api/recurrence.py
+import calendar
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Occurrence, RecurrenceSeries, Reminder, Task
+
+# occurrences are materialised this far ahead; ranges beyond it extend the horizon lazily
+HORIZON_DAYS = 30
+# hard stop for rules that can never (or only very rarely) produce an occurrence
+MAX_PERIODS = 20000
+
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+DAY_NAMES = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+UNITS = {"day": "DAILY", "week": "WEEKLY", "month": "MONTHLY", "year": "YEARLY"}
+ALIASES = {
+    "daily": "FREQ=DAILY",
+    "weekly": "FREQ=WEEKLY",
+    "fortnightly": "FREQ=WEEKLY;INTERVAL=2",
+    "monthly": "FREQ=MONTHLY",
+    "yearly": "FREQ=YEARLY",
+    "annually": "FREQ=YEARLY",
+    "weekdays": "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR",
+    "weekday": "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR",
+    "weekends": "FREQ=WEEKLY;BYDAY=SA,SU",
+    "weekend": "FREQ=WEEKLY;BYDAY=SA,SU",
+}
+
+
+class Rule:
+    """A compiled recurrence rule; see compile_rule()."""
+
+    def __init__(self, freq, interval=1, byday=(), bymonthday=(), count=None, until=None):
+        self.freq = freq
+        self.interval = interval
+        self.byday = byday            # ((ordinal or None, weekday index), ...)
+        self.bymonthday = bymonthday  # (day of month, negative from the end, ...)
+        self.count = count
+        self.until = until            # last allowed local date
+
+    def __eq__(self, other):
+        return isinstance(other, Rule) and vars(self) == vars(other)
+
+    def __repr__(self):
+        return f"Rule({vars(self)})"
+
+    # ----- expansion -----
+
+    def _period_days(self, anchor, k):
+        """Candidate dates in the k-th period after `anchor` (a local date), in order."""
+        if self.freq == "DAILY":
+            day = anchor + timedelta(days=k * self.interval)
+            weekdays = {wd for _, wd in self.byday}
+            if weekdays and day.weekday() not in weekdays:
+                return []
+            if self.bymonthday and not self._matches_monthday(day):
+                return []
+            return [day]
+
+        if self.freq == "WEEKLY":
+            week_start = anchor - timedelta(days=anchor.weekday()) + timedelta(weeks=k * self.interval)
+            weekdays = sorted({wd for _, wd in self.byday}) or [anchor.weekday()]
+            return [week_start + timedelta(days=wd) for wd in weekdays]
+
+        if self.freq == "MONTHLY":
+            year, month = divmod(anchor.year * 12 + anchor.month - 1 + k * self.interval, 12)
+            month += 1
+            last = calendar.monthrange(year, month)[1]
+            days = {anchor.day} if not (self.bymonthday or self.byday) else set(range(1, last + 1))
+            if self.bymonthday:
+                days &= {md if md > 0 else last + md + 1 for md in self.bymonthday}
+            if self.byday:
+                # with BYMONTHDAY too, a day must match both ("Friday the 13th")
+                weekdays = set()
+                for ordinal, wd in self.byday:
+                    matching = [d for d in range(1, last + 1) if date(year, month, d).weekday() == wd]
+                    if ordinal is None:
+                        weekdays.update(matching)
+                    elif -len(matching) <= ordinal <= len(matching) and ordinal != 0:
+                        weekdays.add(matching[ordinal - 1 if ordinal > 0 else ordinal])
+                days &= weekdays
+            return [date(year, month, d) for d in sorted(days) if 1 <= d <= last]
+
+        year = anchor.year + k * self.interval
+        try:
+            return [anchor.replace(year=year)]
+        except ValueError:  # 29 February in a common year
+            return []
+
+    def _matches_monthday(self, day):
+        last = calendar.monthrange(day.year, day.month)[1]
+        return any(day.day == (md if md > 0 else last + md + 1) for md in self.bymonthday)
+
+    def _first_period(self, anchor, start):
+        """A period index at or before the one containing `start` (only valid without COUNT)."""
+        if self.count or start <= anchor:
+            return 0
+        if self.freq == "DAILY":
+            elapsed = (start - anchor).days
+        elif self.freq == "WEEKLY":
+            elapsed = (start - anchor).days // 7
+        elif self.freq == "MONTHLY":
+            elapsed = (start.year - anchor.year) * 12 + start.month - anchor.month
+        else:
+            elapsed = start.year - anchor.year
+        return max(elapsed // self.interval - 1, 0)
+
+    def between(self, dtstart, start, end):
+        """Occurrences (aware datetimes) in [start, end) of the series anchored at `dtstart`."""
+        base = timezone.localtime(dtstart).replace(tzinfo=None)
+        first_day = timezone.localtime(start).date() if start > dtstart else base.date()
+        produced = 0
+        for k in range(self._first_period(base.date(), first_day), MAX_PERIODS):
+            for day in self._period_days(base.date(), k):
+                candidate = datetime.combine(day, base.time())
+                if candidate < base:
+                    continue
+                if self.until and day > self.until:
+                    return
+                produced += 1
+                if self.count and produced > self.count:
+                    return
+                at = timezone.make_aware(candidate)
+                if at >= end:
+                    return
+                if at >= start:
+                    yield at
+
+    def next_after(self, dtstart, moment):
+        """First occurrence at or after `moment`, or None once the series has ended."""
+        return next(self.between(dtstart, moment, datetime.max.replace(tzinfo=dtstart.tzinfo) - timedelta(days=2)), None)
+
+
+# ----- parsing -----
+
+def _weekday(token):
+    """Index of a weekday given as an RRULE code or any 2+ letter prefix of its name."""
+    token = token.strip().lower()
+    for index, name in enumerate(DAY_NAMES):
+        if len(token) >= 2 and name.startswith(token):
+            return index
+    raise ValueError(f"Unknown weekday '{token}'")
+
+
+def _rrule(text):
+    parts = {}
+    for part in text.upper().removeprefix("RRULE:").split(";"):
+        if not part.strip():
+            continue
+        key, _, value = part.partition("=")
+        parts[key.strip()] = value.strip()
+
+    freq = parts.pop("FREQ", None)
+    if freq not in FREQUENCIES:
+        raise ValueError("FREQ must be one of DAILY, WEEKLY, MONTHLY, YEARLY")
+    options = {"freq": freq}
+    if "INTERVAL" in parts:
+        options["interval"] = int(parts.pop("INTERVAL"))
+    if "COUNT" in parts:
+        options["count"] = int(parts.pop("COUNT"))
+    if "UNTIL" in parts:
+        options["until"] = datetime.strptime(parts.pop("UNTIL")[:8], "%Y%m%d").date()
+    if "BYDAY" in parts:
+        byday = []
+        for token in parts.pop("BYDAY").split(","):
+            match = re.fullmatch(r"([+-]?\d+)?([A-Z]{2})", token.strip())
+            if not match:
+                raise ValueError(f"Bad BYDAY value '{token}'")
+            byday.append((int(match.group(1)) if match.group(1) else None, _weekday(match.group(2))))
+        options["byday"] = tuple(byday)
+    if "BYMONTHDAY" in parts:
+        options["bymonthday"] = tuple(int(day) for day in parts.pop("BYMONTHDAY").split(","))
+    parts.pop("WKST", None)
+    if parts:
+        raise ValueError(f"Unsupported rule part(s): {', '.join(sorted(parts))}")
+    return Rule(**options)
+
+
+def _human(text):
+    """Translate the small human syntax ("every 2 weeks on mon, thu") into RRULE text."""
+    suffix = []
+    match = re.search(r"\s+until\s+(\d{4}-\d{2}-\d{2})$", text)
+    if match:
+        suffix.append(f"UNTIL={match.group(1).replace('-', '')}")
+        text = text[:match.start()]
+    match = re.search(r"\s+(?:for\s+)?(\d+)\s+times$", text)
+    if match:
+        suffix.append(f"COUNT={match.group(1)}")
+        text = text[:match.start()]
+
+    on = ""
+    match = re.fullmatch(r"(.+?)\s+on\s+(?:the\s+)?(.+)", text)
+    if match:
+        text, on = match.groups()
+    text = re.sub(r"^every\s+(?=day$|week$|month$|year$|weekday|weekend)", "", text)
+    text = {"day": "daily", "week": "weekly", "month": "monthly", "year": "yearly"}.get(text, text)
+
+    if text in ALIASES:
+        rule = ALIASES[text]
+    else:
+        match = re.fullmatch(r"every\s+(\d+|other)\s+(day|week|month|year)s?", text)
+        if match:
+            interval = 2 if match.group(1) == "other" else int(match.group(1))
+            rule = f"FREQ={UNITS[match.group(2)]};INTERVAL={interval}"
+        elif text.startswith("every "):
+            on, rule = text[len("every "):], "FREQ=WEEKLY"
+        else:
+            raise ValueError(f"Don't know how to repeat '{text}'")
+
+    if on:
+        tokens = [token for token in re.split(r"[,\s]+|\band\b", on) if token and token != "the"]
+        if "MONTHLY" in rule:
+            days = []
+            for token in tokens:
+                if token == "last":
+                    days.append("-1")
+                elif re.fullmatch(r"\d{1,2}(st|nd|rd|th)?", token):
+                    days.append(re.sub(r"\D", "", token))
+                elif not token.endswith("day"):
+                    raise ValueError(f"Unknown day of month '{token}'")
+            rule += f";BYMONTHDAY={','.join(days)}" if days else ""
+        else:
+            rule += ";BYDAY=" + ",".join(WEEKDAYS[_weekday(token)] for token in tokens)
+    return ";".join([rule, *suffix])
+
+
+@lru_cache(maxsize=2048)
+def compile_rule(text):
+    """
+    Parse a recurrence rule into a Rule, cached per rule string.
+    Accepts an RRULE subset (FREQ, INTERVAL, COUNT, UNTIL, BYDAY, BYMONTHDAY) or
+    human text like "daily", "weekdays", "every Mon,Wed", "every 2 weeks on fri",
+    "monthly on the 1st, 15th", "every month on the last day", "... until 2026-12-31",
+    "... 10 times". Raises ValueError for anything else, including BY* parts the
+    expander cannot honour for the rule's FREQ (BYMONTHDAY on WEEKLY, any BY* part
+    on YEARLY, BYDAY ordinals outside MONTHLY).
+    """
+    text = " ".join(text.strip().lower().split())
+    if not text:
+        raise ValueError("Empty recurrence rule")
+    try:
+        rule = _rrule(text if "freq=" in text else _human(text))
+    except (TypeError, IndexError) as exc:
+        raise ValueError(f"Invalid recurrence rule: {exc}")
+    if rule.interval < 1 or (rule.count is not None and rule.count < 1):
+        raise ValueError("INTERVAL and COUNT must be positive")
+    if any(not 1 <= abs(day) <= 31 for day in rule.bymonthday):
+        raise ValueError("BYMONTHDAY must be within 1..31 or -31..-1")
+    if rule.freq == "YEARLY" and (rule.byday or rule.bymonthday):
+        raise ValueError("BYDAY and BYMONTHDAY are not supported with FREQ=YEARLY")
+    if rule.freq == "WEEKLY" and rule.bymonthday:
+        raise ValueError("BYMONTHDAY cannot be used with FREQ=WEEKLY")
+    if rule.freq != "MONTHLY" and any(ordinal is not None for ordinal, _ in rule.byday):
+        raise ValueError("Numbered BYDAY values (e.g. 2MO) need FREQ=MONTHLY")
+    return rule
+
+
+# ----- materialised occurrences -----
+
+def materialise(series, until):
+    """Write the series' occurrences between its horizon and `until`, then move the horizon."""
+    if series.exhausted or series.materialised_until >= until:
+        return 0
+    rule = compile_rule(series.rule)
+    occurrences = [
+        Occurrence(series=series, user_id=series.user_id, at=at)
+        for at in rule.between(series.dtstart, series.materialised_until, until)
+    ]
+    exhausted = bool(rule.count or rule.until) and rule.next_after(series.dtstart, until) is None
+    with transaction.atomic():
+        Occurrence.objects.bulk_create(occurrences, ignore_conflicts=True)
+        RecurrenceSeries.objects.filter(pk=series.pk).update(materialised_until=until, exhausted=exhausted)
+    series.materialised_until, series.exhausted = until, exhausted
+    return len(occurrences)
+
+
+def extend_horizon(until, user_id=None):
+    """Materialise every (or one user's) live series up to `until`; cheap when already covered."""
+    series = RecurrenceSeries.objects.filter(exhausted=False, materialised_until__lt=until)
+    if user_id is not None:
+        series = series.filter(user_id=user_id)
+    return sum(materialise(item, until) for item in series.iterator())
+
+
+def occurrences_between(user_id, start, end):
+    """The user's occurrences in [start, end), materialising lazily past the horizon."""
+    extend_horizon(end, user_id=user_id)
+    return (
+        Occurrence.objects
+        .filter(user_id=user_id, at__gte=start, at__lt=end)
+        .select_related("series__task", "series__reminder")
+        .order_by("at", "id")
+    )
+
+
+def sync_series(owner, field, rule_text, dtstart):
+    """
+    Point the owner's series at its current rule: an edited rule drops only that
+    series' future occurrences (past ones stay as history) and re-materialises.
+    """
+    lookup = {field: owner}
+    try:
+        valid = bool(rule_text and dtstart) and compile_rule(rule_text) is not None
+    except ValueError:
+        valid = False
+    if not valid:
+        RecurrenceSeries.objects.filter(**lookup).delete()
+        return None
+
+    now = timezone.now()
+    with transaction.atomic():
+        series, created = RecurrenceSeries.objects.get_or_create(
+            **lookup,
+            defaults={"user_id": owner.user_id, "rule": rule_text, "dtstart": dtstart, "materialised_until": now},
+        )
+        if not created:
+            series.occurrences.filter(at__gte=now).delete()
+            series.rule, series.dtstart = rule_text, dtstart
+            series.materialised_until, series.exhausted = now, False
+            series.save(update_fields=["rule", "dtstart", "materialised_until", "exhausted"])
+        materialise(series, now + timedelta(days=HORIZON_DAYS))
+    return series
+
+
+def sync_existing_series(user_ids=None):
+    """Build series for rules written before occurrences were materialised."""
+    synced = 0
+    for model, field, rule_field in ((Task, "task", "recurrence_rule"), (Reminder, "reminder", "repeat_rule")):
+        owners = model.objects.exclude(**{rule_field: ""})
+        if user_ids:
+            owners = owners.filter(user_id__in=user_ids)
+        for owner in owners.iterator():
+            synced += sync_series(owner, field, *owner.recurrence_key()) is not None
+    return synced
+
+
+def recurrence_changed(instance, created):
+    """Whether a just-saved Task/Reminder needs its series (re)built or dropped."""
+    old, new = instance._loaded_recurrence_key, instance.recurrence_key()
+    if new is None or new == old:
+        return False
+    if created or (old is not None and not old[0]):
+        # never had a rule: only a newly set one matters
+        return bool(new[0])
+    return True
+
+
+@receiver(post_save, sender=Task)
+def task_recurrence_changed(sender, instance, created, **kwargs):
+    if recurrence_changed(instance, created):
+        sync_series(instance, "task", *instance.recurrence_key())
+
+
+@receiver(post_save, sender=Reminder)
+def reminder_recurrence_changed(sender, instance, created, **kwargs):
+    if recurrence_changed(instance, created):
+        sync_series(instance, "reminder", *instance.recurrence_key())
@@ -0,0 +1,105 @@
+# api/scheduler.py
+import heapq
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import Reminder
+from .utils import fire_reminders
+
+
+class ReminderScheduler:
+    """
+    In-memory priority queue of upcoming reminders across all users.
+
+    Only reminders due within `horizon` are kept in memory. Each `sync()`
+    picks up reminders created or edited since the last sync (via
+    `Reminder.updated_at`) and slides the horizon forward, so the database is
+    never rescanned in full. Heap entries are invalidated lazily: `pending`
+    holds the current fire time per reminder and stale heap entries are
+    skipped when popped.
+    """
+    # re-read a little before the last watermark so rows committed late are not missed
+    SYNC_OVERLAP = timedelta(seconds=5)
+
+    def __init__(self, horizon=timedelta(hours=6), batch_size=500):
+        self.horizon = horizon
+        self.batch_size = batch_size
+        self.heap = []
+        self.pending = {}
+        self.loaded_until = None
+        self.watermark = None
+
+    @staticmethod
+    def fire_time(remind_at, snoozed_until):
+        if snoozed_until and snoozed_until > remind_at:
+            return snoozed_until
+        return remind_at
+
+    def schedule(self, reminder_id, fire_at):
+        if self.pending.get(reminder_id) == fire_at:
+            return
+        self.pending[reminder_id] = fire_at
+        heapq.heappush(self.heap, (fire_at, reminder_id))
+
+    def unschedule(self, reminder_id):
+        self.pending.pop(reminder_id, None)
+
+    def _load(self, queryset):
+        rows = queryset.filter(
+            notified=False, frozen=False, remind_at__isnull=False
+        ).values_list("id", "remind_at", "snoozed_until")
+        for reminder_id, remind_at, snoozed_until in rows.iterator(chunk_size=self.batch_size):
+            self.schedule(reminder_id, self.fire_time(remind_at, snoozed_until))
+
+    def sync(self, now=None):
+        now = now or timezone.now()
+        horizon_end = now + self.horizon
+
+        if self.loaded_until is None:
+            self._load(Reminder.objects.filter(remind_at__lte=horizon_end))
+        else:
+            changed = Reminder.objects.filter(
+                updated_at__gte=self.watermark
+            ).values_list("id", "remind_at", "snoozed_until", "notified", "frozen")
+            for reminder_id, remind_at, snoozed_until, notified, frozen in changed.iterator(
+                chunk_size=self.batch_size
+            ):
+                if notified or frozen or remind_at is None or remind_at > horizon_end:
+                    self.unschedule(reminder_id)
+                else:
+                    self.schedule(reminder_id, self.fire_time(remind_at, snoozed_until))
+
+            if horizon_end > self.loaded_until:
+                self._load(Reminder.objects.filter(
+                    remind_at__gt=self.loaded_until, remind_at__lte=horizon_end
+                ))
+
+        self.loaded_until = horizon_end
+        self.watermark = now - self.SYNC_OVERLAP
+
+    def pop_due(self, now):
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            fire_at, reminder_id = heapq.heappop(self.heap)
+            if self.pending.get(reminder_id) == fire_at:
+                del self.pending[reminder_id]
+                due.append(reminder_id)
+        return due
+
+    def fire_due(self, now=None):
+        now = now or timezone.now()
+        due = self.pop_due(now)
+        fired = 0
+        for start in range(0, len(due), self.batch_size):
+            batch = due[start:start + self.batch_size]
+            fired += fire_reminders(Reminder.objects.filter(pk__in=batch), now=now)
+        return fired
+
+    def seconds_until_next(self, now=None):
+        now = now or timezone.now()
+        while self.heap and self.pending.get(self.heap[0][1]) != self.heap[0][0]:
+            heapq.heappop(self.heap)
+        if not self.heap:
+            return None
+        return max(0.0, (self.heap[0][0] - now).total_seconds())
@@ -0,0 +1,200 @@
+# api/search.py
+import re
+from collections import defaultdict
+from contextlib import contextmanager
+from threading import local
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+
+from .models import HobbyActivity, MoodLog, Note, SearchDocument, ShoppingItem, Task
+
+# created by migration 0030 next to api_searchdocument, and kept in sync by triggers
+FTS_TABLE = "api_searchdocument_fts"
+MAX_TERMS = 16
+MAX_RESULTS = 100
+SNIPPET_MARK = "**"
+
+# kind -> (model, title field, body field)
+SOURCES = {
+    "task": (Task, "title", "description"),
+    "note": (Note, "title", "body"),
+    "hobby_activity": (HobbyActivity, None, "notes"),
+    "shopping_item": (ShoppingItem, "name", "note"),
+    "mood_log": (MoodLog, "mood", "note"),
+}
+KINDS = {model: kind for kind, (model, _, _) in SOURCES.items()}
+
+_deferred = local()
+
+
+def document_for(kind, obj):
+    _, title_field, body_field = SOURCES[kind]
+    title = (getattr(obj, title_field) or "")[:255] if title_field else ""
+    body = getattr(obj, body_field) or ""
+    if not title.strip() and not body.strip():
+        return None
+    return SearchDocument(
+        user_id=obj.user_id, kind=kind, object_id=obj.pk,
+        title=title, body=body, created_at=obj.created_at,
+    )
+
+
+def index_documents(documents):
+    """Upsert SearchDocuments in one statement; the backend index follows via triggers."""
+    SearchDocument.objects.bulk_create(
+        documents, batch_size=500,
+        update_conflicts=True, unique_fields=["kind", "object_id"],
+        update_fields=["user", "title", "body", "created_at"],
+    )
+
+
+def rebuild_search_index(user_ids=None, chunk_size=2000):
+    """Re-derive every SearchDocument from its source rows (e.g. after bulk imports)."""
+    documents = SearchDocument.objects.all()
+    if user_ids:
+        documents = documents.filter(user_id__in=user_ids)
+    documents.delete()
+
+    indexed = 0
+    for kind, (model, title_field, body_field) in SOURCES.items():
+        rows = model.objects.only(*filter(None, ("id", "user_id", "created_at", title_field, body_field)))
+        if user_ids:
+            rows = rows.filter(user_id__in=user_ids)
+        batch = []
+        for obj in rows.iterator(chunk_size=chunk_size):
+            document = document_for(kind, obj)
+            if document:
+                batch.append(document)
+            if len(batch) >= chunk_size:
+                index_documents(batch)
+                indexed += len(batch)
+                batch = []
+        index_documents(batch)
+        indexed += len(batch)
+    return indexed
+
+
+def query_terms(text):
+    """Words of a free-text query; the last one is matched as a prefix (search-as-you-type)."""
+    return re.findall(r"\w+", text.lower())[:MAX_TERMS]
+
+
+def _ranked_sqlite(user_id, terms, kinds, limit):
+    phrase = " ".join(f'"{term}"' for term in terms) + "*"
+    match = f"owner:u{user_id} AND {{title body}}: ({phrase})"
+    kind_filter = f"AND d.kind IN ({', '.join(['%s'] * len(kinds))})" if kinds else ""
+    sql = f"""
+        SELECT d.id, bm25({FTS_TABLE}, 0.0, 2.0, 1.0) AS rank,
+               CASE WHEN d.body != ''
+                    THEN snippet({FTS_TABLE}, 2, %s, %s, '…', 12)
+                    ELSE snippet({FTS_TABLE}, 1, %s, %s, '…', 12) END
+        FROM {FTS_TABLE} JOIN api_searchdocument d ON d.id = {FTS_TABLE}.rowid
+        WHERE {FTS_TABLE} MATCH %s {kind_filter}
+        ORDER BY rank LIMIT %s
+    """
+    marks = [SNIPPET_MARK] * 4
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*marks, match, *kinds, limit])
+        # bm25 is "lower is better"; flip it so both backends rank descending
+        return [(doc_id, -rank, snippet) for doc_id, rank, snippet in cursor.fetchall()]
+
+
+def _ranked_postgres(user_id, terms, kinds, limit):
+    tsquery = " & ".join(terms) + ":*"
+    kind_filter = f"AND d.kind IN ({', '.join(['%s'] * len(kinds))})" if kinds else ""
+    options = f"StartSel={SNIPPET_MARK}, StopSel={SNIPPET_MARK}, MaxWords=24, MinWords=6, MaxFragments=1"
+    # headlines are costly: rank and limit first, then build snippets for the page only
+    sql = f"""
+        SELECT hit.id, hit.rank,
+               ts_headline('simple', hit.title || ' ' || hit.body, hit.q, %s)
+        FROM (
+            SELECT d.id, d.title, d.body, q, ts_rank(d.search_vector, q) AS rank
+            FROM api_searchdocument d, to_tsquery('simple', %s) q
+            WHERE d.user_id = %s AND d.search_vector @@ q {kind_filter}
+            ORDER BY rank DESC LIMIT %s
+        ) hit
+        ORDER BY hit.rank DESC
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [options, tsquery, user_id, *kinds, limit])
+        return cursor.fetchall()
+
+
+def _ranked_fallback(user_id, terms, kinds, limit):
+    """Backends without a full-text index: unranked substring match, newest first."""
+    documents = SearchDocument.objects.filter(user_id=user_id)
+    if kinds:
+        documents = documents.filter(kind__in=kinds)
+    for term in terms:
+        documents = documents.filter(Q(title__icontains=term) | Q(body__icontains=term))
+    return [(doc.id, 0.0, doc.body[:120]) for doc in documents.order_by("-created_at")[:limit]]
+
+
+BACKENDS = {"sqlite": _ranked_sqlite, "postgresql": _ranked_postgres}
+
+
+def search(user_id, text, kinds=(), limit=20):
+    """
+    Ranked matches for `text` among the user's documents, best first, as dicts with
+    type/id (the source object), title, snippet (matches wrapped in **), rank and
+    created_at. Two queries: the index lookup and one pk__in fetch.
+    """
+    terms = query_terms(text)
+    if not terms:
+        return []
+    ranked = BACKENDS.get(connection.vendor, _ranked_fallback)(user_id, terms, list(kinds), limit)
+    documents = SearchDocument.objects.in_bulk([doc_id for doc_id, _, _ in ranked])
+    return [
+        {
+            "type": documents[doc_id].kind,
+            "id": documents[doc_id].object_id,
+            "title": documents[doc_id].title,
+            "snippet": snippet,
+            "rank": round(float(rank), 6),
+            "created_at": documents[doc_id].created_at,
+        }
+        for doc_id, rank, snippet in ranked
+        if doc_id in documents
+    ]
+
+
+def index_saved_object(sender, instance, raw=False, update_fields=None, **kwargs):
+    kind = KINDS[sender]
+    _, title_field, body_field = SOURCES[kind]
+    if raw or (update_fields and not {title_field, body_field} & set(update_fields)):
+        return
+    document = document_for(kind, instance)
+    if document:
+        index_documents([document])
+    else:
+        SearchDocument.objects.filter(kind=kind, object_id=instance.pk).delete()
+
+
+@contextmanager
+def deferred_unindexing():
+    """Collect deletions inside the block and drop their documents on exit, one DELETE per kind."""
+    if getattr(_deferred, "deleted", None) is not None:
+        yield
+        return
+    _deferred.deleted = pending = defaultdict(list)
+    try:
+        yield
+    finally:
+        _deferred.deleted = None
+    for kind, ids in pending.items():
+        SearchDocument.objects.filter(kind=kind, object_id__in=ids).delete()
+
+
+def unindex_deleted_object(sender, instance, **kwargs):
+    pending = getattr(_deferred, "deleted", None)
+    if pending is not None:
+        pending[KINDS[sender]].append(instance.pk)
+    else:
+        SearchDocument.objects.filter(kind=KINDS[sender], object_id=instance.pk).delete()
+
+
+for model in KINDS:
+    post_save.connect(index_saved_object, sender=model, dispatch_uid=f"search-index-{model.__name__}")
+    post_delete.connect(unindex_deleted_object, sender=model, dispatch_uid=f"search-unindex-{model.__name__}")
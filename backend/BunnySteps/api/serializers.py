@@ -1,9 +1,24 @@
-from datetime import timezone
+from django.utils import timezone
 from rest_framework import serializers
 from .models import (
     Category, Task, FocusMode, FocusSession, Hobby, HobbyActivity,
-    Reminder, Note, MoodLog, ShoppingItem, Expense, Badge, RewardSummary
+    Reminder, Note, MoodLog, ShoppingItem, Expense, Badge, RewardSummary, Streak, Occurrence,
+    PRIORITY_CHOICES,
 )
+from .hobby_metrics import validate_custom_data, validate_metric_fields
+from .recurrence import compile_rule
+from .sparse import SparseFieldsMixin
+
+
+def validate_rule(value):
+    """Blank (no repetition) or a rule api.recurrence can expand."""
+    value = value.strip()
+    if value:
+        try:
+            compile_rule(value)
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc))
+    return value
 
 
 # ---------- Basic Serializers ----------
@@ -21,7 +36,7 @@ class CategorySerializer(serializers.ModelSerializer):
 from rest_framework import serializers
 from .models import Task, Category, Hobby
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(source="category.name", read_only=True)
     category_color = serializers.CharField(source="category.color", read_only=True, default="#e2e8f0")
     hobby_name = serializers.CharField(source="hobby.name", read_only=True, allow_null=True)
@@ -47,12 +62,17 @@ class TaskSerializer(serializers.ModelSerializer):
             "created_at", "updated_at",
             "category", "category_name", "category_color",
             "hobby", "hobby_name",
-            "image", "voice_note", "custom_fields"
+            "image", "voice_note", "custom_fields", "recurrence_rule"
         ]
         read_only_fields = (
             "user", "created_at", "updated_at", "completed_at",
             "category_name", "category_color", "hobby_name"
         )
+        # ?expand= names -> nested read-only serializers, prefetched only when asked for
+        expandable = {
+            "reminders": lambda: ReminderSerializer(many=True, read_only=True),
+            "focus_sessions": lambda: FocusSessionSummarySerializer(many=True, read_only=True),
+        }
 
     def create(self, validated_data):
         # Auto-set the current user
@@ -63,6 +83,9 @@ class TaskSerializer(serializers.ModelSerializer):
         # Allow partial updates (PATCH)
         return super().update(instance, validated_data)
 
+    def validate_recurrence_rule(self, value):
+        return validate_rule(value)
+
 
 class FocusModeSerializer(serializers.ModelSerializer):
     class Meta:
@@ -70,6 +93,20 @@ class FocusModeSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class TaskSummarySerializer(serializers.ModelSerializer):
+    """Compact task projection used when tasks are nested in other payloads."""
+    class Meta:
+        model = Task
+        fields = ["id", "title", "status"]
+
+
+class FocusSessionSummarySerializer(serializers.ModelSerializer):
+    """Compact session projection for a task's ?expand=focus_sessions."""
+    class Meta:
+        model = FocusSession
+        fields = ["id", "mode_name", "started_at", "ended_at", "effective_minutes"]
+
+
 class FocusSessionSerializer(serializers.ModelSerializer):
     # ✅ Accept mode as ID on write
     mode = serializers.PrimaryKeyRelatedField(
@@ -80,7 +117,7 @@ class FocusSessionSerializer(serializers.ModelSerializer):
     # ✅ Expose mode name for frontend display
     mode_name = serializers.CharField(source="mode.name", read_only=True)
 
-    related_tasks = TaskSerializer(many=True, read_only=True)
+    related_tasks = TaskSummarySerializer(many=True, read_only=True)
 
     class Meta:
         model = FocusSession
@@ -92,11 +129,39 @@ class FocusSessionSerializer(serializers.ModelSerializer):
         validated_data.setdefault("started_at", timezone.now())
         return super().create(validated_data)
 
+
+class FocusSessionExpandedSerializer(FocusSessionSerializer):
+    """Same as FocusSessionSerializer but with fully nested tasks (?expand=related_tasks)."""
+    related_tasks = TaskSerializer(many=True, read_only=True)
+
 class StartFocusSessionSerializer(serializers.Serializer):
     mode = serializers.CharField()
     task_ids = serializers.ListField(
         child=serializers.IntegerField(), required=False
     )
+
+
+MAX_BULK_TASKS = 500
+
+
+class BulkTaskOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=["complete", "freeze", "unfreeze", "set_priority", "delete"])
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False)
+    priority = serializers.ChoiceField(choices=PRIORITY_CHOICES, required=False)
+
+    def validate(self, attrs):
+        if attrs["op"] == "set_priority" and "priority" not in attrs:
+            raise serializers.ValidationError({"priority": "Required for set_priority."})
+        return attrs
+
+
+class BulkTaskSerializer(serializers.Serializer):
+    operations = BulkTaskOperationSerializer(many=True, allow_empty=False)
+
+    def validate_operations(self, value):
+        if sum(len(operation["ids"]) for operation in value) > MAX_BULK_TASKS:
+            raise serializers.ValidationError(f"At most {MAX_BULK_TASKS} task ids per request.")
+        return value
 from .models import Notification
 
 class NotificationSerializer(serializers.ModelSerializer):
@@ -110,6 +175,13 @@ class HobbySerializer(serializers.ModelSerializer):
         fields = "__all__"
         read_only_fields = ("user",)  # Add this line
 
+    def validate_metric_fields(self, value):
+        try:
+            validate_metric_fields(value)
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc))
+        return value
+
 class HobbyActivitySerializer(serializers.ModelSerializer):
     hobby_name = serializers.CharField(source="hobby.name", read_only=True)
 
@@ -118,6 +190,14 @@ class HobbyActivitySerializer(serializers.ModelSerializer):
         fields = "__all__"
         read_only_fields = ("user", "created_at")
 
+    def validate(self, attrs):
+        hobby = attrs.get("hobby") or getattr(self.instance, "hobby", None)
+        custom_data = attrs.get("custom_data", getattr(self.instance, "custom_data", {}))
+        errors = validate_custom_data(hobby.metric_fields if hobby else {}, custom_data)
+        if errors:
+            raise serializers.ValidationError({"custom_data": errors})
+        return attrs
+
 
 class ReminderSerializer(serializers.ModelSerializer):
     class Meta:
@@ -125,6 +205,23 @@ class ReminderSerializer(serializers.ModelSerializer):
         fields = "__all__"
         read_only_fields = ("user", "created_at")
 
+    def validate_repeat_rule(self, value):
+        return validate_rule(value)
+
+
+class OccurrenceSerializer(serializers.ModelSerializer):
+    """One materialised occurrence of a recurring task or reminder."""
+    task = TaskSummarySerializer(source="series.task", read_only=True, allow_null=True)
+    reminder = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Occurrence
+        fields = ["id", "at", "task", "reminder"]
+
+    def get_reminder(self, obj):
+        reminder = obj.series.reminder
+        return {"id": reminder.id, "title": reminder.title} if reminder else None
+
 
 class NoteSerializer(serializers.ModelSerializer):
     class Meta:
@@ -162,6 +259,17 @@ class BadgeSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class StreakSerializer(serializers.ModelSerializer):
+    current = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Streak
+        fields = ["kind", "current", "longest", "last_active_date"]
+
+    def get_current(self, obj):
+        return obj.current_on(timezone.localdate())
+
+
 class RewardSummarySerializer(serializers.ModelSerializer):
     class Meta:
         model = RewardSummary
@@ -0,0 +1,10 @@
+# api/signals.py
+from django.dispatch import Signal
+
+# Sent once when a FocusSession gets its ended_at (on create or later save).
+# kwargs: session
+focus_session_ended = Signal()
+
+# Sent once per task when it is first rewarded as done.
+# kwargs: task
+task_completed = Signal()
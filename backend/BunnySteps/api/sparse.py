@@ -0,0 +1,102 @@
+# api/sparse.py
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def requested(request, param):
+    """Names given in ?param=a,b (the parameter may repeat)."""
+    return {name.strip() for value in request.query_params.getlist(param) for name in value.split(",") if name.strip()}
+
+
+def pushdown(queryset, serializer):
+    """
+    Narrow `queryset` to what `serializer` reads: each field's source becomes an
+    .only() column, to-one relations it follows ("category.name") are joined with
+    select_related, and nested or many-related fields are prefetched. A field the
+    model does not describe (a property, a method, "*") keeps every column loaded.
+    """
+    model = queryset.model
+    ordering = {name.lstrip("-") for name in queryset.query.order_by if isinstance(name, str)}
+    columns = {model._meta.pk.name} | ordering
+    joins, prefetches, narrow = set(), set(), True
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField)):
+            prefetches.add(field.source)
+            continue
+        if field.source == "*":
+            narrow = False
+            continue
+
+        names, current = [], model
+        for attr in field.source_attrs:
+            try:
+                model_field = current._meta.get_field(attr)
+            except FieldDoesNotExist:
+                break
+            if not model_field.concrete:
+                break
+            names.append(attr)
+            if not model_field.is_relation:
+                break
+            if len(names) < len(field.source_attrs):
+                # followed past the foreign key: join it instead of loading it per row
+                joins.add("__".join(names))
+                columns.add("__".join(names))
+            current = model_field.related_model
+
+        if names:
+            columns.add("__".join(names))
+        else:
+            narrow = False
+
+    if narrow:
+        # joins the base queryset declared for the full payload may now be deferred columns
+        queryset = queryset.select_related(None).only(*sorted(columns))
+    if joins:
+        queryset = queryset.select_related(*sorted(joins))
+    if prefetches:
+        queryset = queryset.prefetch_related(*sorted(prefetches))
+    return queryset
+
+
+class SparseFieldsMixin:
+    """
+    Serializer side of ?fields= / ?expand= on reads served by a SparseQuerysetMixin
+    view: `fields` keeps only the named fields (unknown names are ignored) and
+    `expand` adds the nested serializers in Meta.expandable, which are never part
+    of the default payload.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not isinstance(self.context.get("view"), SparseQuerysetMixin):
+            return fields
+        request = self.context["request"]
+        if request.method not in SAFE_METHODS:
+            return fields
+
+        expandable = getattr(self.Meta, "expandable", {})
+        expand = requested(request, "expand") & expandable.keys()
+        for name in sorted(expand):
+            fields[name] = expandable[name]()
+        only = requested(request, "fields")
+        if only:
+            fields = {name: field for name, field in fields.items() if name in only or name in expand}
+        return fields
+
+
+class SparseQuerysetMixin:
+    """
+    View side: reads load only the columns and relations the (sparse) serializer
+    will use. Call sparse_queryset() at the end of get_queryset(); writes keep the
+    full rows, since saving a partially loaded instance only writes what was loaded.
+    """
+
+    def sparse_queryset(self, queryset):
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+        return pushdown(queryset, self.get_serializer())
@@ -0,0 +1,92 @@
+# api/streaks.py
+from datetime import timedelta
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Greatest, TruncDate
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import FocusSession, MoodLog, Streak, Task
+from .signals import focus_session_ended
+
+# kind -> (rows that count as activity, datetime field giving the active day)
+STREAK_SOURCES = {
+    "mood": (lambda user_id: MoodLog.objects.filter(user_id=user_id), "created_at"),
+    "focus": (lambda user_id: FocusSession.objects.filter(user_id=user_id, ended_at__isnull=False), "ended_at"),
+    "task": (lambda user_id: Task.objects.filter(user_id=user_id, status="done", completed_at__isnull=False),
+             "completed_at"),
+}
+
+
+def touch_streak(user_id, kind, day):
+    """
+    Record activity of `kind` on `day` with one conditional UPDATE.
+    Repeat activity on the same day is a no-op; activity dated before
+    last_active_date is ignored (run `rebuild_streaks` after backfills).
+    """
+    continued = Case(
+        When(last_active_date=day - timedelta(days=1), then=F("current") + 1),
+        default=Value(1),
+        output_field=models.PositiveIntegerField(),
+    )
+    pending = Streak.objects.filter(user_id=user_id, kind=kind).filter(
+        Q(last_active_date__isnull=True) | Q(last_active_date__lt=day)
+    )
+    changes = {"current": continued, "longest": Greatest("longest", continued), "last_active_date": day}
+
+    if pending.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            streak, created = Streak.objects.get_or_create(
+                user_id=user_id, kind=kind,
+                defaults={"current": 1, "longest": 1, "last_active_date": day},
+            )
+    except IntegrityError:
+        # created concurrently by another request
+        created, streak = False, None
+    if not created and (streak is None or not streak.last_active_date or streak.last_active_date < day):
+        pending.update(**changes)
+
+
+def rebuild_streak(user_id, kind):
+    """Recompute one streak from the user's full history of active days."""
+    source, field = STREAK_SOURCES[kind]
+    days = (
+        source(user_id)
+        .annotate(day=TruncDate(field))
+        .values_list("day", flat=True)
+        .distinct()
+        .order_by("day")
+    )
+
+    current = longest = 0
+    last = None
+    for day in days.iterator():
+        current = current + 1 if last and day == last + timedelta(days=1) else 1
+        longest = max(longest, current)
+        last = day
+
+    Streak.objects.update_or_create(
+        user_id=user_id, kind=kind,
+        defaults={"current": current, "longest": longest, "last_active_date": last},
+    )
+
+
+@receiver(post_save, sender=MoodLog)
+def mood_streak(sender, instance, created, **kwargs):
+    if created:
+        touch_streak(instance.user_id, "mood", timezone.localdate(instance.created_at))
+
+
+@receiver(focus_session_ended)
+def focus_streak(sender, session, **kwargs):
+    touch_streak(session.user_id, "focus", timezone.localdate(session.ended_at))
+
+
+@receiver(post_save, sender=Task)
+def task_streak(sender, instance, **kwargs):
+    if instance.status == "done" and instance.completed_at:
+        touch_streak(instance.user_id, "task", timezone.localdate(instance.completed_at))
@@ -0,0 +1,186 @@
+# api/sync.py
+from collections import defaultdict
+from contextlib import contextmanager
+from threading import local
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Prefetch
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from .models import (
+    Badge, Category, Expense, FocusSession, Hobby, HobbyActivity, MoodLog, Note, Reminder,
+    RewardEvent, RewardSummary, ShoppingItem, SyncChange, SyncCounter, Task,
+)
+from .serializers import (
+    BadgeSerializer, CategorySerializer, ExpenseSerializer, FocusSessionSerializer, HobbyActivitySerializer,
+    HobbySerializer, MoodLogSerializer, NoteSerializer, ReminderSerializer, RewardSummarySerializer,
+    ShoppingItemSerializer, TaskSerializer,
+)
+
+User = get_user_model()
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 2000
+
+# kind (the router prefix the client already knows) -> (queryset, serializer)
+SYNCED = {
+    "categories": (Category.objects.all(), CategorySerializer),
+    "tasks": (Task.objects.select_related("category", "hobby"), TaskSerializer),
+    "focus-sessions": (
+        FocusSession.objects.select_related("mode").prefetch_related(
+            Prefetch("related_tasks", queryset=Task.objects.only("id", "title", "status"))
+        ),
+        FocusSessionSerializer,
+    ),
+    "hobbies": (Hobby.objects.all(), HobbySerializer),
+    "hobby-activities": (HobbyActivity.objects.select_related("hobby"), HobbyActivitySerializer),
+    "reminders": (Reminder.objects.all(), ReminderSerializer),
+    "notes": (Note.objects.all(), NoteSerializer),
+    "mood-logs": (MoodLog.objects.all(), MoodLogSerializer),
+    "shopping-items": (ShoppingItem.objects.all(), ShoppingItemSerializer),
+    "expenses": (Expense.objects.select_related("shopping_item"), ExpenseSerializer),
+    "badges": (Badge.objects.all(), BadgeSerializer),
+    "rewards": (RewardSummary.objects.all(), RewardSummarySerializer),
+}
+KINDS = {queryset.model: kind for kind, (queryset, _) in SYNCED.items()}
+
+_deferred = local()
+
+
+def allocate(user_id, count=1):
+    """
+    Reserve `count` sequence numbers for the user and return the last one. The
+    counter row stays locked until the caller's transaction commits, so one user's
+    changes become visible in sequence order and a cursor never skips one.
+    """
+    table = SyncCounter._meta.db_table
+    for _ in range(2):
+        if connection.features.can_return_columns_from_insert:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {table} SET last_seq = last_seq + %s WHERE user_id = %s RETURNING last_seq",
+                    [count, user_id],
+                )
+                row = cursor.fetchone()
+            if row:
+                return row[0]
+        elif SyncCounter.objects.filter(user_id=user_id).update(last_seq=F("last_seq") + count):
+            return SyncCounter.objects.values_list("last_seq", flat=True).get(user_id=user_id)
+        try:
+            with transaction.atomic():
+                SyncCounter.objects.create(user_id=user_id, last_seq=count)
+            return count
+        except IntegrityError:
+            continue  # created concurrently; the UPDATE will find it now
+    raise RuntimeError(f"Could not allocate a sync sequence for user {user_id}")
+
+
+def record_changes(user_id, kind, object_ids, deleted=False):
+    """Give each object a fresh sequence number (one UPDATE, one upsert)."""
+    object_ids = list(object_ids)
+    if user_id is None or not object_ids:
+        return
+    pending = getattr(_deferred, "changes", None)
+    if pending is not None:
+        pending[user_id].update(((kind, object_id), deleted) for object_id in object_ids)
+        return
+    write_changes(user_id, [(kind, object_id, deleted) for object_id in object_ids])
+
+
+def write_changes(user_id, rows):
+    with transaction.atomic(savepoint=False):
+        last = allocate(user_id, len(rows))
+        first = last - len(rows) + 1
+        SyncChange.objects.bulk_create(
+            [
+                SyncChange(user_id=user_id, seq=first + offset, kind=kind, object_id=object_id, deleted=deleted)
+                for offset, (kind, object_id, deleted) in enumerate(rows)
+            ],
+            update_conflicts=True, unique_fields=["kind", "object_id"],
+            update_fields=["user", "seq", "deleted"],
+        )
+
+
+@contextmanager
+def deferred_changes():
+    """
+    Buffer the changes recorded inside the block (e.g. one delete signal per row of
+    a cascade) and write them on exit with one allocation and one upsert per user.
+    Nothing is written if the block raises.
+    """
+    if getattr(_deferred, "changes", None) is not None:
+        yield  # an outer block writes them
+        return
+    _deferred.changes = pending = defaultdict(dict)
+    try:
+        yield
+    finally:
+        _deferred.changes = None
+    for user_id, changes in pending.items():
+        write_changes(user_id, [(kind, object_id, deleted) for (kind, object_id), deleted in changes.items()])
+
+
+def changes_since(user_id, since, limit=DEFAULT_PAGE_SIZE, context=None):
+    """
+    One page of the user's changes after cursor `since`: current representations of
+    upserted objects and ids of deleted ones, grouped by kind. Costs one indexed range
+    read on (user, seq) plus one query per kind that changed.
+    """
+    rows = list(
+        SyncChange.objects.filter(user_id=user_id, seq__gt=since)
+        .order_by("seq")
+        .values_list("seq", "kind", "object_id", "deleted")[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    upserted, deleted = defaultdict(list), defaultdict(list)
+    for _, kind, object_id, is_deleted in rows:
+        (deleted if is_deleted else upserted)[kind].append(object_id)
+
+    changes = {}
+    for kind, ids in upserted.items():
+        queryset, serializer = SYNCED[kind]
+        objects = list(queryset.filter(user_id=user_id, pk__in=ids).order_by("pk"))
+        # an object deleted since the page was read is simply absent; its tombstone has a later seq
+        changes[kind] = serializer(objects, many=True, context=context or {}).data
+
+    return {
+        "cursor": rows[-1][0] if rows else since,
+        "has_more": has_more,
+        "changes": changes,
+        "deleted": dict(deleted),
+    }
+
+
+def object_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record_changes(instance.user_id, KINDS[sender], [instance.pk])
+
+
+def object_deleted(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, User) or getattr(origin, "model", None) is User:
+        return  # the whole account is going, feed included
+    record_changes(instance.user_id, KINDS[sender], [instance.pk], deleted=True)
+
+
+def session_tasks_changed(sender, instance, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear") and isinstance(instance, FocusSession):
+        record_changes(instance.user_id, "focus-sessions", [instance.pk])
+
+
+def reward_granted(sender, instance, created, **kwargs):
+    # grant_reward() folds events into RewardSummary with a queryset UPDATE, which sends no signal
+    if not created:
+        return
+    summary_id = RewardSummary.objects.filter(user_id=instance.user_id).values_list("pk", flat=True).first()
+    if summary_id:
+        record_changes(instance.user_id, "rewards", [summary_id])
+
+
+for model in KINDS:
+    post_save.connect(object_saved, sender=model, dispatch_uid=f"sync-save-{model.__name__}")
+    post_delete.connect(object_deleted, sender=model, dispatch_uid=f"sync-delete-{model.__name__}")
+m2m_changed.connect(session_tasks_changed, sender=FocusSession.related_tasks.through, dispatch_uid="sync-session-tasks")
+post_save.connect(reward_granted, sender=RewardEvent, dispatch_uid="sync-reward-granted")
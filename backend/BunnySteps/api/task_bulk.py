@@ -0,0 +1,95 @@
+# api/task_bulk.py
+from django.db import transaction
+from django.utils import timezone
+
+from .badges import record_event
+from .models import Notification, RewardSummary, Task, grant_rewards
+from .search import deferred_unindexing
+from .streaks import touch_streak
+from .sync import deferred_changes, record_changes
+
+TASK_XP = 50
+TASK_COINS = 10
+UPDATED_FIELDS = ["status", "completed", "completed_at", "frozen", "priority", "updated_at"]
+
+
+def apply_operations(user, operations):
+    """
+    Apply validated bulk `operations` ([{"op", "ids", "priority"?}], in order) to the
+    user's tasks in one transaction. Changed rows are written with one bulk_update
+    and deletions with one cascade; rewards, badges, streak and notifications for
+    the completed tasks are computed for the whole batch (see award_completions)
+    instead of once per task, so the cost no longer grows with the batch.
+    """
+    now = timezone.now()
+    ids = {pk for operation in operations for pk in operation["ids"]}
+
+    # every change feed entry of the batch (tasks, cascaded rows, rewards, badges) is written once, at the end
+    with transaction.atomic(), deferred_changes(), deferred_unindexing():
+        tasks = Task.objects.select_for_update().filter(user=user, pk__in=ids).in_bulk()
+        changed, completed, deleted = set(), [], set()
+
+        for operation in operations:
+            op = operation["op"]
+            for pk in operation["ids"]:
+                task = tasks.get(pk)
+                if task is None or pk in deleted:
+                    continue
+                if op == "delete":
+                    deleted.add(pk)
+                    continue
+                if op == "complete":
+                    if task.status == "done":
+                        continue
+                    task.status, task.completed = "done", True
+                    task.completed_at = task.completed_at or now
+                    completed.append(task)
+                elif op in ("freeze", "unfreeze"):
+                    task.frozen = op == "freeze"
+                elif op == "set_priority":
+                    task.priority = operation["priority"]
+                task.updated_at = now
+                changed.add(pk)
+
+        updated = [tasks[pk] for pk in sorted(changed - deleted)]
+        completed = [task for task in completed if task.pk not in deleted]
+        # bulk_update and the queryset delete bypass save(), so their side effects are applied here
+        Task.objects.bulk_update(updated, UPDATED_FIELDS, batch_size=500)
+        record_changes(user.pk, "tasks", [task.pk for task in updated])
+        if deleted:
+            Task.objects.filter(user=user, pk__in=deleted).delete()
+        rewards = award_completions(user, completed)
+
+    return {
+        "updated": [task.pk for task in updated],
+        "completed": [task.pk for task in completed],
+        "deleted": sorted(deleted),
+        "missing": sorted(ids - tasks.keys()),
+        **rewards,
+    }
+
+
+def award_completions(user, tasks):
+    """
+    Batch form of award_task_rewards + the task streak: one ledger insert and one
+    summary UPDATE for every task not rewarded before, one badge count for all of
+    them, one streak touch per completion day and one bulk insert of notifications.
+    """
+    granted = set(grant_rewards(user.pk, {f"task:{task.pk}:done": (TASK_XP, TASK_COINS) for task in tasks}))
+    rewarded = [task for task in tasks if f"task:{task.pk}:done" in granted]
+    for day in sorted({timezone.localdate(task.completed_at) for task in tasks}):
+        touch_streak(user.pk, "task", day)
+    if not rewarded:
+        return {"xp": 0, "coins": 0, "badges": []}
+
+    # grant_rewards folds into RewardSummary with a queryset UPDATE, which sends no signal
+    record_changes(user.pk, "rewards", RewardSummary.objects.filter(user=user).values_list("pk", flat=True))
+    badges = record_event(user.pk, "task_completed", count=len(rewarded))
+    Notification.objects.bulk_create([
+        Notification(
+            user=user, type="task_complete", related_task=task,
+            message=f"Great job! You've completed '{task.title}'. +{TASK_XP} XP and +{TASK_COINS} coins!",
+        )
+        for task in rewarded
+    ])
+    return {"xp": TASK_XP * len(rewarded), "coins": TASK_COINS * len(rewarded), "badges": badges}
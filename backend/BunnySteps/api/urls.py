@@ -8,16 +8,24 @@ from rest_framework_simplejwt.views import (
 from django.urls import path
 from .views import (
     AdaptiveRecommendationView,
+    AllSessionsView,
+    BudgetStatusView,
+    CalendarView,
     CategoryDetailView,
     CategoryListCreateView,
+    ExpenseAnalyticsView,
+    ExpenseImportView,
     ExpenseListCreateView,
     ExpiringItemsView,
+    ExpiryHorizonView,
     ImpulsiveShoppingItemView,
     NotificationListView,
     NotificationMarkReadView,
     PingView,
 
     ReminderForTaskView,
+    SearchView,
+    SyncView,
     RewardRecommendationView,
     SendNoteToFutureSelfView,
     ShoppingItemDetailView,
@@ -32,6 +40,7 @@ from .views import (
     HobbyActivityListCreateView, ConvertHobbyActivityToTaskView,
     HobbyNoteListCreateView, NoteDeleteView,
     CheckInactivityRemindersView,
+    UpcomingOccurrencesView,
     UserProfileView,
     )
 
@@ -50,6 +59,8 @@ router.register("badges", views.BadgeViewSet)
 router.register("rewards", views.RewardSummaryViewSet)
 
 urlpatterns = [
+    # INACTIVITY REMINDERS (ahead of the router, whose hobbies/<pk>/ route would swallow it)
+    path("hobbies/check-inactivity/", CheckInactivityRemindersView.as_view()),
     path("", include(router.urls)),
         # JWT auth routes
     path('auth/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -74,8 +85,6 @@ urlpatterns = [
     path("hobbies/<int:hobby_id>/notes/", HobbyNoteListCreateView.as_view()),
     path("notes/<int:note_id>/delete/", NoteDeleteView.as_view()),
 
-    # INACTIVITY REMINDERS
-    path("hobbies/check-inactivity/", CheckInactivityRemindersView.as_view()),
        # Categories
     path("categories/", CategoryListCreateView.as_view(), name="category-list-create"),
     path("categories/<int:pk>/", CategoryDetailView.as_view(), name="category-detail"),
@@ -88,12 +97,23 @@ urlpatterns = [
 
     # Expenses
     path("shopping/expenses/", ExpenseListCreateView.as_view(), name="expense-list-create"),
+    path("shopping/expenses/analytics/", ExpenseAnalyticsView.as_view(), name="expense-analytics"),
+    path("shopping/expenses/import/", ExpenseImportView.as_view(), name="expense-import"),
 
     # Expiring / almost over items
     path("shopping/items/expiring/", ExpiringItemsView.as_view(), name="expiring-items"),
+    path("shopping/items/expiry-horizon/", ExpiryHorizonView.as_view(), name="expiry-horizon"),
     path('ping/', PingView.as_view()),
+    path("focus/recommendation/", AdaptiveRecommendationView.as_view(), name="focus-recommendation"),
+    path("focus/sessions/", AllSessionsView.as_view(), name="focus-all-sessions"),
+    path("streaks/", views.StreakListView.as_view(), name="streaks"),
     # Impulsive shopping
     path("shopping/items/impulsive/", ImpulsiveShoppingItemView.as_view(), name="impulsive-items"),
+    path("shopping/budget/", BudgetStatusView.as_view(), name="budget-status"),
+    path("occurrences/upcoming/", UpcomingOccurrencesView.as_view(), name="upcoming-occurrences"),
+    path("calendar/", CalendarView.as_view(), name="calendar"),
+    path("search/", SearchView.as_view(), name="search"),
+    path("sync/", SyncView.as_view(), name="sync"),
     path('register/', views.RegisterView.as_view(), name='register'),
     path('login/', views.LoginView.as_view(), name='login'),
     path('logout/', views.LogoutView.as_view(), name='logout'),
@@ -1,30 +1,112 @@
 # utils.py (create this file in your app)
+from datetime import datetime, time
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
 
 from .models import Notification, Reminder
 
 
-def fire_due_reminders(user):
+def due_reminders(now=None):
     """
-    Call this on any authenticated view the user hits.
-    Checks and fires reminders that are due.
+    Reminders that should fire at `now`: not yet notified, not frozen,
+    and not snoozed past `now`.
     """
-    now = timezone.now()
-    due_reminders = Reminder.objects.filter(
-        user=user,
+    now = now or timezone.now()
+    return Reminder.objects.filter(
         remind_at__lte=now,
-        notified=False,           # ← Use the real field name        frozen=False,
-        snoozed_until__isnull=True
-    )
-
-    for reminder in due_reminders:
-        Notification.objects.create(
-            user=user,
-            type='reminder_due',
-            title=reminder.title or "Time's up!",
-            message=reminder.note or "Your reminder is due now!",
-            related_reminder=reminder,
-            related_task=reminder.task,
+        notified=False,
+        frozen=False,
+    ).filter(Q(snoozed_until__isnull=True) | Q(snoozed_until__lte=now))
+
+
+def fire_reminders(reminders, now=None):
+    """
+    Fire every due reminder in `reminders` as one batch:
+    one SELECT, one bulk INSERT of notifications, one UPDATE of `notified`.
+    Returns the number of reminders fired.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        due = list(
+            due_reminders(now).filter(pk__in=reminders.values("pk"))
+            .select_for_update()
+            .only("id", "user_id", "task_id", "title", "note")
         )
-        reminder.reminded = True
-        reminder.save(update_fields=['reminded'])
\ No newline at end of file
+        if not due:
+            return 0
+
+        Notification.objects.bulk_create([
+            Notification(
+                user_id=reminder.user_id,
+                type='reminder_due',
+                title=reminder.title or "Time's up!",
+                message=reminder.note or "Your reminder is due now!",
+                related_reminder_id=reminder.id,
+                related_task_id=reminder.task_id,
+            )
+            for reminder in due
+        ])
+        Reminder.objects.filter(pk__in=[r.id for r in due]).update(notified=True)
+    return len(due)
+
+
+def fire_due_reminders(user):
+    """
+    Fire the user's due reminders right away.
+    Normally the `run_reminder_scheduler` process does this for everyone.
+    """
+    return fire_reminders(Reminder.objects.filter(user=user))
+
+
+def increment_or_create(model, lookup, **increments):
+    """
+    Atomically add `increments` to the `model` row matching `lookup`
+    (UPDATE ... SET col = col + delta), creating the row if it is missing.
+    """
+    rows = model.objects.filter(**lookup)
+    changes = {field: F(field) + delta for field, delta in increments.items()}
+    if rows.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **increments)
+    except IntegrityError:
+        # created concurrently by another request
+        rows.update(**changes)
+
+
+def date_query_param(request, name, default):
+    """`?name=YYYY-MM-DD` as a date, or `default` when absent; 400 when malformed."""
+    value = request.query_params.get(name)
+    if not value:
+        return default
+    try:
+        parsed = parse_date(value)
+    except ValueError:  # well-formed but impossible, e.g. 2026-02-30
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: "Use YYYY-MM-DD."})
+    return parsed
+
+
+def datetime_query_param(request, name, default):
+    """
+    `?name=` as an aware datetime: an ISO datetime (naive ones are local time) or a
+    YYYY-MM-DD date meaning local midnight; `default` when absent, 400 when malformed.
+    """
+    value = request.query_params.get(name)
+    if not value:
+        return default
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None and len(value) == 10 and parse_date(value):
+            parsed = datetime.combine(parse_date(value), time.min)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: "Use an ISO datetime or YYYY-MM-DD."})
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
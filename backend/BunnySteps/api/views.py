@@ -1,9 +1,36 @@
+import io
+import json
+from datetime import datetime, timedelta
+
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from django.utils import timezone
-from django.db.models import Avg, Count
-from .utils import fire_due_reminders
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch, Sum
+from django.http import StreamingHttpResponse
+from .pagination import (
+    OptionalPaginationMixin, SessionCursorPagination, TaskCursorPagination, TaskOffsetPagination
+)
+from .focus_metrics import time_slot_for
+from .recommendations import recommend
+from .moods import INSIGHTS_CACHE_TIMEOUT, insights_cache_key, weekly_mood_summary
+from .budget import budget_status, month_of, month_spent, monthly_budget
+from .currency import home_currency
+from .expense_analytics import DIMENSIONS, expense_cube
+from .expense_import import detect_format, import_expenses
+from .hobbies import INACTIVITY_DAYS, inactive_hobbies
+from .hobby_metrics import BUCKETS as METRIC_BUCKETS, metric_series
+from .recurrence import occurrences_between
+from .conditional import ConditionalGetMixin, notification_version
+from .calendar_feed import MAX_WINDOW_DAYS, calendar_events
+from .search import MAX_RESULTS as MAX_SEARCH_RESULTS, SOURCES as SEARCH_SOURCES, search
+from .sync import DEFAULT_PAGE_SIZE as SYNC_PAGE_SIZE, MAX_PAGE_SIZE as MAX_SYNC_PAGE_SIZE, changes_since
+from .sparse import SparseQuerysetMixin
+from .task_bulk import apply_operations
+from .utils import date_query_param, datetime_query_param
 
 from .models import *
 from .serializers import *
@@ -14,8 +41,6 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
-# Add this import at the top with your other imports
-from django.db.models import Count
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = RegisterSerializer
@@ -52,8 +77,7 @@ class UserProfileView(APIView):
         
         # ADD SALARY (monthly income - store in User or settings)
         salary = getattr(user, 'salary_amount', 1200)  # Default 1200 DT (~$400 USD)
-        
-        check_weekly_discipline(user)
+        # Weekly discipline badges are awarded by the nightly `award_weekly_discipline` job
 
         return Response({
             "id": user.id,
@@ -65,7 +89,7 @@ class UserProfileView(APIView):
             "salary_amount": salary,  # ✅ ADD THIS
         })
 
-class ShoppingItemListView(generics.ListAPIView):
+class ShoppingItemListView(ConditionalGetMixin, generics.ListAPIView):
     serializer_class = ShoppingItemSerializer
     permission_classes = [IsAuthenticated]
 
@@ -117,7 +141,7 @@ class LoginView(APIView):
             },
             "message": "Welcome back, little bunny!"
         }, status=status.HTTP_200_OK)
-class BaseUserOwnedViewSet(viewsets.ModelViewSet):
+class BaseUserOwnedViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     Base class for models linked to the authenticated user.
     Auto-fills user on create and filters queryset.
@@ -154,6 +178,41 @@ class HobbyViewSet(BaseUserOwnedViewSet):
             "frozen": hobby.frozen,
             "detail": "hobby frozen" if hobby.frozen else "hobby unfrozen"
         })
+
+    @action(detail=True, methods=["get"])
+    def metrics(self, request, pk=None):
+        """
+        Time series of the hobby's typed metric fields.
+        ?start=YYYY-MM-DD&end=YYYY-MM-DD (default: the last 30 days), ?bucket=day|week|month,
+        ?field=minutes (repeatable; default: every declared field)
+        """
+        hobby = self.get_object()
+        today = timezone.localdate()
+        start = date_query_param(request, "start", today - timedelta(days=29))
+        end = date_query_param(request, "end", today)
+        bucket = request.query_params.get("bucket", "day")
+        if bucket not in METRIC_BUCKETS:
+            raise ValidationError({"bucket": f"Choose from: {', '.join(METRIC_BUCKETS)}."})
+        if start > end:
+            raise ValidationError({"end": "end must not be before start."})
+
+        fields = request.query_params.getlist("field") or list(hobby.metric_fields)
+        series = metric_series(
+            hobby,
+            timezone.make_aware(datetime.combine(start, datetime.min.time())),
+            timezone.make_aware(datetime.combine(end + timedelta(days=1), datetime.min.time())),
+            bucket,
+            fields,
+        )
+        return Response({
+            "hobby": hobby.id,
+            "start": start,
+            "end": end,
+            "bucket": bucket,
+            "fields": {field: hobby.metric_fields.get(field) for field in fields},
+            "series": {field: series.get(field, []) for field in fields},
+        })
+
 class HobbyActivityViewSet(BaseUserOwnedViewSet):
     queryset = HobbyActivity.objects.select_related("hobby").all()
     serializer_class = HobbyActivitySerializer
@@ -175,42 +234,27 @@ class MoodLogViewSet(BaseUserOwnedViewSet):
 
     @action(detail=False, methods=['get'])
     def insights(self, request):
+        # Cached per user and day; api/moods.py drops the entry when a MoodLog changes
         user = request.user
-        week_ago = timezone.now() - timedelta(days=7)
-        logs = self.get_queryset().filter(created_at__gte=week_ago)
-
-        total = logs.count()
-        avg_rating = logs.aggregate(avg=Avg('rating'))['avg'] or 0
-        today_count = logs.filter(created_at__date=timezone.now().date()).count()
-
-        # Weekly trend (last 7 days)
-        trend = []
-        for i in range(6, -1, -1):
-            day = timezone.now().date() - timedelta(days=i)
-            day_avg = logs.filter(created_at__date=day).aggregate(avg=Avg('rating'))['avg'] or 0
-            trend.append({
-                "time": day.strftime("%a"),
-                "mood": round(day_avg, 1)
-            })
-
-        return Response({
-            "today_checkins": today_count,
-            "weekly_average": round(avg_rating, 1),
-            "weekly_trend": trend,
-            "best_day": max(trend, key=lambda x: x['mood'])['time'] if trend else None,
-            "streak": self._calculate_streak(user)
-        })
+        today = timezone.localdate()
+        cache_key = insights_cache_key(user.id, today)
+        data = cache.get(cache_key)
+        if data is None:
+            avg_rating, today_count, trend = weekly_mood_summary(user, today)
+            data = {
+                "today_checkins": today_count,
+                "weekly_average": round(avg_rating, 1),
+                "weekly_trend": trend,
+                "best_day": max(trend, key=lambda x: x['mood'])['time'] if trend else None,
+                "streak": self._calculate_streak(user)
+            }
+            cache.set(cache_key, data, INSIGHTS_CACHE_TIMEOUT)
+        return Response(data)
 
     def _calculate_streak(self, user):
-        # Simple streak: consecutive days with at least one log
-        today = timezone.now().date()
-        streak = 0
-        check_date = today
-        logs = self.get_queryset().filter(user=user).dates('created_at', 'day')
-        while check_date in logs:
-            streak += 1
-            check_date -= timedelta(days=1)
-        return streak
+        # Consecutive days with at least one log, ending today (kept up to date by api/streaks.py)
+        streak = Streak.objects.filter(user=user, kind="mood").first()
+        return streak.current_on(timezone.localdate()) if streak else 0
 
 
 class ShoppingItemViewSet(BaseUserOwnedViewSet):
@@ -223,6 +267,15 @@ class ExpenseViewSet(BaseUserOwnedViewSet):
     serializer_class = ExpenseSerializer
 
 
+class StreakListView(generics.ListAPIView):
+    """Current and longest streaks for mood check-ins, focus sessions and tasks."""
+    serializer_class = StreakSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Streak.objects.filter(user=self.request.user)
+
+
 class BadgeViewSet(BaseUserOwnedViewSet):
     queryset = Badge.objects.all()
     serializer_class = BadgeSerializer
@@ -236,13 +289,16 @@ class RewardSummaryViewSet(BaseUserOwnedViewSet):
 
 # views.py (append at the end, import if needed: from rest_framework import generics)
 
-class NotificationListView(generics.ListAPIView):
+class NotificationListView(ConditionalGetMixin, generics.ListAPIView):
     """
     List unread notifications for the user (or all if ?all=true).
     """
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
 
+    def etag_version(self):
+        return notification_version(self.request.user.pk)
+
     def get_queryset(self):
         queryset = Notification.objects.filter(user=self.request.user)
         if self.request.query_params.get('all') != 'true':
@@ -278,24 +334,39 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
-from django.db.models import Count
 from datetime import timedelta
 import random
 
 import random
-from django.db.models import Q, Count
-from django.db.models.functions import TruncDate
+from django.db.models import Q
 from django.utils import timezone
 from datetime import timedelta
 
 class FocusSessionViewSet(BaseUserOwnedViewSet):
+    """
+    Sessions nest a compact (id, title, status) view of their tasks;
+    ?expand=related_tasks returns the full TaskSerializer payload instead.
+    Either way related tasks are prefetched, so a list costs a fixed number of queries.
+    """
     queryset = FocusSession.objects.all()
     serializer_class = FocusSessionSerializer
 
+    def expand_tasks(self):
+        return "related_tasks" in self.request.query_params.get("expand", "").split(",")
+
+    def get_serializer_class(self):
+        if self.action in ['list', 'retrieve'] and self.expand_tasks():
+            return FocusSessionExpandedSerializer
+        return super().get_serializer_class()
+
     def get_queryset(self):
         qs = super().get_queryset()
-        if self.action in ['list', 'retrieve', 'stats']:
-            qs = qs.select_related('mode')
+        if self.action in ['list', 'retrieve']:
+            if self.expand_tasks():
+                tasks = Task.objects.select_related("category", "hobby")
+            else:
+                tasks = Task.objects.only("id", "title", "status")
+            qs = qs.select_related('mode').prefetch_related(Prefetch("related_tasks", queryset=tasks))
         return qs
 
     @action(detail=False, methods=["post"], url_path="start")
@@ -375,18 +446,18 @@ class FocusSessionViewSet(BaseUserOwnedViewSet):
 
     @action(detail=False, methods=["get"], url_path="stats")
     def stats(self, request):
-        week_ago = timezone.now() - timedelta(days=7)
+        # Reads the pre-aggregated FocusMetric rows (one per day/slot), not raw sessions
+        week_ago = timezone.localdate() - timedelta(days=7)
         daily = (
-            self.get_queryset()
-            .filter(started_at__gte=week_ago, ended_at__isnull=False)
-            .annotate(day=TruncDate('started_at'))
-            .values('day')
-            .annotate(sessions=Count('id'))
-            .order_by('day')
+            FocusMetric.objects
+            .filter(user=request.user, date__gte=week_ago)
+            .values('date')
+            .annotate(sessions=Sum('session_count'))
+            .order_by('date')
         )
 
         chart_data = [
-            {"day": d["day"].strftime("%a"), "sessions": d["sessions"]}
+            {"day": d["date"].strftime("%a"), "sessions": d["sessions"]}
             for d in daily
         ]
 
@@ -401,22 +472,19 @@ class AdaptiveRecommendationView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        sessions = FocusSession.objects.filter(
-            user=request.user
-        ).order_by("-started_at")[:20]
+        # Served from the cached per-slot focus model, never from raw sessions
+        slot = time_slot_for(timezone.now())
+        recommendation = recommend(request.user.id, slot)
 
-        if not sessions:
+        if recommendation is None:
             return Response({"message": "Not enough focus history."})
 
-        avg = sum(
-            (s.effective_minutes or 0)
-            for s in sessions
-        ) / len(sessions)
-
-        return Response({
-            "recommended_length": int(avg),
-            "message": f"You focus best around {int(avg)} minutes."
-        })
+        length = recommendation["recommended_length"]
+        recommendation["message"] = (
+            f"This {slot}, aim for about {length} minutes. "
+            f"You focus best in the {recommendation['best_slot']}."
+        )
+        return Response(recommendation)
 from datetime import timedelta
 from django.utils import timezone
 from rest_framework import status, generics
@@ -429,25 +497,61 @@ from .serializers import (
     HobbySerializer, HobbyActivitySerializer, NoteSerializer, TaskSerializer
 )
 class AllSessionsView(APIView):
+    """
+    Full focus history of the user.
+    GET /api/focus/sessions/                      one JSON array, streamed (the original shape)
+    GET /api/focus/sessions/?cursor=|?page_size=  keyset pages, opt-in like OptionalPaginationMixin
+    GET /api/focus/sessions/?stream=jsonl         streamed export, one JSON object per line
+    Unpaginated reads go through a server-side cursor so memory stays flat.
+    """
     permission_classes = [IsAuthenticated]
+    fields = ("id", "mode_name", "effective_minutes", "started_at", "ended_at")
+    chunk_size = 2000
 
     def get(self, request):
-        sessions = FocusSession.objects.filter(user=request.user).order_by("-started_at")
-        data = [{
-            "id": s.id,
-            "mode": s.mode_name,
-            "effective_minutes": s.effective_minutes,
-            "started_at": s.started_at,
-            "ended_at": s.ended_at,
-        } for s in sessions]
+        sessions = FocusSession.objects.filter(user=request.user).order_by("-started_at", "-id")
+        stream = request.query_params.get("stream")
+
+        if stream == "jsonl":
+            lines = (json.dumps(row, cls=DjangoJSONEncoder) + "\n" for row in self._rows(sessions))
+            return StreamingHttpResponse(lines, content_type="application/x-ndjson")
+        params = request.query_params
+        if stream == "json" or not ("cursor" in params or "page_size" in params):
+            return StreamingHttpResponse(self._json_array(sessions), content_type="application/json")
+
+        paginator = SessionCursorPagination()
+        page = paginator.paginate_queryset(sessions.only(*self.fields), request, view=self)
+        return paginator.get_paginated_response([
+            self._row({field: getattr(session, field) for field in self.fields}) for session in page
+        ])
+
+    @staticmethod
+    def _row(values):
+        return {
+            "id": values["id"],
+            "mode": values["mode_name"],
+            "effective_minutes": values["effective_minutes"],
+            "started_at": values["started_at"],
+            "ended_at": values["ended_at"],
+        }
 
-        return Response(data)
+    def _rows(self, sessions):
+        for values in sessions.values(*self.fields).iterator(chunk_size=self.chunk_size):
+            yield self._row(values)
+
+    def _json_array(self, sessions):
+        yield "["
+        separator = ""
+        for row in self._rows(sessions):
+            yield separator + json.dumps(row, cls=DjangoJSONEncoder)
+            separator = ","
+        yield "]"
 
 
 # ----------------------------------------------------
 #                 HOBBY CRUD
 # ----------------------------------------------------
-class HobbyListCreateView(generics.ListCreateAPIView):
+class HobbyListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     serializer_class = HobbySerializer
     permission_classes = [IsAuthenticated]
 
@@ -458,7 +562,7 @@ class HobbyListCreateView(generics.ListCreateAPIView):
         serializer.save(user=self.request.user)
 
 
-class HobbyDetailView(generics.RetrieveUpdateDestroyAPIView):
+class HobbyDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = HobbySerializer
     permission_classes = [IsAuthenticated]
 
@@ -597,18 +701,9 @@ class CheckInactivityRemindersView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        cutoff = timezone.now() - timedelta(days=30)
-        inactive_hobbies = []
-
-        hobbies = Hobby.objects.filter(user=request.user, status="active")
-
-        for hobby in hobbies:
-            last_activity = HobbyActivity.objects.filter(hobby=hobby).order_by("-created_at").first()
-
-            if not last_activity or last_activity.created_at < cutoff:
-                inactive_hobbies.append(HobbySerializer(hobby).data)
-
-        return Response({"inactive": inactive_hobbies})
+        cutoff = timezone.now() - timedelta(days=INACTIVITY_DAYS)
+        summaries = inactive_hobbies(HobbySummary.objects.filter(user=request.user), cutoff).select_related("hobby")
+        return Response({"inactive": [HobbySerializer(summary.hobby).data for summary in summaries]})
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -666,10 +761,11 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.utils import timezone
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(ConditionalGetMixin, OptionalPaginationMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     Complete CRUD + custom actions for tasks
-    GET    /api/tasks/
+    GET    /api/tasks/                      (?cursor=/?page_size= keyset pages, ?limit=/?offset= offset pages)
+                                            (?fields=id,title,status / ?expand=reminders,focus_sessions on reads)
     POST   /api/tasks/
     GET    /api/tasks/<id>/
     PATCH  /api/tasks/<id>/
@@ -677,19 +773,18 @@ class TaskViewSet(viewsets.ModelViewSet):
     PATCH  /api/tasks/<id>/start/
     PATCH  /api/tasks/<id>/complete/
     PATCH  /api/tasks/<id>/toggle_freeze/
+    POST   /api/tasks/bulk/                 {"operations": [{"op": "complete", "ids": [...]}, ...]}
     """
 
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
     queryset = Task.objects.all()  # Required for router
-    def list(self, request, *args, **kwargs):
-            fire_due_reminders(request.user)   # ← HERE TOO
-            return super().list(request, *args, **kwargs)
+    cursor_pagination_class = TaskCursorPagination
+    offset_pagination_class = TaskOffsetPagination
     def get_queryset(self):
         queryset = Task.objects.filter(user=self.request.user) \
-            .select_related("category", "shopping_item", "hobby") \
-            .prefetch_related("reminders", "focus_sessions") \
-            .order_by("-created_at")
+            .select_related("category", "hobby") \
+            .order_by("-created_at", "-id")
 
         # THIS IS BULLETPROOF — NO MORE CRASHES
         hobby_param = self.request.query_params.get("hobby")
@@ -700,7 +795,7 @@ class TaskViewSet(viewsets.ModelViewSet):
             except (ValueError, TypeError):
                 print('wrong id ',hobby_id)  # Invalid hobby ID → return no tasks (safe)
 
-        return queryset
+        return self.sparse_queryset(queryset)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -768,25 +863,34 @@ class TaskViewSet(viewsets.ModelViewSet):
             "detail": "Task frozen" if task.frozen else "Task unfrozen"
         })
 
+    # BULK: complete / freeze / unfreeze / set_priority / delete many tasks in one transaction
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        serializer = BulkTaskSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(apply_operations(request.user, serializer.validated_data["operations"]))
+
 # views.py
 class PingView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        fire_due_reminders(request.user)
+        # Due reminders are fired by the `run_reminder_scheduler` process
         return Response({"status": "ok", "message": "Bunny is awake!"})
 
 # ========================
 # LEGACY VIEWS (keep if you still use them)
 # ========================
-class TaskListCreateView(generics.ListCreateAPIView):
+class TaskListCreateView(ConditionalGetMixin, OptionalPaginationMixin, SparseQuerysetMixin, generics.ListCreateAPIView):
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
+    cursor_pagination_class = TaskCursorPagination
+    offset_pagination_class = TaskOffsetPagination
 
     def get_queryset(self):
         qs = Task.objects.filter(user=self.request.user).select_related(
-            "category", "shopping_item", "hobby"
-        ).order_by("-created_at")
+            "category", "hobby"
+        ).order_by("-created_at", "-id")
 
         # Existing filters (keep these!)
         if self.request.query_params.get("status"):
@@ -800,19 +904,19 @@ class TaskListCreateView(generics.ListCreateAPIView):
         if self.request.query_params.get("hobby"):
             qs = qs.filter(hobby=self.request.query_params["hobby"])
 
-        return qs
+        return self.sparse_queryset(qs)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
+class TaskDetailView(ConditionalGetMixin, SparseQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Task.objects.filter(user=self.request.user).select_related(
-            "category", "shopping_item", "hobby"
-        )
+        return self.sparse_queryset(Task.objects.filter(user=self.request.user).select_related(
+            "category", "hobby"
+        ))
 
 
 # ========================
@@ -918,7 +1022,7 @@ from .serializers import ShoppingItemSerializer, ExpenseSerializer
 # SHOPPING ITEMS
 # -------------------------
 
-class ShoppingItemListCreateView(generics.ListCreateAPIView):
+class ShoppingItemListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     """
     List all shopping items or create a new item.
     """
@@ -933,7 +1037,7 @@ class ShoppingItemListCreateView(generics.ListCreateAPIView):
         serializer.save(user=self.request.user)
 
 
-class ShoppingItemDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ShoppingItemDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ShoppingItemSerializer
     permission_classes = [IsAuthenticated]
 
@@ -945,7 +1049,7 @@ class ShoppingItemDetailView(generics.RetrieveUpdateDestroyAPIView):
 # EXPENSES
 # -------------------------
 
-class ExpenseListCreateView(generics.ListCreateAPIView):
+class ExpenseListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     serializer_class = ExpenseSerializer
     permission_classes = [IsAuthenticated]
 
@@ -956,6 +1060,69 @@ class ExpenseListCreateView(generics.ListCreateAPIView):
         serializer.save(user=self.request.user)
 
 
+class ExpenseImportView(APIView):
+    """
+    Bulk-import bank exports as expenses. Multipart upload of one or more `files`
+    (.csv, .ofx or .qif; override detection with `file_type`), optional default `currency`
+    (else the user's home currency).
+    Returns one report per file: rows read, imported, duplicates, skipped credits and errors.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        uploads = request.FILES.getlist("files") or request.FILES.getlist("file")
+        if not uploads:
+            raise ValidationError({"files": "Upload at least one .csv, .ofx or .qif file."})
+        currency = request.data.get("currency") or None
+
+        reports = []
+        for upload in uploads:
+            try:
+                kind = detect_format(upload.name, request.data.get("file_type"))
+            except ValueError as exc:
+                raise ValidationError({"files": str(exc)})
+            lines = io.TextIOWrapper(upload.file, encoding="utf-8-sig", errors="replace", newline="")
+            reports.append(import_expenses(request.user, lines, kind, name=upload.name, currency=currency).as_dict())
+
+        return Response({"files": reports}, status=status.HTTP_201_CREATED)
+
+
+class ExpenseAnalyticsView(APIView):
+    """
+    Expense totals grouped by month, category, currency and item_type (needed/impulsive).
+    ?start=YYYY-MM-DD&end=YYYY-MM-DD (default: the last 12 whole months)
+    ?group_by=month,category (default: all dimensions)
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        today = timezone.localdate()
+        this_month = today.replace(day=1)
+        next_month = (this_month + timedelta(days=32)).replace(day=1)
+        year, month = divmod(this_month.year * 12 + this_month.month - 12, 12)
+        default_start = this_month.replace(year=year, month=month + 1)
+
+        start = date_query_param(request, "start", default_start)
+        end = date_query_param(request, "end", next_month - timedelta(days=1))
+        if start > end:
+            raise ValidationError({"end": "end must not be before start."})
+
+        group_by = [dim for dim in request.query_params.get("group_by", ",".join(DIMENSIONS)).split(",") if dim]
+        unknown = set(group_by) - set(DIMENSIONS)
+        if not group_by or unknown:
+            raise ValidationError({"group_by": f"Choose from: {', '.join(DIMENSIONS)}."})
+
+        source, rows = expense_cube(request.user.id, start, end, group_by)
+        return Response({
+            "start": start,
+            "end": end,
+            "home_currency": home_currency(request.user.id),
+            "group_by": group_by,
+            "source": source,
+            "results": rows,
+        })
+
+
 # -------------------------
 # ITEMS NEAR EXPIRATION / AUTO ADD
 # -------------------------
@@ -974,10 +1141,45 @@ class ExpiringItemsView(generics.ListAPIView):
             purchased=False,
         ).filter(
             models.Q(expiry_date__lte=today + timedelta(days=warning_days)) |
-            models.Q(note__icontains="almost over")
+            models.Q(running_low=True)
         ).order_by("expiry_date")
 
 
+class ExpiryHorizonView(APIView):
+    """
+    Unpurchased items expiring within the next week, bucketed as
+    expired / today / within 3 days / this week. One range query on
+    the (user, purchased, expiry_date) index.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        today = timezone.localdate()
+        items = ShoppingItem.objects.filter(
+            user=request.user,
+            purchased=False,
+            expiry_date__lte=today + timedelta(days=7),
+        ).order_by("expiry_date", "id")
+
+        buckets = {"expired": [], "today": [], "within_3_days": [], "this_week": []}
+        for item in items:
+            days_left = (item.expiry_date - today).days
+            if days_left < 0:
+                bucket = "expired"
+            elif days_left == 0:
+                bucket = "today"
+            elif days_left <= 3:
+                bucket = "within_3_days"
+            else:
+                bucket = "this_week"
+            buckets[bucket].append(item)
+
+        return Response({
+            bucket: ShoppingItemSerializer(rows, many=True, context={"request": request}).data
+            for bucket, rows in buckets.items()
+        })
+
+
 # -------------------------
 # IMPULSIVE SHOPPING ITEMS
 # -------------------------
@@ -995,31 +1197,38 @@ class ImpulsiveShoppingItemView(generics.ListCreateAPIView):
         return ShoppingItem.objects.filter(user=self.request.user, purchased=False).order_by("-priority", "-created_at")
 
     def perform_create(self, serializer):
-        # Optionally check user's total planned cost vs salary here
+        # Checked against this month's ledger row, not the whole expense history
         user = self.request.user
-        new_item_cost = serializer.validated_data.get("estimated_cost", 0)
+        new_item_cost = serializer.validated_data.get("estimated_cost") or 0
 
-        # Example: retrieve user salary stored in Expense (or custom model)
-        salary_expenses = Expense.objects.filter(user=user).aggregate(total_spent=Sum("amount"))
-        total_spent = salary_expenses.get("total_spent") or 0
-        # For demo, assume salary = 1000 USD
-        salary = getattr(user, "salary_amount", 1000)
+        total_spent = month_spent(user.id, month_of(timezone.localdate()))
+        salary = monthly_budget(user.id)
 
         if total_spent + new_item_cost > salary:
             warning = f"Warning! Adding this item exceeds your budget of {salary}."
-            return Response({"warning": warning}, status=status.HTTP_400_BAD_REQUEST)
+            raise ValidationError({"warning": warning})
 
         serializer.save(user=user)
 
+
+class BudgetStatusView(APIView):
+    """
+    This month's spending vs. UserProfile.salary_amount:
+    remaining budget, daily burn rate, projected month-end spend, per-category totals.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response(budget_status(request.user.id))
+
 class UserProfileView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         user = request.user
         summary, _ = RewardSummary.objects.get_or_create(user=user)
-        
-        # This now runs only ONCE per day per user
-        check_weekly_discipline(user)
+
+        # Weekly discipline badges are awarded by the nightly `award_weekly_discipline` job
 
         return Response({
             "id": user.id,
@@ -1051,4 +1260,104 @@ class RewardRecommendationView(APIView):
             "message": "You've earned a treat! But also remember to relax",
             "treat_yourself": ShoppingItemSerializer(top_impulsive, many=True).data,
             "relax_with": HobbySerializer(hobbies, many=True).data,
-        })
\ No newline at end of file
+        })
+
+
+# -------------------------
+# RECURRING TASKS / REMINDERS
+# -------------------------
+
+class UpcomingOccurrencesView(APIView):
+    """
+    Occurrences of the user's recurring tasks and reminders over the next
+    ?days= (default 7, max 366), read from the materialised Occurrence rows.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            days = int(request.query_params.get("days", 7))
+        except ValueError:
+            raise ValidationError({"days": "Must be an integer."})
+        if not 1 <= days <= 366:
+            raise ValidationError({"days": "Must be between 1 and 366."})
+
+        now = timezone.now()
+        occurrences = occurrences_between(request.user.id, now, now + timedelta(days=days))
+        return Response(OccurrenceSerializer(occurrences, many=True).data)
+
+
+class CalendarView(APIView):
+    """
+    GET /calendar/?start=&end= — tasks, reminders, focus sessions and recurring
+    occurrences overlapping the window, merged into one list sorted by start.
+    Defaults to the coming 7 days; windows are capped at a year.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        start = datetime_query_param(request, "start", timezone.now())
+        end = datetime_query_param(request, "end", start + timedelta(days=7))
+        if end <= start:
+            raise ValidationError({"end": "Must be after start."})
+        if end - start > timedelta(days=MAX_WINDOW_DAYS):
+            raise ValidationError({"end": f"Window cannot exceed {MAX_WINDOW_DAYS} days."})
+
+        return Response({
+            "start": start,
+            "end": end,
+            "events": list(calendar_events(request.user.id, start, end)),
+        })
+
+
+# -------------------------
+# SEARCH
+# -------------------------
+
+class SearchView(APIView):
+    """
+    GET /search/?q=&type=task,note&limit=20 — ranked full-text matches across the
+    user's tasks, notes, hobby activities, shopping items and mood logs, with
+    snippets (matches wrapped in **). The last word matches as a prefix.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        text = request.query_params.get("q", "").strip()
+        kinds = [kind for kind in request.query_params.get("type", "").split(",") if kind]
+        unknown = sorted(set(kinds) - set(SEARCH_SOURCES))
+        if unknown:
+            raise ValidationError({"type": f"Unknown type(s): {', '.join(unknown)}. Use: {', '.join(SEARCH_SOURCES)}."})
+        try:
+            limit = int(request.query_params.get("limit", 20))
+        except ValueError:
+            raise ValidationError({"limit": "Must be an integer."})
+        limit = max(1, min(limit, MAX_SEARCH_RESULTS))
+
+        return Response({"query": text, "results": search(request.user.id, text, kinds, limit)})
+
+
+# -------------------------
+# DELTA SYNC
+# -------------------------
+
+class SyncView(APIView):
+    """
+    GET /sync/?since=<cursor>&limit=500 — what changed since the client's last sync:
+    {"cursor", "has_more", "changes": {kind: [objects]}, "deleted": {kind: [ids]}}.
+    Start with since=0 (everything), store the returned cursor, and keep asking while
+    has_more is true. Kinds are the router prefixes (tasks, hobbies, notes, ...).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            since = int(request.query_params.get("since", 0))
+            limit = int(request.query_params.get("limit", SYNC_PAGE_SIZE))
+        except ValueError:
+            raise ValidationError({"since": "since and limit must be integers."})
+        if since < 0:
+            raise ValidationError({"since": "Must be 0 or a cursor returned by an earlier sync."})
+        limit = max(1, min(limit, MAX_SYNC_PAGE_SIZE))
+
+        return Response(changes_since(request.user.id, since, limit, context={"request": request}))